@@ -0,0 +1,59 @@
+# build_cache.py - 构建缓存与派生文件目录
+import os
+import json
+import hashlib
+
+# 构建缓存（不发布）与派生文件（随页面发布）的位置
+CACHE_DIR = '.build_cache'
+DERIVATIVES_DIR = 'derivatives'
+
+def params_hash(params):
+    """计算派生参数的指纹，参数变化时缓存自动失效"""
+    encoded = json.dumps(params, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def derivative_dir(kind, digest):
+    """返回某类派生文件按源内容哈希划分的输出目录"""
+    return os.path.join(DERIVATIVES_DIR, kind, digest[:16])
+
+
+def to_url(path):
+    """将本地相对路径转换为页面中使用的URL路径"""
+    return path.replace(os.sep, '/')
+
+
+def format_bytes(size):
+    """将字节数格式化为易读的形式"""
+    for unit in ('B', 'KB', 'MB'):
+        if abs(size) < 1024:
+            return f'{size:.0f} {unit}' if unit == 'B' else f'{size:.1f} {unit}'
+        size /= 1024
+    return f'{size:.1f} GB'
+
+
+def load_json(path, default=None):
+    """读取JSON缓存文件，不存在或损坏时返回默认值"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def save_json(path, data):
+    """写入JSON缓存文件（先写临时文件再替换）"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def write_text(path, text, newline=None):
+    """原子写入文本输出（先写临时文件再替换），构建中断时不会留下写了一半的文件"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8', newline=newline) as f:
+        f.write(text)
+    os.replace(tmp_path, path)
@@ -0,0 +1,59 @@
+# build_checkpoint.py - 构建检查点：完成的条目随时记入日志、哈希记忆定期落盘，中断后重新运行即从上次的进度继续
+import os
+import json
+import time
+
+from build_cache import CACHE_DIR
+from content_hash import save_hash_cache
+
+# 哈希记忆的落盘间隔（秒）；派生文件在每个条目完成时已原子写入，本身就是检查点
+SAVE_INTERVAL = 10
+
+_last_save = time.monotonic()
+
+
+def checkpoint_path(shard=None):
+    """检查点日志的路径；同时运行的各分片各用一个"""
+    name = f'checkpoint-{shard[0]}-of-{shard[1]}.jsonl' if shard else 'checkpoint.jsonl'
+    return os.path.join(CACHE_DIR, name)
+
+
+def load_checkpoint(path):
+    """读取被中断的构建已完成的条目 {内容哈希: 元数据}；中断时写了一半的最后一行被忽略"""
+    done = {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                done[entry['digest']] = entry['metadata']
+    except OSError:
+        pass
+    return done
+
+
+def open_checkpoint(path):
+    """以追加方式打开检查点日志（接着被中断的构建继续记录）"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    return open(path, 'a', encoding='utf-8')
+
+
+def checkpoint(journal, stage_name, item):
+    """流水线 on_result 回调：元数据阶段完成的条目立即写入日志；每隔 SAVE_INTERVAL 秒保存一次哈希记忆"""
+    global _last_save
+    if stage_name == 'metadata':
+        journal.write(json.dumps({'path': item['path'], 'digest': item['digest'], 'metadata': item['metadata']},
+                                 ensure_ascii=False, sort_keys=True) + '\n')
+        journal.flush()
+    now = time.monotonic()
+    if now - _last_save >= SAVE_INTERVAL:
+        save_hash_cache()
+        _last_save = now
+
+
+def finish_checkpoint(journal):
+    """构建结果已登记到目录库（或写出部分清单）后，关闭并删除日志"""
+    journal.close()
+    os.remove(journal.name)
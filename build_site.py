@@ -1,1847 +1,369 @@
 # build_site.py - 增强科学元素和Nature学术风格
 import os
-import glob
+import html
+import shutil
+import asyncio
+import argparse
+from functools import partial
 from pathlib import Path
 import json
 from datetime import datetime
 
-# build_site.py - 增强科学元素和Nature学术风格
-import os
-import glob
-from pathlib import Path
-import json
-from datetime import datetime
-
-
-def get_media_files(directory, media_types):
-    """扫描目录中的媒体文件（图片和视频）"""
-    media_files = []
-    for pattern in media_types:
-        full_pattern = os.path.join(directory, '**', pattern)
-        media_files.extend(glob.glob(full_pattern, recursive=True))
-
-    # 转换为相对路径并排序
-    media_files = [os.path.relpath(f) for f in media_files]
-    return sorted(media_files)
-
-
-def is_video_file(filename):
-    """检查文件是否为视频格式"""
-    video_extensions = ('.mp4', '.avi', '.mov', '.wmv', '.flv', '.webm', '.mkv')
-    return filename.lower().endswith(video_extensions)
-
-
-def is_image_file(filename):
-    """检查文件是否为图片格式"""
-    image_extensions = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.tiff')
-    return filename.lower().endswith(image_extensions)
-
-
-def generate_media_html(media_files, category):
-    """为媒体文件列表生成HTML代码 - 增强科学风格"""
-    if not media_files:
-        return f'''
-        <div class="empty-state">
-            <div class="empty-icon">🔬</div>
-            <h3>No {category} Data Available</h3>
-            <p>Add experimental documentation to the {category.upper()}/ folder to see them displayed here.</p>
-        </div>
-        '''
-
-    html_parts = []
-
-    for media_path in media_files:
-        # 获取文件名（不含扩展名）作为默认描述
-        filename = os.path.splitext(os.path.basename(media_path))[0]
-        # 将下划线替换为空格并首字母大写
-        description = filename.replace('_', ' ').title()
-
-        # 获取文件创建时间
-        file_time = os.path.getctime(media_path)
-        from datetime import datetime
-        date_str = datetime.fromtimestamp(file_time).strftime("%b %d, %Y")
-
-        if is_video_file(media_path):
-            # 视频卡片 - 增强科学风格
-            media_html = f'''
-            <div class="media-card video-card">
-                <div class="media-thumbnail">
-                    <video class="media-preview" preload="metadata" aria-label="Experimental video: {description}">
-                        <source src="{media_path}" type="video/mp4">
-                        Your browser does not support the video tag.
-                    </video>
-                    <div class="media-overlay">
-                        <button class="media-action-btn play-btn" onclick="playVideo(this)" aria-label="Play experimental video: {description}">
-                            <span class="action-icon">🎬</span>
-                            <span class="action-text">Analyze Video</span>
-                        </button>
-                        <div class="media-badge video-badge">
-                            <i class="fas fa-microscope"></i> EXPERIMENT
-                        </div>
-                        <div class="media-duration">0:00</div>
-                    </div>
-                </div>
-                <div class="media-info">
-                    <h3 class="media-title">{description}</h3>
-                    <div class="media-meta">
-                        <span class="media-type"><i class="fas fa-video"></i> Experimental Recording</span>
-                        <span class="media-date">• {date_str}</span>
-                    </div>
-                    <div class="media-description">
-                        <p><i class="fas fa-flask"></i> Documentation of experimental procedure with detailed protocol analysis.</p>
-                    </div>
-                </div>
-            </div>
-            '''
-        else:
-            # 图片卡片 - 增强科学风格
-            media_html = f'''
-            <div class="media-card">
-                <div class="media-thumbnail">
-                    <img src="{media_path}" alt="{description}" class="media-preview" loading="lazy">
-                    <div class="media-overlay">
-                        <button class="media-action-btn view-btn" onclick="enlargeImage(this)" aria-label="Analyze image: {description}">
-                            <span class="action-icon">🔍</span>
-                            <span class="action-text">Preview image</span>
-                        </button>
-                    </div>
-                </div>
-                <div class="media-info">
-                    <h3 class="media-title">{description}</h3>
-                    <div class="media-meta">
-                        <span class="media-type"><i class="fas fa-image"></i> Research Documentation</span>
-                        <span class="media-date">• {date_str}</span>
-                    </div>
-                    <div class="media-description">
-                        <p><i class="fas fa-dna"></i> Visual documentation of research activities and experimental results analysis.</p>
-                    </div>
-                </div>
-            </div>
-            '''
-
-        html_parts.append(media_html)
-
-    return '\n'.join(html_parts)
-
-
-def create_hp_integrated_html(hp_media_html, art_media_html, timestamp):
-    """创建集成到Human Practices的HTML - 增强科学元素和动态效果"""
-    return f'''<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Advanced Research Media Archive - Scientific Documentation | iGEM Team</title>
-    <meta name="description" content="Advanced scientific archive of research documentation, experimental procedures, and scientific analysis.">
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css">
-    <style>
-        /* ====== ENHANCED NATURE JOURNAL STYLE ====== */
-        :root {{
-            /* Enhanced Scientific Color Palette */
-            --nature-dark: #0d1b2a;
-            --nature-primary: #1b263b;
-            --nature-secondary: #415a77;
-            --nature-accent: #778da9;
-            --nature-light: #e0e1dd;
-
-            /* Scientific Element Colors */
-            --dna-blue: #3498db;
-            --protein-purple: #9b59b6;
-            --enzyme-green: #27ae60;
-            --substrate-orange: #f39c12;
-            --reaction-red: #e74c3c;
-            --membrane-gold: #f1c40f;
-
-            /* Enhanced Background Colors */
-            --bg-white: #ffffff;
-            --bg-light: #f8fafc;
-            --bg-lighter: #f1f5f9;
-            --border-color: #e2e8f0;
-            --border-light: #f1f5f9;
-
-            /* Enhanced Typography */
-            --font-primary: 'Georgia', 'Times New Roman', serif;
-            --font-accent: 'Arial', 'Helvetica Neue', Helvetica, sans-serif;
-            --font-scientific: 'Courier New', monospace;
-
-            /* Enhanced Spacing */
-            --space-xs: 0.25rem;
-            --space-sm: 0.5rem;
-            --space-md: 1rem;
-            --space-lg: 1.5rem;
-            --space-xl: 2rem;
-            --space-xxl: 4rem;
-            --space-xxxl: 6rem;
-
-            /* 新增：圆角变量 */
-            --radius-sm: 4px;
-            --radius-md: 8px;
-            --radius-lg: 12px;
-            --radius-xl: 16px;
-            --radius-xxl: 24px;
-
-            /* Enhanced Effects */
-            --shadow-sm: 0 2px 8px rgba(13, 27, 42, 0.08);
-            --shadow-md: 0 4px 16px rgba(13, 27, 42, 0.12);
-            --shadow-lg: 0 8px 32px rgba(13, 27, 42, 0.16);
-            --glow-blue: 0 0 20px rgba(52, 152, 219, 0.4);
-            --glow-green: 0 0 20px rgba(39, 174, 96, 0.4);
-            --glow-purple: 0 0 20px rgba(155, 89, 182, 0.4);
-        }}
-
-        /* ====== BASE ENHANCEMENTS ====== */
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-
-        html {{
-            scroll-behavior: smooth;
-            background: linear-gradient(135deg, var(--nature-light) 0%, var(--bg-white) 50%, var(--bg-light) 100%);
-        }}
-
-        body {{
-            font-family: var(--font-primary);
-            font-size: 18px;
-            line-height: 1.7;
-            color: var(--nature-primary);
-            background: transparent;
-            -webkit-font-smoothing: antialiased;
-            -moz-osx-font-smoothing: grayscale;
-            position: relative;
-            overflow-x: hidden;
-            min-height: 100vh;
-        }}
-
-        /* ====== ENHANCED SCIENTIFIC BACKGROUND ====== */
-        .scientific-background {{
-            position: fixed;
-            top: 0;
-            left: 0;
-            width: 100%;
-            height: 100%;
-            background: 
-                radial-gradient(circle at 15% 20%, rgba(52, 152, 219, 0.08) 0%, transparent 40%),
-                radial-gradient(circle at 85% 30%, rgba(39, 174, 96, 0.06) 0%, transparent 45%),
-                radial-gradient(circle at 25% 80%, rgba(155, 89, 182, 0.05) 0%, transparent 50%),
-                radial-gradient(circle at 75% 70%, rgba(241, 196, 15, 0.04) 0%, transparent 35%),
-                linear-gradient(135deg, rgba(224, 225, 221, 0.1) 0%, transparent 50%);
-            z-index: -3;
-            pointer-events: none;
-        }}
-
-        /* ====== ENHANCED SCIENTIFIC DECORATIONS ====== */
-        .science-element {{
-            position: fixed;
-            z-index: -1;
-            opacity: 0.25;
-            pointer-events: none;
-            filter: blur(1px);
-            animation-timing-function: ease-in-out;
-        }}
-
-        /* Enhanced DNA Helix */
-        .dna-helix {{
-            top: 10%;
-            left: 5%;
-            width: 120px;
-            height: 300px;
-            animation: float-dna 20s ease-in-out infinite;
-        }}
-
-        .dna-strand {{
-            position: absolute;
-            width: 4px;
-            height: 100%;
-            background: linear-gradient(to bottom, 
-                transparent, 
-                var(--dna-blue), 
-                var(--protein-purple), 
-                var(--enzyme-green),
-                transparent);
-            left: 50%;
-            transform: translateX(-50%);
-            opacity: 0.8;
-            box-shadow: var(--glow-blue);
-        }}
-
-        .dna-base {{
-            position: absolute;
-            width: 16px;
-            height: 16px;
-            border-radius: 50%;
-            border: 3px solid rgba(255,255,255,0.6);
-            animation: pulse-base 3s ease-in-out infinite;
-            box-shadow: 0 0 15px currentColor;
-        }}
-
-        .dna-base.blue {{ background: var(--dna-blue); color: var(--dna-blue); }}
-        .dna-base.green {{ background: var(--enzyme-green); color: var(--enzyme-green); }}
-        .dna-base.purple {{ background: var(--protein-purple); color: var(--protein-purple); }}
-
-        /* Enhanced Cell Structure */
-        .cell-structure {{
-            bottom: 10%;
-            right: 8%;
-            width: 200px;
-            height: 200px;
-            animation: rotate-cell 40s linear infinite;
-        }}
-
-        .cell-membrane {{
-            position: absolute;
-            width: 100%;
-            height: 100%;
-            border: 4px solid var(--membrane-gold);
-            border-radius: 50%;
-            opacity: 0.8;
-            box-shadow: var(--glow-green);
-            animation: pulse-membrane 8s ease-in-out infinite;
-        }}
-
-        .nucleus {{
-            position: absolute;
-            top: 50%;
-            left: 50%;
-            transform: translate(-50%, -50%);
-            width: 70px;
-            height: 70px;
-            background: radial-gradient(circle, var(--protein-purple), transparent);
-            border-radius: 50%;
-            animation: pulse-nucleus 6s ease-in-out infinite;
-            box-shadow: var(--glow-purple);
-        }}
-
-        .organelle {{
-            position: absolute;
-            border-radius: 50%;
-            opacity: 0.7;
-            animation: float-organelle 15s ease-in-out infinite;
-            box-shadow: 0 0 12px currentColor;
-        }}
-
-        .mitochondria {{ 
-            width: 35px; 
-            height: 60px; 
-            background: var(--enzyme-green); 
-            color: var(--enzyme-green);
-            animation-delay: 2s;
-        }}
-        .ribosome {{ 
-            width: 20px; 
-            height: 20px; 
-            background: var(--reaction-red); 
-            color: var(--reaction-red);
-            animation-delay: 4s;
-        }}
-        .golgi {{ 
-            width: 45px; 
-            height: 30px; 
-            background: var(--substrate-orange); 
-            color: var(--substrate-orange);
-            animation-delay: 6s;
-        }}
-
-        /* Molecular Structures */
-        .molecule-cluster {{
-            top: 20%;
-            right: 10%;
-            width: 150px;
-            height: 150px;
-            animation: float-molecule 25s ease-in-out infinite;
-        }}
-
-        .molecule {{
-            position: absolute;
-            border-radius: 50%;
-            background: currentColor;
-            box-shadow: 0 0 10px currentColor;
-            animation: bond-vibration 4s ease-in-out infinite;
-        }}
-
-        .atom-large {{ 
-            width: 25px; 
-            height: 25px; 
-            background: var(--dna-blue); 
-            color: var(--dna-blue);
-        }}
-        .atom-medium {{ 
-            width: 18px; 
-            height: 18px; 
-            background: var(--enzyme-green); 
-            color: var(--enzyme-green);
-        }}
-        .atom-small {{ 
-            width: 12px; 
-            height: 12px; 
-            background: var(--reaction-red); 
-            color: var(--reaction-red);
-        }}
-
-        .chemical-bond {{
-            position: absolute;
-            height: 3px;
-            background: linear-gradient(90deg, transparent, var(--nature-accent), transparent);
-            transform-origin: left center;
-            animation: bond-rotation 8s linear infinite;
-        }}
-
-        /* Protein Folding Animation */
-        .protein-folding {{
-            bottom: 25%;
-            left: 8%;
-            width: 120px;
-            height: 120px;
-            animation: fold-protein 30s ease-in-out infinite;
-        }}
-
-        .protein-chain {{
-            position: absolute;
-            width: 80%;
-            height: 80%;
-            border: 2px solid var(--protein-purple);
-            border-radius: 30% 70% 70% 30% / 30% 30% 70% 70%;
-            animation: morph-protein 15s ease-in-out infinite;
-            opacity: 0.8;
-            box-shadow: var(--glow-purple);
-        }}
-
-        .amino-acid {{
-            position: absolute;
-            width: 10px;
-            height: 10px;
-            background: var(--protein-purple);
-            border-radius: 50%;
-            animation: blink-amino 2s ease-in-out infinite;
-            box-shadow: 0 0 10px var(--protein-purple);
-        }}
-
-        /* Enhanced Animation Keyframes */
-        @keyframes float-dna {{
-            0%, 100% {{ transform: translateY(0px) rotate(0deg) scale(1); }}
-            25% {{ transform: translateY(-20px) rotate(90deg) scale(1.1); }}
-            50% {{ transform: translateY(10px) rotate(180deg) scale(1); }}
-            75% {{ transform: translateY(-15px) rotate(270deg) scale(1.05); }}
-        }}
-
-        @keyframes pulse-base {{
-            0%, 100% {{ opacity: 0.6; transform: scale(1); }}
-            50% {{ opacity: 1; transform: scale(1.4); }}
-        }}
-
-        @keyframes pulse-membrane {{
-            0%, 100% {{ opacity: 0.6; transform: scale(1); }}
-            50% {{ opacity: 0.9; transform: scale(1.05); }}
-        }}
-
-        @keyframes float-organelle {{
-            0%, 100% {{ transform: translate(0, 0) rotate(0deg); }}
-            25% {{ transform: translate(15px, -10px) rotate(90deg); }}
-            50% {{ transform: translate(5px, 15px) rotate(180deg); }}
-            75% {{ transform: translate(-10px, 5px) rotate(270deg); }}
-        }}
-
-        @keyframes float-molecule {{
-            0%, 100% {{ transform: translate(0, 0) rotate(0deg); }}
-            33% {{ transform: translate(25px, -15px) rotate(120deg); }}
-            66% {{ transform: translate(-15px, 20px) rotate(240deg); }}
-        }}
-
-        @keyframes bond-vibration {{
-            0%, 100% {{ transform: scale(1); }}
-            50% {{ transform: scale(1.2); }}
-        }}
-
-        @keyframes bond-rotation {{
-            from {{ transform: rotate(0deg); }}
-            to {{ transform: rotate(360deg); }}
-        }}
-
-        @keyframes fold-protein {{
-            0%, 100% {{ transform: translate(0, 0) scale(1); }}
-            25% {{ transform: translate(10px, -15px) scale(1.1); }}
-            50% {{ transform: translate(-5px, 10px) scale(0.9); }}
-            75% {{ transform: translate(15px, 5px) scale(1.05); }}
-        }}
-
-        @keyframes morph-protein {{
-            0% {{ border-radius: 30% 70% 70% 30% / 30% 30% 70% 70%; transform: rotate(0deg); }}
-            33% {{ border-radius: 70% 30% 30% 70% / 70% 70% 30% 30%; transform: rotate(120deg); }}
-            66% {{ border-radius: 50% 50% 50% 50% / 50% 50% 50% 50%; transform: rotate(240deg); }}
-            100% {{ border-radius: 30% 70% 70% 30% / 30% 30% 70% 70%; transform: rotate(360deg); }}
-        }}
-
-        @keyframes blink-amino {{
-            0%, 100% {{ opacity: 0.4; }}
-            50% {{ opacity: 1; }}
-        }}
-
-        /* ====== ENHANCED TYPOGRAPHY ====== */
-        h1, h2, h3, h4, h5, h6 {{
-            font-family: var(--font-primary);
-            font-weight: 700;
-            line-height: 1.3;
-            margin-bottom: var(--space-lg);
-            color: var(--nature-dark);
-            letter-spacing: -0.02em;
-        }}
-
-        h1 {{
-            font-size: 3.5rem;
-            background: linear-gradient(135deg, var(--nature-dark), var(--protein-purple));
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            background-clip: text;
-            text-shadow: 2px 2px 4px rgba(13, 27, 42, 0.1);
-        }}
-
-        h2 {{
-            font-size: 2.5rem;
-            border-bottom: 3px solid var(--enzyme-green);
-            padding-bottom: var(--space-md);
-            margin-bottom: var(--space-xxl);
-            position: relative;
-        }}
-
-        h2::after {{
-            content: '';
-            position: absolute;
-            bottom: -3px;
-            left: 0;
-            width: 100px;
-            height: 3px;
-            background: var(--protein-purple);
-        }}
-
-        h3 {{
-            font-size: 1.5rem;
-            font-weight: 600;
-        }}
-
-        .lead {{
-            font-size: 1.25rem;
-            font-weight: 400;
-            color: var(--nature-secondary);
-            line-height: 1.8;
-            font-style: italic;
-        }}
-
-        .scientific-term {{
-            font-family: var(--font-scientific);
-            background: var(--bg-lighter);
-            padding: 2px 6px;
-            border-radius: var(--radius-sm);
-            border-left: 3px solid var(--enzyme-green);
-            font-weight: 600;
-        }}
-
-        /* ====== ENHANCED LAYOUT ====== */
-        .container {{
-            max-width: 1400px;
-            margin: 0 auto;
-            padding: 0 var(--space-xl);
-            position: relative;
-            z-index: 1;
-        }}
-
-        .page-header {{
-            background: linear-gradient(135deg, var(--bg-light) 0%, var(--bg-lighter) 100%);
-            border-bottom: 3px solid var(--border-light);
-            padding: var(--space-xxxl) 0;
-            margin-bottom: var(--space-xxxl);
-            position: relative;
-            z-index: 1;
-            box-shadow: var(--shadow-md);
-        }}
-
-        .page-title {{
-            text-align: center;
-            margin-bottom: var(--space-lg);
-            position: relative;
-        }}
-
-        .page-title::before {{
-            content: '🔬';
-            position: absolute;
-            left: -60px;
-            top: 50%;
-            transform: translateY(-50%);
-            font-size: 2rem;
-            opacity: 0.3;
-        }}
-
-        .page-subtitle {{
-            text-align: center;
-            font-size: 1.5rem;
-            color: var(--nature-secondary);
-            max-width: 800px;
-            margin: 0 auto;
-            font-style: italic;
-            line-height: 1.6;
-        }}
-
-        .section {{
-            margin-bottom: var(--space-xxxl);
-            padding: var(--space-xxl) 0;
-            position: relative;
-            z-index: 1;
-        }}
-
-        .section-header {{
-            margin-bottom: var(--space-xxl);
-            text-align: center;
-            position: relative;
-        }}
-
-        .section-title {{
-            display: inline-block;
-            position: relative;
-            padding-bottom: var(--space-md);
-        }}
-
-        .section-title::after {{
-            content: '';
-            position: absolute;
-            bottom: 0;
-            left: 25%;
-            width: 50%;
-            height: 3px;
-            background: linear-gradient(90deg, transparent, var(--enzyme-green), transparent);
-        }}
-
-        .section-description {{
-            max-width: 800px;
-            margin: 0 auto;
-            text-align: center;
-            color: var(--nature-secondary);
-            font-size: 1.1rem;
-        }}
-
-        /* ====== ENHANCED MEDIA GRID ====== */
-        .media-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(400px, 1fr));
-            gap: var(--space-xxl);
-            margin: var(--space-xxl) 0;
-        }}
-
-        .media-card {{
-            background: var(--bg-white);
-            border: 2px solid var(--border-color);
-            border-radius: 12px;
-            overflow: hidden;
-            transition: all 0.4s cubic-bezier(0.25, 0.46, 0.45, 0.94);
-            box-shadow: var(--shadow-sm);
-            position: relative;
-        }}
-
-        .media-card::before {{
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            height: 4px;
-            background: linear-gradient(90deg, var(--dna-blue), var(--enzyme-green), var(--protein-purple));
-            opacity: 0;
-            transition: opacity 0.3s ease;
-        }}
-
-        .media-card:hover {{
-            transform: translateY(-8px) scale(1.02);
-            box-shadow: var(--shadow-lg);
-            border-color: var(--enzyme-green);
-        }}
-
-        .media-card:hover::before {{
-            opacity: 1;
-        }}
-
-        .media-thumbnail {{
-            position: relative;
-            height: 280px;
-            overflow: hidden;
-            background: linear-gradient(135deg, var(--bg-lighter), var(--bg-light));
-        }}
-
-        .media-preview {{
-            width: 100%;
-            height: 100%;
-            object-fit: cover;
-            transition: all 0.4s ease;
-        }}
-
-        .media-card:hover .media-preview {{
-            transform: scale(1.08);
-        }}
-
-        .media-overlay {{
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            bottom: 0;
-            background: linear-gradient(135deg, rgba(13, 27, 42, 0.9), rgba(27, 38, 59, 0.8));
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            opacity: 0;
-            transition: all 0.3s ease;
-            backdrop-filter: blur(4px);
-        }}
-
-        .media-card:hover .media-overlay {{
-            opacity: 1;
-        }}
-
-        .media-action-btn {{
-            background: linear-gradient(135deg, var(--enzyme-green), var(--dna-blue));
-            color: var(--bg-white);
-            border: none;
-            padding: var(--space-md) var(--space-xl);
-            border-radius: 8px;
-            font-weight: 600;
-            cursor: pointer;
-            display: flex;
-            align-items: center;
-            gap: var(--space-sm);
-            transition: all 0.3s ease;
-            font-size: 1rem;
-            text-transform: uppercase;
-            letter-spacing: 0.5px;
-            box-shadow: var(--shadow-md);
-        }}
-
-        .media-action-btn:hover {{
-            transform: translateY(-2px) scale(1.05);
-            box-shadow: var(--shadow-lg);
-        }}
-
-        .action-icon {{
-            font-size: 1.2rem;
-        }}
-
-        .media-badge {{
-            position: absolute;
-            top: var(--space-lg);
-            right: var(--space-lg);
-            padding: var(--space-sm) var(--space-md);
-            border-radius: 6px;
-            font-size: 0.8rem;
-            font-weight: 700;
-            text-transform: uppercase;
-            letter-spacing: 1px;
-            background: linear-gradient(135deg, var(--dna-blue), var(--protein-purple));
-            color: var(--bg-white);
-            box-shadow: var(--shadow-sm);
-        }}
-
-        .media-duration {{
-            position: absolute;
-            bottom: var(--space-lg);
-            right: var(--space-lg);
-            background: rgba(13, 27, 42, 0.9);
-            color: var(--bg-white);
-            padding: var(--space-xs) var(--space-sm);
-            border-radius: 4px;
-            font-size: 0.8rem;
-            font-weight: 600;
-            backdrop-filter: blur(10px);
-        }}
-
-        .media-info {{
-            padding: var(--space-xl);
-            background: var(--bg-white);
-        }}
-
-        .media-title {{
-            font-size: 1.3rem;
-            margin-bottom: var(--space-md);
-            color: var(--nature-dark);
-            line-height: 1.4;
-            font-weight: 700;
-        }}
-
-        .media-meta {{
-            display: flex;
-            align-items: center;
-            gap: var(--space-md);
-            margin-bottom: var(--space-lg);
-            font-size: 0.9rem;
-            color: var(--nature-secondary);
-        }}
-
-        .media-type {{
-            font-weight: 600;
-            color: var(--enzyme-green);
-            display: flex;
-            align-items: center;
-            gap: var(--space-xs);
-        }}
-
-        .media-date {{
-            color: var(--nature-accent);
-        }}
-
-        .media-description {{
-            font-size: 0.95rem;
-            color: var(--nature-secondary);
-            line-height: 1.6;
-        }}
-
-        .media-description i {{
-            color: var(--enzyme-green);
-            margin-right: var(--space-xs);
-        }}
-
-        /* ====== ENHANCED STATISTICS ====== */
-        .stats-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-            gap: var(--space-xl);
-            margin: var(--space-xxl) 0;
-        }}
-
-        .stat-card {{
-            background: linear-gradient(135deg, var(--bg-white), var(--bg-lighter));
-            border: 2px solid var(--border-light);
-            border-radius: 12px;
-            padding: var(--space-xl);
-            text-align: center;
-            box-shadow: var(--shadow-sm);
-            transition: all 0.3s ease;
-            position: relative;
-            overflow: hidden;
-        }}
-
-        .stat-card::before {{
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            height: 4px;
-            background: linear-gradient(90deg, var(--dna-blue), var(--enzyme-green));
-        }}
-
-        .stat-card:hover {{
-            transform: translateY(-5px);
-            box-shadow: var(--shadow-lg);
-        }}
-
-        .stat-icon {{
-            font-size: 3rem;
-            margin-bottom: var(--space-lg);
-            color: var(--enzyme-green);
-            opacity: 0.8;
-        }}
-
-        .stat-number {{
-            font-size: 3.5rem;
-            font-weight: 800;
-            color: var(--nature-dark);
-            margin-bottom: var(--space-sm);
-            background: linear-gradient(135deg, var(--nature-dark), var(--protein-purple));
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            background-clip: text;
-        }}
-
-        .stat-label {{
-            font-size: 1rem;
-            color: var(--nature-secondary);
-            text-transform: uppercase;
-            letter-spacing: 1px;
-            font-weight: 600;
-        }}
-
-        /* ====== ENHANCED EMPTY STATE ====== */
-        .empty-state {{
-            text-align: center;
-            padding: var(--space-xxxl);
-            background: linear-gradient(135deg, var(--bg-lighter), var(--bg-light));
-            border: 3px dashed var(--border-color);
-            border-radius: 16px;
-            grid-column: 1 / -1;
-        }}
-
-        .empty-icon {{
-            font-size: 4rem;
-            margin-bottom: var(--space-xl);
-            opacity: 0.5;
-        }}
-
-        /* ====== ENHANCED MODAL STYLES ====== */
-        .modal {{
-            display: none;
-            position: fixed;
-            z-index: 10000;
-            left: 0;
-            top: 0;
-            width: 100%;
-            height: 100%;
-            background: rgba(13, 27, 42, 0.98);
-            backdrop-filter: blur(12px);
-            opacity: 0;
-            transition: opacity 0.4s ease;
-        }}
-
-        .modal.show {{
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            opacity: 1;
-        }}
-
-        .modal-content {{
-            max-width: 95vw;
-            max-height: 95vh;
-            object-fit: contain;
-            border-radius: 16px;
-            box-shadow: var(--shadow-lg);
-            transform: scale(0.8);
-            transition: transform 0.4s cubic-bezier(0.25, 0.46, 0.45, 0.94);
-            border: 2px solid var(--enzyme-green);
-        }}
-
-        .modal.show .modal-content {{
-            transform: scale(1);
-        }}
-
-        .modal-close {{
-            position: fixed;
-            top: var(--space-xxl);
-            right: var(--space-xxl);
-            background: linear-gradient(135deg, var(--reaction-red), var(--substrate-orange));
-            color: var(--bg-white);
-            border: 2px solid rgba(255, 255, 255, 0.3);
-            width: 60px;
-            height: 60px;
-            border-radius: 50%;
-            font-size: 1.8rem;
-            cursor: pointer;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            transition: all 0.3s ease;
-            backdrop-filter: blur(10px);
-            box-shadow: var(--shadow-md);
-        }}
-
-        .modal-close:hover {{
-            transform: rotate(90deg) scale(1.1);
-            box-shadow: var(--shadow-lg);
-        }}
-
-        .modal-nav {{
-            position: fixed;
-            top: 50%;
-            transform: translateY(-50%);
-            background: linear-gradient(135deg, var(--dna-blue), var(--protein-purple));
-            color: var(--bg-white);
-            border: 2px solid rgba(255, 255, 255, 0.3);
-            width: 60px;
-            height: 60px;
-            border-radius: 50%;
-            font-size: 1.5rem;
-            cursor: pointer;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            transition: all 0.3s ease;
-            backdrop-filter: blur(10px);
-            box-shadow: var(--shadow-md);
-        }}
-
-        .modal-nav:hover {{
-            transform: translateY(-50%) scale(1.1);
-            box-shadow: var(--shadow-lg);
-        }}
-
-        .modal-prev {{ left: var(--space-xxl); }}
-        .modal-next {{ right: var(--space-xxl); }}
-
-        .modal-caption {{
-            position: fixed;
-            bottom: var(--space-xxl);
-            left: 50%;
-            transform: translateX(-50%);
-            background: linear-gradient(135deg, var(--enzyme-green), var(--dna-blue));
-            color: var(--bg-white);
-            padding: var(--space-lg) var(--space-xl);
-            border-radius: 12px;
-            max-width: 80%;
-            text-align: center;
-            backdrop-filter: blur(10px);
-            border: 2px solid rgba(255, 255, 255, 0.2);
-            box-shadow: var(--shadow-md);
-            font-size: 1.1rem;
-            font-weight: 600;
-        }}
-
-        /* ====== ENHANCED VIDEO MODAL ====== */
-        .video-modal {{
-            display: none;
-            position: fixed;
-            z-index: 10000;
-            left: 0;
-            top: 0;
-            width: 100%;
-            height: 100%;
-            background: rgba(13, 27, 42, 0.98);
-            backdrop-filter: blur(12px);
-            opacity: 0;
-            transition: opacity 0.4s ease;
-        }}
-
-        .video-modal.show {{
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            opacity: 1;
-        }}
-
-        .video-modal-content {{
-            max-width: 95vw;
-            max-height: 95vh;
-            border-radius: 16px;
-            box-shadow: var(--shadow-lg);
-            transform: scale(0.8);
-            transition: transform 0.4s cubic-bezier(0.25, 0.46, 0.45, 0.94);
-            background: #000;
-            border: 2px solid var(--dna-blue);
-        }}
-
-        .video-modal.show .video-modal-content {{
-            transform: scale(1);
-        }}
-
-        .video-modal video {{
-            width: 100%;
-            height: auto;
-            max-height: 95vh;
-            border-radius: 14px;
-        }}
-
-        .video-close-btn {{
-            position: fixed;
-            top: var(--space-xxl);
-            right: var(--space-xxl);
-            background: linear-gradient(135deg, var(--reaction-red), var(--substrate-orange));
-            color: var(--bg-white);
-            border: 2px solid rgba(255, 255, 255, 0.3);
-            width: 60px;
-            height: 60px;
-            border-radius: 50%;
-            font-size: 1.8rem;
-            cursor: pointer;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            transition: all 0.3s ease;
-            backdrop-filter: blur(10px);
-            box-shadow: var(--shadow-md);
-            z-index: 10001;
-        }}
-
-        .video-close-btn:hover {{
-            transform: rotate(90deg) scale(1.1);
-            box-shadow: var(--shadow-lg);
-        }}
-
-        .video-modal-caption {{
-            position: fixed;
-            bottom: var(--space-xxl);
-            left: 50%;
-            transform: translateX(-50%);
-            background: linear-gradient(135deg, var(--dna-blue), var(--protein-purple));
-            color: var(--bg-white);
-            padding: var(--space-lg) var(--space-xl);
-            border-radius: 12px;
-            max-width: 80%;
-            text-align: center;
-            backdrop-filter: blur(10px);
-            border: 2px solid rgba(255, 255, 255, 0.2);
-            box-shadow: var(--shadow-md);
-            font-size: 1.1rem;
-            font-weight: 600;
-        }}
-
-        /* ====== ENHANCED FOOTER ====== */
-        .page-footer {{
-            background: linear-gradient(135deg, var(--nature-primary), var(--nature-dark));
-            border-top: 3px solid var(--enzyme-green);
-            padding: var(--space-xxl) 0;
-            margin-top: var(--space-xxxl);
-            text-align: center;
-            color: var(--bg-white);
-            position: relative;
-        }}
-
-        .page-footer::before {{
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            height: 4px;
-            background: linear-gradient(90deg, var(--dna-blue), var(--enzyme-green), var(--protein-purple));
-        }}
-
-        .footer-text {{
-            color: var(--nature-light);
-            font-size: 1rem;
-            opacity: 0.9;
-        }}
-
-        /* ====== RESPONSIVE DESIGN ENHANCEMENTS ====== */
-        @media (max-width: 1200px) {{
-            .container {{
-                max-width: 100%;
-                padding: 0 var(--space-lg);
-            }}
-
-            .media-grid {{
-                grid-template-columns: repeat(auto-fit, minmax(350px, 1fr));
-                gap: var(--space-xl);
-            }}
-        }}
-
-        @media (max-width: 768px) {{
-            .media-grid {{
-                grid-template-columns: 1fr;
-                gap: var(--space-lg);
-            }}
-
-            .stats-grid {{
-                grid-template-columns: repeat(2, 1fr);
-            }}
-
-            h1 {{
-                font-size: 2.5rem;
-            }}
-
-            h2 {{
-                font-size: 2rem;
-            }}
-
-            .container {{
-                padding: 0 var(--space-md);
-            }}
-
-            .modal-close, .video-close-btn {{
-                top: var(--space-lg);
-                right: var(--space-lg);
-                width: 50px;
-                height: 50px;
-            }}
-
-            .modal-nav {{
-                width: 50px;
-                height: 50px;
-            }}
-
-            .modal-prev {{ left: var(--space-lg); }}
-            .modal-next {{ right: var(--space-lg); }}
-
-            /* Reduce scientific decorations on mobile */
-            .science-element {{
-                opacity: 0.15;
-            }}
-        }}
-
-        @media (max-width: 480px) {{
-            .page-header {{
-                padding: var(--space-xxl) 0;
-            }}
-
-            .section {{
-                padding: var(--space-xl) 0;
-            }}
-
-            .media-thumbnail {{
-                height: 220px;
-            }}
-
-            .stats-grid {{
-                grid-template-columns: 1fr;
-            }}
-
-            h1 {{
-                font-size: 2rem;
-            }}
-
-            h2 {{
-                font-size: 1.75rem;
-            }}
-
-            .page-title::before {{
-                display: none;
-            }}
-        }}
-
-        /* ====== ACCESSIBILITY ENHANCEMENTS ====== */
-        @media (prefers-reduced-motion: reduce) {{
-            * {{
-                animation-duration: 0.01ms !important;
-                animation-iteration-count: 1 !important;
-                transition-duration: 0.01ms !important;
-            }}
-
-            .science-element {{
-                display: none;
-            }}
-        }}
-
-        .sr-only {{
-            position: absolute;
-            width: 1px;
-            height: 1px;
-            padding: 0;
-            margin: -1px;
-            overflow: hidden;
-            clip: rect(0, 0, 0, 0);
-            white-space: nowrap;
-            border: 0;
-        }}
-
-        /* ====== LOADING ANIMATIONS ====== */
-        @keyframes fadeInUp {{
-            from {{
-                opacity: 0;
-                transform: translateY(30px);
-            }}
-            to {{
-                opacity: 1;
-                transform: translateY(0);
-            }}
-        }}
-
-        .media-card {{
-            animation: fadeInUp 0.6s ease-out;
-        }}
-
-        .media-card:nth-child(odd) {{
-            animation-delay: 0.1s;
-        }}
-
-        .media-card:nth-child(even) {{
-            animation-delay: 0.2s;
-        }}
-
-        /* ====== INTERACTIVE ELEMENTS ====== */
-        .floating-cta {{
-            position: fixed;
-            bottom: var(--space-xl);
-            right: var(--space-xl);
-            background: linear-gradient(135deg, var(--enzyme-green), var(--dna-blue));
-            color: var(--bg-white);
-            padding: var(--space-md) var(--space-lg);
-            border-radius: 50px;
-            text-decoration: none;
-            font-weight: 600;
-            box-shadow: var(--shadow-lg);
-            z-index: 1000;
-            transition: all 0.3s ease;
-            display: flex;
-            align-items: center;
-            gap: var(--space-sm);
-            animation: float-cta 3s ease-in-out infinite;
-        }}
-
-        .floating-cta:hover {{
-            transform: translateY(-3px) scale(1.05);
-            box-shadow: var(--shadow-lg), 0 0 20px var(--enzyme-green);
-        }}
-
-        @keyframes float-cta {{
-            0%, 100% {{ transform: translateY(0px); }}
-            50% {{ transform: translateY(-10px); }}
-        }}
-    </style>
-</head>
-<body>
-    <!-- Enhanced Scientific Background -->
-    <div class="scientific-background"></div>
-
-    <!-- Enhanced Scientific Elements -->
-    <div class="science-element dna-helix">
-        <div class="dna-strand"></div>
-        <div class="dna-base blue" style="top: 15%"></div>
-        <div class="dna-base green" style="top: 30%"></div>
-        <div class="dna-base purple" style="top: 45%"></div>
-        <div class="dna-base blue" style="top: 60%"></div>
-        <div class="dna-base green" style="top: 75%"></div>
-        <div class="dna-base purple" style="top: 90%"></div>
-    </div>
-
-    <div class="science-element cell-structure">
-        <div class="cell-membrane"></div>
-        <div class="nucleus"></div>
-        <div class="organelle mitochondria" style="top: 20%; left: 20%;"></div>
-        <div class="organelle ribosome" style="bottom: 30%; right: 25%;"></div>
-        <div class="organelle golgi" style="top: 60%; left: 15%;"></div>
-    </div>
-
-    <div class="science-element molecule-cluster">
-        <div class="molecule atom-large" style="top: 40%; left: 40%;"></div>
-        <div class="molecule atom-medium" style="top: 20%; left: 60%;"></div>
-        <div class="molecule atom-small" style="bottom: 30%; right: 40%;"></div>
-        <div class="molecule atom-medium" style="bottom: 20%; left: 30%;"></div>
-        <div class="chemical-bond" style="top: 45%; left: 42%; width: 50px; transform: rotate(45deg);"></div>
-        <div class="chemical-bond" style="top: 25%; left: 55%; width: 40px; transform: rotate(120deg);"></div>
-    </div>
-
-    <div class="science-element protein-folding">
-        <div class="protein-chain"></div>
-        <div class="amino-acid" style="top: 30%; left: 25%;"></div>
-        <div class="amino-acid" style="top: 60%; left: 45%;"></div>
-        <div class="amino-acid" style="top: 40%; right: 30%;"></div>
-        <div class="amino-acid" style="bottom: 25%; left: 35%;"></div>
-    </div>
-
-    <!-- Enhanced Page Header -->
-    <header class="page-header">
-        <div class="container">
-            <h1 class="page-title">Advanced Research Media Archive</h1>
-            <p class="page-subtitle">
-                Comprehensive scientific documentation of experimental procedures, 
-                research activities, and analytical results in synthetic biology
-            </p>
-
-            <!-- Enhanced Statistics -->
-            <div class="stats-grid" id="mediaStats">
-                <!-- Statistics will be populated by JavaScript -->
-            </div>
-        </div>
-    </header>
-
-    <main class="container">
-        <!-- Enhanced Human Practices Section -->
-        <section class="section" id="human-practices">
-            <div class="section-header">
-                <h2 class="section-title">
-                    <i class="fas fa-users"></i> Human Practices & Outreach
-                </h2>
-                <p class="section-description lead">
-                    Documentation of <span class="scientific-term">community engagement</span>, 
-                    <span class="scientific-term">stakeholder interactions</span>, and 
-                    <span class="scientific-term">public outreach activities</span> that 
-                    inform and shape our research direction through ethical consideration 
-                    and societal impact analysis.
-                </p>
-            </div>
-
-            <div class="media-grid" id="hp-gallery">
-                {hp_media_html}
-            </div>
-        </section>
-
-        <!-- Enhanced Art & Design Section -->
-        <section class="section" id="art-design">
-            <div class="section-header">
-                <h2 class="section-title">
-                    <i class="fas fa-palette"></i> Scientific Communication & Visualization
-                </h2>
-                <p class="section-description lead">
-                    Advanced <span class="scientific-term">scientific visualizations</span> and 
-                    <span class="scientific-term">design elements</span> that communicate 
-                    complex biological concepts and enhance public understanding of 
-                    <span class="scientific-term">synthetic biology</span> through 
-                    innovative graphical representation.
-                </p>
-            </div>
-
-            <div class="media-grid" id="art-gallery">
-                {art_media_html}
-            </div>
-        </section>
-    </main>
-
-    <!-- Enhanced Page Footer -->
-    <footer class="page-footer">
-        <div class="container">
-            <p class="footer-text">
-                Scientific Media Archive • Automatically Updated: {timestamp} • 
-                iGEM Team Advanced Research Documentation System
-            </p>
-        </div>
-    </footer>
-
-    <!-- Enhanced Image Modal -->
-    <div id="imageModal" class="modal" role="dialog" aria-labelledby="modalCaption" aria-hidden="true">
-        <button class="modal-close" onclick="closeModal()" aria-label="Close scientific analysis">
-            <i class="fas fa-times"></i>
-        </button>
-        <button class="modal-nav modal-prev" onclick="navigateMedia(-1)" aria-label="Previous analysis">
-            <i class="fas fa-chevron-left"></i>
-        </button>
-        <button class="modal-nav modal-next" onclick="navigateMedia(1)" aria-label="Next analysis">
-            <i class="fas fa-chevron-right"></i>
-        </button>
-        <img class="modal-content" id="modalImage" alt="" onload="mediaLoaded()">
-        <div id="modalCaption" class="modal-caption"></div>
-    </div>
-
-    <!-- Enhanced Video Modal -->
-    <div id="videoModal" class="video-modal" role="dialog" aria-labelledby="videoModalCaption" aria-hidden="true">
-        <button class="video-close-btn" onclick="closeVideoModal()" aria-label="Close experimental video">
-            <i class="fas fa-times"></i>
-        </button>
-        <div class="video-modal-content">
-            <video id="modalVideo" controls>
-                Your browser does not support the video tag.
-            </video>
-        </div>
-        <div id="videoModalCaption" class="video-modal-caption"></div>
-    </div>
-
-    <!-- Floating CTA -->
-    <a href="#human-practices" class="floating-cta">
-        <i class="fas fa-microscope"></i>
-        View Research Data
-    </a>
-
-    <script>
-        // ====== ENHANCED INITIALIZATION ======
-        function initMediaData() {{
-            const hpMedia = Array.from(document.querySelectorAll('#hp-gallery .media-card'));
-            const artMedia = Array.from(document.querySelectorAll('#art-gallery .media-card'));
-
-            allMedia = [
-                ...hpMedia.map((card, index) => ({{
-                    element: card,
-                    type: card.classList.contains('video-card') ? 'video' : 'image',
-                    src: card.querySelector('.media-preview').src || card.querySelector('video source').src,
-                    title: card.querySelector('.media-title').textContent,
-                    description: card.querySelector('.media-description p').textContent,
-                    date: card.querySelector('.media-date').textContent.replace('• ', ''),
-                    gallery: 'human-practices',
-                    index: index
-                }})),
-                ...artMedia.map((card, index) => ({{
-                    element: card,
-                    type: card.classList.contains('video-card') ? 'video' : 'image',
-                    src: card.querySelector('.media-preview').src || card.querySelector('video source').src,
-                    title: card.querySelector('.media-title').textContent,
-                    description: card.querySelector('.media-description p').textContent,
-                    date: card.querySelector('.media-date').textContent.replace('• ', ''),
-                    gallery: 'art-design',
-                    index: index + hpMedia.length
-                }}))
-            ];
-
-            updateEnhancedStats();
-            initVideoDurations();
-            initScientificInteractions();
-        }}
-
-        // ====== ENHANCED STATISTICS ======
-        function updateEnhancedStats() {{
-            const hpMedia = allMedia.filter(m => m.gallery === 'human-practices');
-            const artMedia = allMedia.filter(m => m.gallery === 'art-design');
-
-            const hpPhotos = hpMedia.filter(m => m.type === 'image').length;
-            const hpVideos = hpMedia.filter(m => m.type === 'video').length;
-            const artPhotos = artMedia.filter(m => m.type === 'image').length;
-            const totalPhotos = hpPhotos + artPhotos;
-            const totalVideos = hpVideos;
-            const totalMedia = allMedia.length;
-            const currentYear = new Date().getFullYear();
-
-            const statsHTML = 
-                '<div class="stat-card">' +
-                    '<div class="stat-icon">🧬</div>' +
-                    '<div class="stat-number">' + totalMedia + '</div>' +
-                    '<div class="stat-label">Research Datasets</div>' +
-                '</div>' +
-                '<div class="stat-card">' +
-                    '<div class="stat-icon">🔬</div>' +
-                    '<div class="stat-number">' + totalPhotos + '</div>' +
-                    '<div class="stat-label">Experimental Images</div>' +
-                '</div>' +
-                '<div class="stat-card">' +
-                    '<div class="stat-icon">🎥</div>' +
-                    '<div class="stat-number">' + totalVideos + '</div>' +
-                    '<div class="stat-label">Protocol Videos</div>' +
-                '</div>' +
-                '<div class="stat-card">' +
-                    '<div class="stat-icon">📈</div>' +
-                    '<div class="stat-number">' + currentYear + '</div>' +
-                    '<div class="stat-label">Research Year</div>' +
-                '</div>';
-
-            document.getElementById('mediaStats').innerHTML = statsHTML;
-        }}
-
-        // ====== ENHANCED MEDIA VIEWER ======
-        function enlargeImage(btn) {{
-            if (isModalOpen) return;
-            const card = btn.closest('.media-card');
-            openMediaModal(card, 'image');
-        }}
-
-        function playVideo(btn) {{
-            if (isModalOpen) return;
-            const card = btn.closest('.media-card');
-            openMediaModal(card, 'video');
-        }}
-
-        function openMediaModal(card, mediaType) {{
-            currentGallery = card.closest('#hp-gallery') ? 'human-practices' : 'art-design';
-            currentMediaIndex = allMedia.findIndex(m => m.element === card);
-
-            if (currentMediaIndex === -1) {{
-                console.error('Research data not found');
-                return;
-            }}
-
-            if (mediaType === 'image') {{
-                const modal = document.getElementById('imageModal');
-                const modalImg = document.getElementById('modalImage');
-                const caption = document.getElementById('modalCaption');
-
-                modal.style.display = 'flex';
-                modalImg.style.display = 'none';
-                modalImg.src = '';
-                modalImg.alt = allMedia[currentMediaIndex].title;
-
-                modalImg.src = allMedia[currentMediaIndex].src;
-                caption.textContent = allMedia[currentMediaIndex].title + ' • ' + allMedia[currentMediaIndex].date;
-
-                setTimeout(() => {{
-                    modal.classList.add('show');
-                    isModalOpen = true;
-                }}, 10);
-            }} else if (mediaType === 'video') {{
-                const modal = document.getElementById('videoModal');
-                const modalVideo = document.getElementById('modalVideo');
-                const caption = document.getElementById('videoModalCaption');
-
-                modal.style.display = 'flex';
-                modalVideo.src = '';
-                modalVideo.load();
-
-                modalVideo.src = allMedia[currentMediaIndex].src;
-                caption.textContent = allMedia[currentMediaIndex].title + ' • ' + allMedia[currentMediaIndex].date;
-
-                setTimeout(() => {{
-                    modal.classList.add('show');
-                    isModalOpen = true;
-
-                    // Enhanced video playback
-                    modalVideo.play().then(() => {{
-                        console.log('Experimental video analysis started');
-                    }}).catch(e => {{
-                        console.log('Video analysis requires user interaction:', e);
-                    }});
-                }}, 10);
-            }}
-        }}
-
-        function mediaLoaded() {{
-            const modalImg = document.getElementById('modalImage');
-            modalImg.style.display = 'block';
-        }}
-
-        function closeModal() {{
-            const modal = document.getElementById('imageModal');
-            modal.classList.remove('show');
-            isModalOpen = false;
-
-            setTimeout(() => {{
-                modal.style.display = 'none';
-            }}, 400);
-        }}
-
-        function closeVideoModal() {{
-            const modal = document.getElementById('videoModal');
-            const video = document.getElementById('modalVideo');
-
-            video.pause();
-            modal.classList.remove('show');
-            isModalOpen = false;
-
-            setTimeout(() => {{
-                modal.style.display = 'none';
-                video.src = '';
-            }}, 400);
-        }}
-
-        function navigateMedia(direction) {{
-            if (allMedia.length === 0) return;
-
-            currentMediaIndex += direction;
-            if (currentMediaIndex >= allMedia.length) currentMediaIndex = 0;
-            if (currentMediaIndex < 0) currentMediaIndex = allMedia.length - 1;
-
-            const mediaData = allMedia[currentMediaIndex];
-
-            if (mediaData.type === 'image') {{
-                closeVideoModal();
-                const modalImg = document.getElementById('modalImage');
-                const caption = document.getElementById('modalCaption');
-
-                modalImg.style.display = 'none';
-                modalImg.src = mediaData.src;
-                modalImg.alt = mediaData.title;
-                caption.textContent = mediaData.title + ' • ' + mediaData.date;
-            }} else {{
-                closeModal();
-                const modalVideo = document.getElementById('modalVideo');
-                const caption = document.getElementById('videoModalCaption');
-
-                modalVideo.src = mediaData.src;
-                modalVideo.load();
-                caption.textContent = mediaData.title + ' • ' + mediaData.date;
-
-                modalVideo.play().then(() => {{
-                    console.log('Experimental video analysis continued');
-                }}).catch(e => {{
-                    console.log('Video analysis requires user interaction:', e);
-                }});
-            }}
-
-            currentGallery = mediaData.gallery;
-        }}
-
-        // ====== ENHANCED VIDEO DURATION ======
-        function initVideoDurations() {{
-            document.querySelectorAll('video.media-preview').forEach(video => {{
-                video.addEventListener('loadedmetadata', function() {{
-                    const duration = Math.floor(video.duration);
-                    const minutes = Math.floor(duration / 60);
-                    const seconds = duration % 60;
-                    const durationElement = video.parentElement.querySelector('.media-duration');
-                    if (durationElement) {{
-                        durationElement.textContent = minutes + ':' + seconds.toString().padStart(2, '0');
-                    }}
-                }});
-            }});
-        }}
-
-        // ====== SCIENTIFIC INTERACTIONS ======
-        function initScientificInteractions() {{
-            // Add hover effects to scientific elements
-            document.querySelectorAll('.media-card').forEach(card => {{
-                card.addEventListener('mouseenter', function() {{
-                    this.style.zIndex = '10';
-                }});
-
-                card.addEventListener('mouseleave', function() {{
-                    this.style.zIndex = '1';
-                }});
-            }});
-
-            // Add loading animation to images
-            document.querySelectorAll('.media-preview').forEach(img => {{
-                img.addEventListener('load', function() {{
-                    this.style.opacity = '1';
-                    this.style.transform = 'scale(1)';
-                }});
-
-                img.style.opacity = '0';
-                img.style.transform = 'scale(0.95)';
-                img.style.transition = 'opacity 0.5s ease, transform 0.5s ease';
-            }});
-        }}
-
-        // ====== ENHANCED KEYBOARD NAVIGATION ======
-        document.addEventListener('keydown', function(event) {{
-            if (!isModalOpen) return;
-
-            if (event.key === 'Escape') {{
-                const imageModal = document.getElementById('imageModal');
-                const videoModal = document.getElementById('videoModal');
-
-                if (imageModal.classList.contains('show')) {{
-                    closeModal();
-                }} else if (videoModal.classList.contains('show')) {{
-                    closeVideoModal();
-                }}
-            }} else if (event.key === 'ArrowRight') {{
-                navigateMedia(1);
-            }} else if (event.key === 'ArrowLeft') {{
-                navigateMedia(-1);
-            }} else if (event.key === ' ') {{
-                event.preventDefault();
-                const videoModal = document.getElementById('videoModal');
-                const video = document.getElementById('modalVideo');
-                if (videoModal.classList.contains('show')) {{
-                    if (video.paused) {{
-                        video.play();
-                    }} else {{
-                        video.pause();
-                    }}
-                }}
-            }}
-        }});
-
-        // ====== ENHANCED INITIALIZATION ======
-        document.addEventListener('DOMContentLoaded', function() {{
-            initMediaData();
-
-            // Enhanced background click to close modals
-            document.getElementById('imageModal').addEventListener('click', function(event) {{
-                if (event.target === this) {{
-                    closeModal();
-                }}
-            }});
-
-            document.getElementById('videoModal').addEventListener('click', function(event) {{
-                if (event.target === this) {{
-                    closeVideoModal();
-                }}
-            }});
-
-            // Add scroll animations
-            const observerOptions = {{
-                threshold: 0.1,
-                rootMargin: '0px 0px -50px 0px'
-            }};
-
-            const observer = new IntersectionObserver((entries) => {{
-                entries.forEach(entry => {{
-                    if (entry.isIntersecting) {{
-                        entry.target.style.opacity = '1';
-                        entry.target.style.transform = 'translateY(0)';
-                    }}
-                }});
-            }}, observerOptions);
-
-            document.querySelectorAll('.section, .stat-card').forEach(el => {{
-                el.style.opacity = '0';
-                el.style.transform = 'translateY(30px)';
-                el.style.transition = 'opacity 0.6s ease, transform 0.6s ease';
-                observer.observe(el);
-            }});
-        }});
-
-        // Global variables
-        let allMedia = [];
-        let currentMediaIndex = 0;
-        let currentGallery = '';
-        let isModalOpen = false;
-    </script>
-</body>
-</html>'''
-
-
-def main():
-    """主函数：构建增强版科学风格网站"""
-    print("🧬 Building Advanced Nature-Style Research Media Archive...")
-
-    # 定义媒体类型
-    image_types = ['*.jpg', '*.jpeg', '*.png', '*.gif', '*.webp', '*.tiff', '*.bmp']
-    video_types = ['*.mp4', '.avi', '.mov', '.wmv', '.flv', '.webm', '.mkv']
-    all_media_types = image_types + video_types
-
-    # 扫描媒体目录
-    print("🔍 Scanning for scientific research media files...")
-    art_media = get_media_files('ART', all_media_types)
-    hp_media = get_media_files('HP', all_media_types)
-
-    # 统计信息
-    art_images = len([m for m in art_media if is_image_file(m)])
-    hp_images = len([m for m in hp_media if is_image_file(m)])
-    hp_videos = len([m for m in hp_media if is_video_file(m)])
-
-    print(f"🎨 Found {art_images} scientific visualization assets")
-    print(f"📸 Found {hp_images} experimental documentation images")
-    print(f"🎥 Found {hp_videos} protocol video records")
-    print(f"📊 Total: {len(art_media) + len(hp_media)} research datasets")
-
-    # 生成媒体HTML
-    art_html = generate_media_html(art_media, 'art-design')
-    hp_html = generate_media_html(hp_media, 'human-practices')
-
-    # 创建时间戳
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-    # 生成集成版本HTML
-    integrated_html = create_hp_integrated_html(hp_html, art_html, timestamp)
-
-    # 写入文件
-    with open('gallery.html', 'w', encoding='utf-8') as f:
-        f.write(integrated_html)
+from build_cache import CACHE_DIR, load_json, params_hash, save_json, to_url, write_text
+from build_checkpoint import checkpoint, checkpoint_path, finish_checkpoint, load_checkpoint, open_checkpoint
+from content_hash import HASH_WORKERS, file_hash, load_hash_cache, save_hash_cache, use_git_index
+from derivative_pack import PACK_DIR, close_pack, open_pack, pack_derivatives, unpack_task
+from dist_stage import DIST_DIR, stage_dist
+from embed_snippet import SNIPPET_FILE, SNIPPET_MAX_BYTES, write_snippet
+from gallery_targets import TARGETS_FILE, load_targets, scan_sections, single_target
+from git_objects import CHANGE_LABELS, changes_since, head_commit
+from image_stage import OPTIMIZE_PARAMS, accepts_image, optimize_task, pillow_available, report_image_savings
+from media_catalog import (changed_since, duplicate_groups, known_metadata, last_built_commit, media_rows,
+                           open_catalog, record_build)
+from media_feed import FEED_DIR, MANIFEST_FILE, write_media_feed
+from media_metadata import metadata_task
+from media_types import (detect_media_type, is_image_file, is_video_file, is_web_playable, load_type_cache,
+                         media_mime, save_type_cache)
+from mp4_faststart import faststart_task
+from pipeline import run_pipeline, stage
+from remote_cache import close_remote, fetch_task, list_remote, open_remote, upload_derivatives
+from search_index import SEARCH_DIR, build_search_index
+from service_worker import SERVICE_WORKER_FILE, write_service_worker
+from source_dates import (REPRODUCIBLE_TZ, build_time, catalog_times, content_times, source_date_epoch,
+                          stamp_outputs)
+from shard_build import (SHARD_DIR, load_partials, merge_task, merged_kinds, parse_shard, scan_fingerprint,
+                         shard_task, write_partial)
+from stage_inputs import (STAGE_OUTPUTS, explain_tally, input_change, load_stage_records, reusing_stage,
+                          save_stage_records, stage_inputs, stage_record)
+from video_stage import WEBM_CODECS, find_ffmpeg, ladder_params, transcode_task
+
+
+SECTIONS_CONFIG = 'sections.json'
+SECTION_CACHE_DIR = os.path.join(CACHE_DIR, 'sections')
+SECTION_SORTS = ('name', 'name-desc', 'date', 'date-desc')
+
+PAGE_FILE = 'gallery.html'
+BUILD_MANIFEST = 'build-manifest.json'
+# 渲染阶段的代码（含页面模板）所在模块，任何一个改动都会重新渲染
+RENDER_MODULES = (__name__, 'search_index', 'media_feed', 'service_worker', 'embed_snippet', 'dist_stage',
+                  'gallery_targets')
+# 低配模式：设备内存不超过该值（GB）时自动使用静态装饰
+LITE_MAX_DEVICE_MEMORY = 2
+# 页面上日期的时区：None 为构建机器的本地时区，可复现构建（--reproducible）中为UTC
+DISPLAY_TZ = None
+
+# 动态科学装饰元素；低配模式下改为空闲时在一个canvas上绘制的静态图
+SCIENCE_DECORATIONS_HTML = '''    <!-- Enhanced Scientific Elements -->
+    <div class="science-element dna-helix">
+        <div class="dna-strand"></div>
+        <div class="dna-base blue" style="top: 15%"></div>
+        <div class="dna-base green" style="top: 30%"></div>
+        <div class="dna-base purple" style="top: 45%"></div>
+        <div class="dna-base blue" style="top: 60%"></div>
+        <div class="dna-base green" style="top: 75%"></div>
+        <div class="dna-base purple" style="top: 90%"></div>
+    </div>
 
-    print("✅ Advanced Nature-Style Research Media Archive built successfully!")
-    print("📄 Generated: gallery.html")
-    print("🎯 Enhanced Scientific Features:")
-    print("   - 🧬 Enhanced DNA helix with multiple colors and animations")
-    print("   - 🔬 Advanced cell structure with organelles")
-    print("   - ⚛️  Molecular clusters with chemical bonds")
-    print("   - 🌀 Protein folding animations")
-    print("   - 🎨 Enhanced Nature journal color palette")
-    print("   - 📐 Improved layout and typography")
-    print("   - ✨ Enhanced hover effects and transitions")
-    print("   - 📱 Better responsive design")
-    print("   - 🔍 Improved scientific terminology")
-    print("   - 🎯 Floating CTA for better navigation")
+    <div class="science-element cell-structure">
+        <div class="cell-membrane"></div>
+        <div class="nucleus"></div>
+        <div class="organelle mitochondria" style="top: 20%; left: 20%;"></div>
+        <div class="organelle ribosome" style="bottom: 30%; right: 25%;"></div>
+        <div class="organelle golgi" style="top: 60%; left: 15%;"></div>
+    </div>
 
+    <div class="science-element molecule-cluster">
+        <div class="molecule atom-large" style="top: 40%; left: 40%;"></div>
+        <div class="molecule atom-medium" style="top: 20%; left: 60%;"></div>
+        <div class="molecule atom-small" style="bottom: 30%; right: 40%;"></div>
+        <div class="molecule atom-medium" style="bottom: 20%; left: 30%;"></div>
+        <div class="chemical-bond" style="top: 45%; left: 42%; width: 50px; transform: rotate(45deg);"></div>
+        <div class="chemical-bond" style="top: 25%; left: 55%; width: 40px; transform: rotate(120deg);"></div>
+    </div>
 
-if __name__ == "__main__":
-    main()
-def get_media_files(directory, media_types):
-    """扫描目录中的媒体文件（图片和视频）"""
+    <div class="science-element protein-folding">
+        <div class="protein-chain"></div>
+        <div class="amino-acid" style="top: 30%; left: 25%;"></div>
+        <div class="amino-acid" style="top: 60%; left: 45%;"></div>
+        <div class="amino-acid" style="top: 40%; right: 30%;"></div>
+        <div class="amino-acid" style="bottom: 25%; left: 35%;"></div>
+    </div>
+'''
+
+# 预缓存首屏可见的前若干张图片，总大小不超过预算（未优化的原图可能很大）
+FIRST_SCREEN_ITEMS = 12
+FIRST_SCREEN_MAX_BYTES = 16 * 1024 * 1024
+
+# 没有 sections.json 时使用的默认分区
+DEFAULT_SECTIONS = [
+    {'id': 'human-practices', 'root': 'HP', 'title': 'Human Practices & Outreach', 'icon': 'fas fa-users'},
+    {'id': 'art-design', 'root': 'ART', 'title': 'Scientific Communication & Visualization',
+     'icon': 'fas fa-palette'},
+]
+
+
+def load_sections(config_path=SECTIONS_CONFIG):
+    """读取分区配置（root、标题、排序方式、每页数量），并补全默认值"""
+    config = load_json(config_path) if os.path.exists(config_path) else {'sections': DEFAULT_SECTIONS}
+    if not config or not config.get('sections'):
+        raise SystemExit(f"❌ {config_path} must define a non-empty \"sections\" list")
+
+    sections = []
+    seen_ids = set()
+    for raw in config['sections']:
+        missing = [key for key in ('id', 'root', 'title') if not raw.get(key)]
+        if missing:
+            raise SystemExit(f"❌ Section {raw!r} is missing {', '.join(missing)}")
+        section = {'icon': 'fas fa-images', 'description': '', 'sort': 'name', 'page_size': 0}
+        section.update(raw)
+        if section['id'] in seen_ids:
+            raise SystemExit(f"❌ Duplicate section id: {section['id']}")
+        if section['sort'] not in SECTION_SORTS:
+            raise SystemExit(f"❌ Section {section['id']}: sort must be one of {', '.join(SECTION_SORTS)}")
+        seen_ids.add(section['id'])
+        sections.append(section)
+    return sections
+
+
+def sort_media(media_files, sort_order, file_times=None):
+    """按分区配置的方式排序；file_times 为各文件的日期，没有时按文件修改时间"""
+    if sort_order.startswith('date'):
+        if file_times is None:
+            file_times = {m: os.path.getmtime(m) for m in media_files}
+        return sorted(media_files, key=lambda m: (file_times[m], m), reverse=sort_order == 'date-desc')
+    return sorted(media_files, reverse=sort_order == 'name-desc')
+
+
+def scan_section(section):
+    """扫描单个分区；每个分区有独立的增量缓存，目录未变化时直接复用上次的列表"""
+    cache_path = os.path.join(SECTION_CACHE_DIR, f"{section['id']}.json")
+    cache = load_json(cache_path, {})
+    cached_dirs = cache.get('dirs', {}) if cache.get('root') == section['root'] else {}
+
+    scanned_dirs = {}
     media_files = []
-    for pattern in media_types:
-        full_pattern = os.path.join(directory, '**', pattern)
-        media_files.extend(glob.glob(full_pattern, recursive=True))
-
-    # 转换为相对路径并排序
-    media_files = [os.path.relpath(f) for f in media_files]
-    return sorted(media_files)
-
-
-def is_video_file(filename):
-    """检查文件是否为视频格式"""
-    video_extensions = ('.mp4', '.avi', '.mov', '.wmv', '.flv', '.webm', '.mkv')
-    return filename.lower().endswith(video_extensions)
+    reused = 0
+    pending = [section['root']]
+    while pending:
+        directory = pending.pop()
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            continue
+
+        # 目录的修改时间只在增删/重命名条目时变化，未变化即可跳过列目录和类型识别
+        entry = cached_dirs.get(directory)
+        if entry and entry['mtime'] == mtime:
+            reused += 1
+        else:
+            entry = {'mtime': mtime, 'subdirs': [], 'media': []}
+            with os.scandir(directory) as items:
+                for item in sorted(items, key=lambda i: i.name):
+                    if item.name.startswith('.'):
+                        continue
+                    if item.is_dir():
+                        entry['subdirs'].append(item.path)
+                    elif item.is_file() and detect_media_type(item.path):
+                        entry['media'].append(item.name)
+
+        scanned_dirs[directory] = entry
+        media_files.extend(os.path.join(directory, name) for name in entry['media'])
+        pending.extend(entry['subdirs'])
+
+    if scanned_dirs != cached_dirs:
+        save_json(cache_path, {'root': section['root'], 'dirs': scanned_dirs})
+    return sort_media(media_files, section['sort']), reused, len(scanned_dirs)
+
+
+async def stream_sections(sections, section_media):
+    """并发扫描所有分区（慢速挂载盘上的目录不会互相阻塞），每个分区扫描完就把其中的文件送入流水线"""
+    async def scan(section):
+        return section, await asyncio.to_thread(scan_section, section)
+
+    for next_scan in asyncio.as_completed([scan(section) for section in sections]):
+        section, (media_files, reused, total_dirs) = await next_scan
+        section_media[section['id']] = media_files
+        images = len([m for m in media_files if is_image_file(m)])
+        videos = len([m for m in media_files if is_video_file(m)])
+        print(f"   📁 {section['title']} ({section['root']}/): {images} images, {videos} videos"
+              f" [{reused}/{total_dirs} directories unchanged]")
+        for media_path in media_files:
+            media_type = detect_media_type(media_path)
+            yield {'path': media_path, 'section': section['id'], 'type': media_type.name,
+                   'kind': media_type.kind, 'derivatives': {}, 'log': []}
+
+
+def filter_playable(media_files, media_derivatives):
+    """剔除浏览器无法播放且没有可用转码的文件，避免下载后才失败"""
+    playable = []
+    for media_path in media_files:
+        media_type = detect_media_type(media_path)
+        if is_web_playable(media_path) or 'video' in media_derivatives.get(media_path, {}):
+            playable.append(media_path)
+        else:
+            print(f"   ⚠️  Skipping {media_path}: {media_type.mime} cannot be displayed by browsers")
+    return playable
+
+
+def read_caption(media_path):
+    """读取同名的 .txt 说明文件（例如 HP/IMG_001.jpg 对应 HP/IMG_001.txt）"""
+    caption_path = os.path.splitext(media_path)[0] + '.txt'
+    try:
+        with open(caption_path, 'r', encoding='utf-8') as f:
+            return ' '.join(f.read().split())
+    except (OSError, UnicodeDecodeError):
+        return ''
+
+
+def describe_media(media_path, file_time=None):
+    """生成媒体的标题、日期和说明文字；file_time 为文件的日期（见 source_dates）"""
+    # 获取文件名（不含扩展名）作为默认描述
+    filename = os.path.splitext(os.path.basename(media_path))[0]
+    # 将下划线替换为空格并首字母大写
+    title = filename.replace('_', ' ').title()
+
+    # 获取文件修改时间（创建时间随检出和硬链接变化）
+    if file_time is None:
+        file_time = os.path.getmtime(media_path)
+    date_str = datetime.fromtimestamp(file_time, DISPLAY_TZ).strftime("%b %d, %Y")
+
+    return {'title': title, 'filename': os.path.basename(media_path), 'date': date_str,
+            'timestamp': file_time, 'caption': read_caption(media_path)}
+
+
+def build_media_records(sections, section_media, catalog_rows, file_times):
+    """为所有分区中的媒体分配全局编号并生成描述信息（供卡片和搜索索引使用）；文件信息来自目录库，日期来自 file_times"""
+    records = {}
+    for section in sections:
+        for media_path in section_media[section['id']]:
+            row = catalog_rows[media_path]
+            record = describe_media(media_path, file_times[media_path])
+            record.update(id=len(records), path=media_path, section=section['id'],
+                          section_title=section['title'], kind=row['kind'], bytes=row['bytes'],
+                          month=datetime.fromtimestamp(record['timestamp'], DISPLAY_TZ).strftime('%Y-%m'))
+            records[media_path] = record
+    return records
+
+
+def build_facets(media_records):
+    """预先计算分面统计（分区 × 类型 × 月份）、总字节数、日期范围和预排序的编号数组"""
+    records = list(media_records.values())
+    cube = {}
+    for record in records:
+        key = (record['section'], record['kind'], record['month'])
+        cube[key] = cube.get(key, 0) + 1
+
+    by_type = {}
+    by_month = {}
+    for (_, kind, month), count in cube.items():
+        by_type[kind] = by_type.get(kind, 0) + count
+        by_month[month] = by_month.get(month, 0) + count
+
+    timestamps = [record['timestamp'] for record in records]
+    date_range = [datetime.fromtimestamp(t, DISPLAY_TZ).strftime('%Y-%m-%d')
+                  for t in (min(timestamps), max(timestamps))] if timestamps else None
+
+    return {
+        'total': len(records),
+        'bytes': sum(record['bytes'] for record in records),
+        'dateRange': date_range,
+        'byType': by_type,
+        'byMonth': dict(sorted(by_month.items(), reverse=True)),
+        'cube': [[section, kind, month, count] for (section, kind, month), count in sorted(cube.items())],
+        # 排序方向与页面选项一致：日期新到旧、名称升序、大小从大到小
+        'order': {
+            'date': [r['id'] for r in sorted(records, key=lambda r: (-r['timestamp'], r['id']))],
+            'name': [r['id'] for r in sorted(records, key=lambda r: (r['title'].lower(), r['id']))],
+            'size': [r['id'] for r in sorted(records, key=lambda r: (-r['bytes'], r['id']))],
+        },
+    }
+
+
+def generate_toolbar_html(facets):
+    """生成筛选/排序工具栏，选项中的数量直接来自构建期统计"""
+    type_labels = {'image': 'Images', 'video': 'Videos'}
+    type_options = ''.join(
+        f'<option value="{kind}">{label} ({facets["byType"][kind]})</option>'
+        for kind, label in type_labels.items() if kind in facets['byType'])
+    month_options = ''.join(
+        f'<option value="{month}">{datetime.strptime(month, "%Y-%m").strftime("%b %Y")} ({count})</option>'
+        for month, count in facets['byMonth'].items())
+
+    return f'''
+        <div class="archive-toolbar" role="toolbar" aria-label="Filter and sort research media">
+            <label>Type
+                <select id="filterType"><option value="">All ({facets['total']})</option>{type_options}</select>
+            </label>
+            <label>Month
+                <select id="filterMonth"><option value="">All months</option>{month_options}</select>
+            </label>
+            <label>Sort
+                <select id="sortOrder">
+                    <option value="">Default</option>
+                    <option value="date">Newest first</option>
+                    <option value="name">Name</option>
+                    <option value="size">Largest first</option>
+                </select>
+            </label>
+            <span class="filter-status" id="filterStatus" aria-live="polite"></span>
+        </div>
+'''
 
 
-def is_image_file(filename):
-    """检查文件是否为图片格式"""
-    image_extensions = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.tiff')
-    return filename.lower().endswith(image_extensions)
+def card_source(media_path, media_derivatives):
+    """返回卡片预览实际使用的 (URL, MIME类型)"""
+    derivatives = media_derivatives.get(media_path, {})
+    if is_video_file(media_path):
+        # 转码阶梯可用时，卡片预览使用最低档，弹窗再按视口和带宽选择
+        if 'video' in derivatives:
+            return derivatives['video']['renditions'][0]['mp4'], 'video/mp4'
+        return derivatives.get('faststart', media_path), media_mime(media_path)
+    # 优化后的派生图与原图内容一致但体积更小，网格和弹窗都使用它；格式可能不同（如PNG转为WebP），类型按实际文件识别
+    source = derivatives.get('optimized', media_path)
+    return source, media_mime(source)
 
 
-def generate_media_html(media_files, category):
+def generate_media_html(media_files, category, media_derivatives=None, folder=None, media_records=None):
     """为媒体文件列表生成HTML代码 - 增强科学风格"""
+    media_derivatives = media_derivatives or {}
+    media_records = media_records or {}
     if not media_files:
         return f'''
         <div class="empty-state">
             <div class="empty-icon">🔬</div>
             <h3>No {category} Data Available</h3>
-            <p>Add experimental documentation to the {category.upper()}/ folder to see them displayed here.</p>
+            <p>Add experimental documentation to the {folder or category.upper()}/ folder to see them displayed here.</p>
         </div>
         '''
 
     html_parts = []
 
     for media_path in media_files:
-        # 获取文件名（不含扩展名）作为默认描述
-        filename = os.path.splitext(os.path.basename(media_path))[0]
-        # 将下划线替换为空格并首字母大写
-        description = filename.replace('_', ' ').title()
-
-        # 获取文件创建时间
-        file_time = os.path.getctime(media_path)
-        from datetime import datetime
-        date_str = datetime.fromtimestamp(file_time).strftime("%b %d, %Y")
+        record = media_records.get(media_path) or describe_media(media_path)
+        description = record['title']
+        date_str = record['date']
+        caption = html.escape(record['caption'])
+        id_attr = ''
+        if 'id' in record:
+            id_attr = f' data-media-id="{record["id"]}" data-kind="{record["kind"]}" data-month="{record["month"]}"'
 
         if is_video_file(media_path):
+            video_info = media_derivatives.get(media_path, {}).get('video')
+            preview_src, preview_type = card_source(media_path, media_derivatives)
+            video_attrs = ''
+            if video_info:
+                video_attrs = f' data-renditions="{html.escape(json.dumps(video_info, ensure_ascii=False))}"'
+
             # 视频卡片 - 增强科学风格
             media_html = f'''
-            <div class="media-card video-card">
+            <div class="media-card video-card"{id_attr}{video_attrs}>
                 <div class="media-thumbnail">
                     <video class="media-preview" preload="metadata" aria-label="Experimental video: {description}">
-                        <source src="{media_path}" type="video/mp4">
+                        <source src="{preview_src}" type="{preview_type}">
                         Your browser does not support the video tag.
                     </video>
                     <div class="media-overlay">
-                        <button class="media-action-btn play-btn" onclick="playVideo(this)" aria-label="Play experimental video: {description}">
+                        <button class="media-action-btn play-btn" aria-label="Play experimental video: {description}">
                             <span class="action-icon">🎬</span>
                             <span class="action-text">Analyze Video</span>
                         </button>
@@ -1858,19 +380,24 @@ def generate_media_html(media_files, category):
                         <span class="media-date">• {date_str}</span>
                     </div>
                     <div class="media-description">
-                        <p><i class="fas fa-flask"></i> Documentation of experimental procedure with detailed protocol analysis.</p>
+                        <p><i class="fas fa-flask"></i> {caption or 'Documentation of experimental procedure with detailed protocol analysis.'}</p>
                     </div>
                 </div>
             </div>
             '''
         else:
+            image_src = card_source(media_path, media_derivatives)[0]
+            # 弹窗按视口和DPR从这些较小的档位中选择，最大一档即 image_src
+            modal_sizes = media_derivatives.get(media_path, {}).get('modal_sizes')
+            sizes_attr = f' data-sizes="{html.escape(json.dumps(modal_sizes))}"' if modal_sizes else ''
+
             # 图片卡片 - 增强科学风格
             media_html = f'''
-            <div class="media-card">
+            <div class="media-card"{id_attr}{sizes_attr}>
                 <div class="media-thumbnail">
-                    <img src="{media_path}" alt="{description}" class="media-preview" loading="lazy">
+                    <img src="{image_src}" alt="{description}" class="media-preview" loading="lazy">
                     <div class="media-overlay">
-                        <button class="media-action-btn view-btn" onclick="enlargeImage(this)" aria-label="Analyze image: {description}">
+                        <button class="media-action-btn view-btn" aria-label="Analyze image: {description}">
                             <span class="action-icon">🔍</span>
                             <span class="action-text">Preview image</span>
                         </button>
@@ -1883,7 +410,7 @@ def generate_media_html(media_files, category):
                         <span class="media-date">• {date_str}</span>
                     </div>
                     <div class="media-description">
-                        <p><i class="fas fa-dna"></i> Visual documentation of research activities and experimental results analysis.</p>
+                        <p><i class="fas fa-dna"></i> {caption or 'Visual documentation of research activities and experimental results analysis.'}</p>
                     </div>
                 </div>
             </div>
@@ -1894,12 +421,79 @@ def generate_media_html(media_files, category):
     return '\n'.join(html_parts)
 
 
-def create_hp_integrated_html(hp_media_html, art_media_html, timestamp):
+def generate_section_html(section, media_files, media_derivatives, media_records=None):
+    """根据分区配置生成 <section> 区块；超出每页数量的卡片放入 <template> 按需加载"""
+    page_size = section['page_size'] or len(media_files) or 1
+    pages = [media_files[i:i + page_size] for i in range(0, len(media_files), page_size)] or [[]]
+    first_page = generate_media_html(pages[0], section['id'], media_derivatives, folder=section['root'],
+                                     media_records=media_records)
+    more_html = ''
+    if len(pages) > 1:
+        templates = '\n'.join(
+            f'<template class="media-page">{generate_media_html(page, section["id"], media_derivatives, media_records=media_records)}</template>'
+            for page in pages[1:])
+        remaining = len(media_files) - len(pages[0])
+        more_html = f'''
+            {templates}
+            <div class="load-more">
+                <button class="media-action-btn load-more-btn" data-action="load-more" data-section="{section['id']}" data-remaining="{remaining}">
+                    <span class="action-icon">🧫</span>
+                    <span class="action-text">Load more ({remaining} remaining)</span>
+                </button>
+            </div>'''
+
+    return f'''
+        <section class="section" id="{section['id']}">
+            <div class="section-header">
+                <h2 class="section-title">
+                    <i class="{section['icon']}"></i> {html.escape(section['title'])}
+                </h2>
+                <p class="section-description lead">
+                    {section['description']}
+                </p>
+            </div>
+
+            <div class="media-grid" id="{section['id']}-gallery" data-section="{section['id']}">
+                {first_page}
+            </div>{more_html}
+        </section>
+'''
+
+
+def perf_tier_script():
+    """运行时选择性能档位：?perf=lite|full 可手动切换并记住，否则按减少动态效果偏好和设备内存判断"""
+    return f'''
+    <script>
+        // Performance tier: lite replaces the animated decorations with one static canvas
+        (function() {{
+            let tier = new URLSearchParams(location.search).get('perf');
+            try {{
+                if (tier === 'lite' || tier === 'full') localStorage.setItem('galleryPerfTier', tier);
+                else tier = localStorage.getItem('galleryPerfTier');
+            }} catch (error) {{
+                // Storage may be unavailable (private mode); fall back to detection
+            }}
+            if (tier !== 'lite' && tier !== 'full') {{
+                const reducedMotion = window.matchMedia('(prefers-reduced-motion: reduce)').matches;
+                const lowMemory = navigator.deviceMemory !== undefined && navigator.deviceMemory <= {LITE_MAX_DEVICE_MEMORY};
+                tier = reducedMotion || lowMemory ? 'lite' : 'full';
+            }}
+            if (tier === 'lite') document.documentElement.classList.add('perf-lite');
+        }})();
+    </script>'''
+
+
+def create_hp_integrated_html(sections_html, timestamp, cta_target, search_meta, toolbar_html, facets_json,
+                              service_worker_url='', lite=False):
     """创建集成到Human Practices的HTML - 增强科学元素和动态效果"""
+    # --lite 构建固定使用低配档位，不输出动态装饰元素
+    html_class = ' class="perf-lite"' if lite else ''
+    decorations_html = '' if lite else SCIENCE_DECORATIONS_HTML
+    tier_script = '' if lite else perf_tier_script()
     return f'''<!DOCTYPE html>
-<html lang="en">
+<html lang="en"{html_class}>
 <head>
-    <meta charset="UTF-8">
+    <meta charset="UTF-8">{tier_script}
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Advanced Research Media Archive - Scientific Documentation | iGEM Team</title>
     <meta name="description" content="Advanced scientific archive of research documentation, experimental procedures, and scientific analysis.">
@@ -2351,6 +945,69 @@ def create_hp_integrated_html(hp_media_html, art_media_html, timestamp):
             line-height: 1.6;
         }}
 
+        /* ====== ARCHIVE SEARCH ====== */
+        .archive-search {{
+            position: relative;
+            max-width: 640px;
+            margin: var(--space-xl) auto 0;
+        }}
+
+        .archive-search input {{
+            width: 100%;
+            padding: var(--space-md) var(--space-lg);
+            border: 2px solid var(--border-color);
+            border-radius: 50px;
+            font-size: 1.1rem;
+            background: var(--bg-white);
+            box-shadow: var(--shadow-md);
+        }}
+
+        .archive-search input:focus {{
+            outline: none;
+            border-color: var(--enzyme-green);
+        }}
+
+        .search-results {{
+            position: absolute;
+            top: calc(100% + var(--space-sm));
+            left: 0;
+            right: 0;
+            z-index: 2000;
+            max-height: 60vh;
+            overflow-y: auto;
+            background: var(--bg-white);
+            border: 1px solid var(--border-color);
+            border-radius: 12px;
+            box-shadow: var(--shadow-lg);
+            text-align: left;
+        }}
+
+        .search-result {{
+            display: block;
+            width: 100%;
+            padding: var(--space-sm) var(--space-lg);
+            border: none;
+            border-bottom: 1px solid var(--border-color);
+            background: none;
+            text-align: left;
+            cursor: pointer;
+            font: inherit;
+        }}
+
+        .search-result:hover, .search-result:focus {{
+            background: var(--bg-light);
+        }}
+
+        .search-result small, .search-status {{
+            display: block;
+            color: var(--nature-secondary);
+        }}
+
+        .search-status {{
+            padding: var(--space-sm) var(--space-lg);
+            font-size: 0.9rem;
+        }}
+
         .section {{
             margin-bottom: var(--space-xxxl);
             padding: var(--space-xxl) 0;
@@ -2422,6 +1079,7 @@ def create_hp_integrated_html(hp_media_html, art_media_html, timestamp):
             transform: translateY(-8px) scale(1.02);
             box-shadow: var(--shadow-lg);
             border-color: var(--enzyme-green);
+            z-index: 10;
         }}
 
         .media-card:hover::before {{
@@ -2446,6 +1104,11 @@ def create_hp_integrated_html(hp_media_html, art_media_html, timestamp):
             transform: scale(1.08);
         }}
 
+        .media-grid.reveal-previews .media-preview:not(.is-loaded) {{
+            opacity: 0;
+            transform: scale(0.95);
+        }}
+
         .media-overlay {{
             position: absolute;
             top: 0;
@@ -2642,6 +1305,37 @@ def create_hp_integrated_html(hp_media_html, art_media_html, timestamp):
             opacity: 0.5;
         }}
 
+        /* ====== FILTER & SORT TOOLBAR ====== */
+        .archive-toolbar {{
+            display: flex;
+            flex-wrap: wrap;
+            align-items: center;
+            gap: var(--space-lg);
+            padding: var(--space-lg) 0;
+            color: var(--nature-secondary);
+            font-weight: 600;
+        }}
+
+        .archive-toolbar select {{
+            margin-left: var(--space-sm);
+            padding: var(--space-sm) var(--space-md);
+            border: 2px solid var(--border-color);
+            border-radius: 8px;
+            background: var(--bg-white);
+            font: inherit;
+        }}
+
+        .media-card.is-filtered {{
+            display: none;
+        }}
+
+        /* ====== SECTION PAGINATION ====== */
+        .load-more {{
+            display: flex;
+            justify-content: center;
+            margin-top: var(--space-xl);
+        }}
+
         /* ====== ENHANCED MODAL STYLES ====== */
         .modal {{
             display: none;
@@ -3029,48 +1723,41 @@ def create_hp_integrated_html(hp_media_html, art_media_html, timestamp):
             0%, 100% {{ transform: translateY(0px); }}
             50% {{ transform: translateY(-10px); }}
         }}
+
+        /* ====== LITE PERFORMANCE TIER ====== */
+        .perf-lite .science-element {{
+            display: none;
+        }}
+
+        .perf-lite *,
+        .perf-lite *::before,
+        .perf-lite *::after {{
+            backdrop-filter: none !important;
+            -webkit-backdrop-filter: none !important;
+        }}
+
+        .perf-lite .media-card,
+        .perf-lite .floating-cta {{
+            animation: none;
+        }}
+
+        .science-canvas {{
+            position: fixed;
+            top: 0;
+            left: 0;
+            width: 100%;
+            height: 100%;
+            z-index: -1;
+            opacity: 0.25;
+            pointer-events: none;
+        }}
     </style>
 </head>
 <body>
     <!-- Enhanced Scientific Background -->
     <div class="scientific-background"></div>
 
-    <!-- Enhanced Scientific Elements -->
-    <div class="science-element dna-helix">
-        <div class="dna-strand"></div>
-        <div class="dna-base blue" style="top: 15%"></div>
-        <div class="dna-base green" style="top: 30%"></div>
-        <div class="dna-base purple" style="top: 45%"></div>
-        <div class="dna-base blue" style="top: 60%"></div>
-        <div class="dna-base green" style="top: 75%"></div>
-        <div class="dna-base purple" style="top: 90%"></div>
-    </div>
-
-    <div class="science-element cell-structure">
-        <div class="cell-membrane"></div>
-        <div class="nucleus"></div>
-        <div class="organelle mitochondria" style="top: 20%; left: 20%;"></div>
-        <div class="organelle ribosome" style="bottom: 30%; right: 25%;"></div>
-        <div class="organelle golgi" style="top: 60%; left: 15%;"></div>
-    </div>
-
-    <div class="science-element molecule-cluster">
-        <div class="molecule atom-large" style="top: 40%; left: 40%;"></div>
-        <div class="molecule atom-medium" style="top: 20%; left: 60%;"></div>
-        <div class="molecule atom-small" style="bottom: 30%; right: 40%;"></div>
-        <div class="molecule atom-medium" style="bottom: 20%; left: 30%;"></div>
-        <div class="chemical-bond" style="top: 45%; left: 42%; width: 50px; transform: rotate(45deg);"></div>
-        <div class="chemical-bond" style="top: 25%; left: 55%; width: 40px; transform: rotate(120deg);"></div>
-    </div>
-
-    <div class="science-element protein-folding">
-        <div class="protein-chain"></div>
-        <div class="amino-acid" style="top: 30%; left: 25%;"></div>
-        <div class="amino-acid" style="top: 60%; left: 45%;"></div>
-        <div class="amino-acid" style="top: 40%; right: 30%;"></div>
-        <div class="amino-acid" style="bottom: 25%; left: 35%;"></div>
-    </div>
-
+{decorations_html}
     <!-- Enhanced Page Header -->
     <header class="page-header">
         <div class="container">
@@ -3080,6 +1767,13 @@ def create_hp_integrated_html(hp_media_html, art_media_html, timestamp):
                 research activities, and analytical results in synthetic biology
             </p>
 
+            <!-- Archive Search (index is fetched when the box is focused) -->
+            <div class="archive-search" role="search">
+                <input type="search" id="archiveSearch" placeholder="Search titles, file names, dates, sections…"
+                       autocomplete="off" aria-label="Search the media archive" aria-controls="searchResults">
+                <div class="search-results" id="searchResults" hidden></div>
+            </div>
+
             <!-- Enhanced Statistics -->
             <div class="stats-grid" id="mediaStats">
                 <!-- Statistics will be populated by JavaScript -->
@@ -3088,45 +1782,8 @@ def create_hp_integrated_html(hp_media_html, art_media_html, timestamp):
     </header>
 
     <main class="container">
-        <!-- Enhanced Human Practices Section -->
-        <section class="section" id="human-practices">
-            <div class="section-header">
-                <h2 class="section-title">
-                    <i class="fas fa-users"></i> Human Practices & Outreach
-                </h2>
-                <p class="section-description lead">
-                    Documentation of <span class="scientific-term">community engagement</span>, 
-                    <span class="scientific-term">stakeholder interactions</span>, and 
-                    <span class="scientific-term">public outreach activities</span> that 
-                    inform and shape our research direction through ethical consideration 
-                    and societal impact analysis.
-                </p>
-            </div>
-
-            <div class="media-grid" id="hp-gallery">
-                {hp_media_html}
-            </div>
-        </section>
-
-        <!-- Enhanced Art & Design Section -->
-        <section class="section" id="art-design">
-            <div class="section-header">
-                <h2 class="section-title">
-                    <i class="fas fa-palette"></i> Scientific Communication & Visualization
-                </h2>
-                <p class="section-description lead">
-                    Advanced <span class="scientific-term">scientific visualizations</span> and 
-                    <span class="scientific-term">design elements</span> that communicate 
-                    complex biological concepts and enhance public understanding of 
-                    <span class="scientific-term">synthetic biology</span> through 
-                    innovative graphical representation.
-                </p>
-            </div>
-
-            <div class="media-grid" id="art-gallery">
-                {art_media_html}
-            </div>
-        </section>
+{toolbar_html}
+{sections_html}
     </main>
 
     <!-- Enhanced Page Footer -->
@@ -3168,57 +1825,159 @@ def create_hp_integrated_html(hp_media_html, art_media_html, timestamp):
     </div>
 
     <!-- Floating CTA -->
-    <a href="#human-practices" class="floating-cta">
+    <a href="#{cta_target}" class="floating-cta">
         <i class="fas fa-microscope"></i>
         View Research Data
     </a>
 
+    <script type="application/json" id="searchMeta">{search_meta}</script>
+    <script type="application/json" id="galleryFacets">{facets_json}</script>
+
     <script>
         // ====== ENHANCED INITIALIZATION ======
-        function initMediaData() {{
-            const hpMedia = Array.from(document.querySelectorAll('#hp-gallery .media-card'));
-            const artMedia = Array.from(document.querySelectorAll('#art-gallery .media-card'));
-
-            allMedia = [
-                ...hpMedia.map((card, index) => ({{
-                    element: card,
-                    type: card.classList.contains('video-card') ? 'video' : 'image',
-                    src: card.querySelector('.media-preview').src || card.querySelector('video source').src,
-                    title: card.querySelector('.media-title').textContent,
-                    description: card.querySelector('.media-description p').textContent,
-                    date: card.querySelector('.media-date').textContent.replace('• ', ''),
-                    gallery: 'human-practices',
-                    index: index
-                }})),
-                ...artMedia.map((card, index) => ({{
-                    element: card,
-                    type: card.classList.contains('video-card') ? 'video' : 'image',
-                    src: card.querySelector('.media-preview').src || card.querySelector('video source').src,
-                    title: card.querySelector('.media-title').textContent,
-                    description: card.querySelector('.media-description p').textContent,
-                    date: card.querySelector('.media-date').textContent.replace('• ', ''),
-                    gallery: 'art-design',
-                    index: index + hpMedia.length
-                }}))
-            ];
+        function registerCard(card, grid) {{
+            const id = Number(card.dataset.mediaId);
+            mediaById[id] = {{
+                id: id,
+                element: card,
+                type: card.classList.contains('video-card') ? 'video' : 'image',
+                src: card.querySelector('.media-preview').src || card.querySelector('video source').src,
+                title: card.querySelector('.media-title').textContent,
+                description: card.querySelector('.media-description p').textContent,
+                date: card.querySelector('.media-date').textContent.replace('• ', ''),
+                renditions: card.dataset.renditions ? JSON.parse(card.dataset.renditions) : null,
+                sizes: card.dataset.sizes ? JSON.parse(card.dataset.sizes) : null,
+                kind: card.dataset.kind,
+                month: card.dataset.month,
+                gallery: grid.dataset.section,
+                sectionNumber: sectionNumbers[grid.dataset.section]
+            }};
+        }}
 
+        // Runs once on page load; cards of later pages are registered as they are loaded
+        function initMediaData() {{
+            document.querySelectorAll('.media-grid[data-section]').forEach((grid, sectionNumber) => {{
+                sectionNumbers[grid.dataset.section] = sectionNumber;
+                grid.querySelectorAll('.media-card[data-media-id]').forEach(card => registerCard(card, grid));
+            }});
+            orderMedia('', '', '');
             updateEnhancedStats();
-            initVideoDurations();
-            initScientificInteractions();
+        }}
+
+        // Modal navigation follows the visible order of the cards. Ids are assigned in page order at build
+        // time and galleryFacets.order holds the presorted ids, so nothing is read back from the DOM or sorted
+        function orderMedia(type, month, sort) {{
+            const bySection = [];
+            const place = media => {{
+                if (!media || (type && media.kind !== type) || (month && media.month !== month)) return;
+                (bySection[media.sectionNumber] = bySection[media.sectionNumber] || []).push(media);
+            }};
+            if (sort) galleryFacets.order[sort].forEach(id => place(mediaById[id]));
+            else mediaById.forEach(place);
+
+            allMedia = bySection.flat();
+            // data-media-id is baked in at build time, so card -> position is O(1)
+            mediaPositions = [];
+            allMedia.forEach((media, index) => {{
+                media.index = index;
+                mediaPositions[media.id] = index;
+            }});
+        }}
+
+        // ====== FILTER & SORT (precomputed at build time) ======
+        const galleryFacets = JSON.parse(document.getElementById('galleryFacets').textContent);
+        let currentRank = null;
+
+        function formatBytes(bytes) {{
+            const units = ['B', 'KB', 'MB', 'GB'];
+            let unit = 0;
+            while (bytes >= 1024 && unit < units.length - 1) {{
+                bytes /= 1024;
+                unit++;
+            }}
+            return bytes.toFixed(unit ? 1 : 0) + ' ' + units[unit];
+        }}
+
+        function applyFilters() {{
+            const type = document.getElementById('filterType').value;
+            const month = document.getElementById('filterMonth').value;
+            const sort = document.getElementById('sortOrder').value;
+
+            // Filtering and sorting apply to the whole archive, so reveal every page first
+            if (type || month || sort) {{
+                document.querySelectorAll('.section').forEach(section => {{
+                    while (section.querySelector('template.media-page')) loadMoreMedia(section.id, false);
+                }});
+            }}
+
+            // Presorted id arrays from the build become a rank lookup; cards are reordered with CSS order
+            currentRank = null;
+            if (sort) {{
+                currentRank = new Map();
+                galleryFacets.order[sort].forEach((id, position) => currentRank.set(id, position));
+            }}
+
+            document.querySelectorAll('.media-card[data-media-id]').forEach(card => {{
+                const hidden = (type && card.dataset.kind !== type) || (month && card.dataset.month !== month);
+                card.classList.toggle('is-filtered', Boolean(hidden));
+                card.style.order = currentRank ? currentRank.get(Number(card.dataset.mediaId)) : '';
+            }});
+
+            let matching = 0;
+            galleryFacets.cube.forEach(([section, kind, cubeMonth, count]) => {{
+                if ((!type || kind === type) && (!month || cubeMonth === month)) matching += count;
+            }});
+            document.getElementById('filterStatus').textContent =
+                matching + ' of ' + galleryFacets.total + ' items • ' + formatBytes(galleryFacets.bytes) + ' archived';
+
+            orderMedia(type, month, sort);
+        }}
+
+        function initFilters() {{
+            ['filterType', 'filterMonth', 'sortOrder'].forEach(id => {{
+                document.getElementById(id).addEventListener('change', applyFilters);
+            }});
+            document.getElementById('filterStatus').textContent =
+                galleryFacets.total + ' items • ' + formatBytes(galleryFacets.bytes) + ' archived';
+        }}
+
+        // ====== SECTION PAGINATION ======
+        function loadMoreMedia(sectionId, refresh = true) {{
+            const section = document.getElementById(sectionId);
+            const page = section.querySelector('template.media-page');
+            if (!page) return;
+
+            const cards = page.content.cloneNode(true);
+            const added = cards.querySelectorAll('.media-card').length;
+            const grid = section.querySelector('.media-grid');
+            cards.querySelectorAll('.media-card[data-media-id]').forEach(card => registerCard(card, grid));
+            grid.appendChild(cards);
+            page.remove();
+
+            const button = section.querySelector('.load-more-btn');
+            const remaining = Number(button.dataset.remaining) - added;
+            button.dataset.remaining = remaining;
+            if (!section.querySelector('template.media-page')) {{
+                button.parentElement.remove();
+            }} else {{
+                button.querySelector('.action-text').textContent = 'Load more (' + remaining + ' remaining)';
+            }}
+            if (refresh) applyFilters();
         }}
 
         // ====== ENHANCED STATISTICS ======
         function updateEnhancedStats() {{
-            const hpMedia = allMedia.filter(m => m.gallery === 'human-practices');
-            const artMedia = allMedia.filter(m => m.gallery === 'art-design');
-
-            const hpPhotos = hpMedia.filter(m => m.type === 'image').length;
-            const hpVideos = hpMedia.filter(m => m.type === 'video').length;
-            const artPhotos = artMedia.filter(m => m.type === 'image').length;
-            const totalPhotos = hpPhotos + artPhotos;
-            const totalVideos = hpVideos;
-            const totalMedia = allMedia.length;
-            const currentYear = new Date().getFullYear();
+            // Counts and dates are precomputed at build time (unloaded pages included)
+            const totalPhotos = galleryFacets.byType.image || 0;
+            const totalVideos = galleryFacets.byType.video || 0;
+            const totalMedia = galleryFacets.total;
+            const range = galleryFacets.dateRange;
+            let researchYear = '—';
+            if (range) {{
+                const first = range[0].slice(0, 4);
+                const last = range[1].slice(0, 4);
+                researchYear = first === last ? first : first + '–' + last;
+            }}
 
             const statsHTML = 
                 '<div class="stat-card">' +
@@ -3238,7 +1997,7 @@ def create_hp_integrated_html(hp_media_html, art_media_html, timestamp):
                 '</div>' +
                 '<div class="stat-card">' +
                     '<div class="stat-icon">📈</div>' +
-                    '<div class="stat-number">' + currentYear + '</div>' +
+                    '<div class="stat-number">' + researchYear + '</div>' +
                     '<div class="stat-label">Research Year</div>' +
                 '</div>';
 
@@ -3246,21 +2005,10 @@ def create_hp_integrated_html(hp_media_html, art_media_html, timestamp):
         }}
 
         // ====== ENHANCED MEDIA VIEWER ======
-        function enlargeImage(btn) {{
-            if (isModalOpen) return;
-            const card = btn.closest('.media-card');
-            openMediaModal(card, 'image');
-        }}
-
-        function playVideo(btn) {{
-            if (isModalOpen) return;
-            const card = btn.closest('.media-card');
-            openMediaModal(card, 'video');
-        }}
-
         function openMediaModal(card, mediaType) {{
-            currentGallery = card.closest('#hp-gallery') ? 'human-practices' : 'art-design';
-            currentMediaIndex = allMedia.findIndex(m => m.element === card);
+            currentGallery = card.closest('.media-grid').dataset.section;
+            const position = mediaPositions[Number(card.dataset.mediaId)];
+            currentMediaIndex = position === undefined ? -1 : position;
 
             if (currentMediaIndex === -1) {{
                 console.error('Research data not found');
@@ -3273,11 +2021,8 @@ def create_hp_integrated_html(hp_media_html, art_media_html, timestamp):
                 const caption = document.getElementById('modalCaption');
 
                 modal.style.display = 'flex';
-                modalImg.style.display = 'none';
                 modalImg.src = '';
-                modalImg.alt = allMedia[currentMediaIndex].title;
-
-                modalImg.src = allMedia[currentMediaIndex].src;
+                showModalImage(allMedia[currentMediaIndex]);
                 caption.textContent = allMedia[currentMediaIndex].title + ' • ' + allMedia[currentMediaIndex].date;
 
                 setTimeout(() => {{
@@ -3293,7 +2038,7 @@ def create_hp_integrated_html(hp_media_html, art_media_html, timestamp):
                 modalVideo.src = '';
                 modalVideo.load();
 
-                modalVideo.src = allMedia[currentMediaIndex].src;
+                setVideoSource(modalVideo, allMedia[currentMediaIndex]);
                 caption.textContent = allMedia[currentMediaIndex].title + ' • ' + allMedia[currentMediaIndex].date;
 
                 setTimeout(() => {{
@@ -3310,6 +2055,104 @@ def create_hp_integrated_html(hp_media_html, art_media_html, timestamp):
             }}
         }}
 
+        // ====== ADAPTIVE VIDEO SELECTION ======
+        function pickVideoRendition(info) {{
+            const renditions = info.renditions;
+            const largest = renditions[renditions.length - 1];
+            const dpr = window.devicePixelRatio || 1;
+            const displayHeight = Math.min(window.innerHeight, window.innerWidth * largest.height / largest.width) * dpr;
+
+            let index = renditions.findIndex(r => r.height >= displayHeight);
+            if (index === -1) index = renditions.length - 1;
+
+            const connection = navigator.connection;
+            if (connection && connection.saveData) {{
+                index = 0;
+            }} else if (connection && connection.downlink) {{
+                const budget = connection.downlink * 1e6 * 0.8;
+                while (index > 0 && renditions[index].bandwidth > budget) index--;
+            }}
+            return renditions[index];
+        }}
+
+        function setVideoSource(videoEl, media) {{
+            const info = media.renditions;
+            if (!info) {{
+                videoEl.src = media.src;
+                return;
+            }}
+            // Native HLS (Safari/iOS) adapts bitrate on its own
+            if (videoEl.canPlayType('application/vnd.apple.mpegurl')) {{
+                videoEl.src = info.hls;
+                return;
+            }}
+            const rendition = pickVideoRendition(info);
+            videoEl.src = videoEl.canPlayType(info.webm_type) ? rendition.webm : rendition.mp4;
+        }}
+
+        // ====== MODAL IMAGE SIZING & PREFETCH ======
+        const modalPrefetches = new Map();
+
+        function modalImageUrl(media) {{
+            if (!media.sizes) return media.src;
+            // The modal image is contained in 95vw x 95vh
+            const dpr = window.devicePixelRatio || 1;
+            const [width, height] = media.sizes[0];
+            const neededWidth = Math.min(window.innerWidth * 0.95, window.innerHeight * 0.95 * width / height) * dpr;
+            const match = media.sizes.find(size => size[0] >= neededWidth);
+            return match ? match[2] : media.src;
+        }}
+
+        function prefetchModalImage(url) {{
+            if (modalPrefetches.has(url)) return;
+            const controller = new AbortController();
+            const entry = {{ controller: controller, objectUrl: null }};
+            entry.ready = fetch(url, {{ signal: controller.signal, priority: 'low' }})
+                .then(response => response.ok ? response.blob() : null)
+                .then(blob => {{
+                    if (blob && !controller.signal.aborted) entry.objectUrl = URL.createObjectURL(blob);
+                    return entry.objectUrl;
+                }})
+                .catch(() => null);
+            modalPrefetches.set(url, entry);
+        }}
+
+        function releasePrefetches(keepUrls) {{
+            modalPrefetches.forEach((entry, url) => {{
+                if (keepUrls.has(url)) return;
+                entry.controller.abort();
+                if (entry.objectUrl) URL.revokeObjectURL(entry.objectUrl);
+                modalPrefetches.delete(url);
+            }});
+        }}
+
+        function showModalImage(media) {{
+            const modalImg = document.getElementById('modalImage');
+            const url = modalImageUrl(media);
+            const neighbourUrls = [1, -1]
+                .map(step => allMedia[(media.index + step + allMedia.length) % allMedia.length])
+                .filter(neighbour => neighbour.type === 'image')
+                .map(modalImageUrl);
+
+            // Cancel prefetches the user has moved away from
+            releasePrefetches(new Set([url, ...neighbourUrls]));
+
+            modalImg.style.display = 'none';
+            modalImg.alt = media.title;
+            const entry = modalPrefetches.get(url);
+            if (entry && entry.objectUrl) {{
+                modalImg.src = entry.objectUrl;
+            }} else if (entry) {{
+                entry.ready.then(objectUrl => {{
+                    if (allMedia[currentMediaIndex] === media) modalImg.src = objectUrl || url;
+                }});
+            }} else {{
+                modalImg.src = url;
+            }}
+
+            neighbourUrls.forEach(prefetchModalImage);
+        }}
+
         function mediaLoaded() {{
             const modalImg = document.getElementById('modalImage');
             modalImg.style.display = 'block';
@@ -3319,6 +2162,7 @@ def create_hp_integrated_html(hp_media_html, art_media_html, timestamp):
             const modal = document.getElementById('imageModal');
             modal.classList.remove('show');
             isModalOpen = false;
+            releasePrefetches(new Set());
 
             setTimeout(() => {{
                 modal.style.display = 'none';
@@ -3350,19 +2194,16 @@ def create_hp_integrated_html(hp_media_html, art_media_html, timestamp):
 
             if (mediaData.type === 'image') {{
                 closeVideoModal();
-                const modalImg = document.getElementById('modalImage');
                 const caption = document.getElementById('modalCaption');
 
-                modalImg.style.display = 'none';
-                modalImg.src = mediaData.src;
-                modalImg.alt = mediaData.title;
+                showModalImage(mediaData);
                 caption.textContent = mediaData.title + ' • ' + mediaData.date;
             }} else {{
                 closeModal();
                 const modalVideo = document.getElementById('modalVideo');
                 const caption = document.getElementById('videoModalCaption');
 
-                modalVideo.src = mediaData.src;
+                setVideoSource(modalVideo, mediaData);
                 modalVideo.load();
                 caption.textContent = mediaData.title + ' • ' + mediaData.date;
 
@@ -3376,44 +2217,213 @@ def create_hp_integrated_html(hp_media_html, art_media_html, timestamp):
             currentGallery = mediaData.gallery;
         }}
 
-        // ====== ENHANCED VIDEO DURATION ======
-        function initVideoDurations() {{
-            document.querySelectorAll('video.media-preview').forEach(video => {{
-                video.addEventListener('loadedmetadata', function() {{
-                    const duration = Math.floor(video.duration);
-                    const minutes = Math.floor(duration / 60);
-                    const seconds = duration % 60;
-                    const durationElement = video.parentElement.querySelector('.media-duration');
-                    if (durationElement) {{
-                        durationElement.textContent = minutes + ':' + seconds.toString().padStart(2, '0');
+        // ====== DELEGATED CARD EVENTS ======
+        // One set of listeners per gallery container; cards added by "Load more" need no setup
+        function revealPreview(preview) {{
+            if (preview.classList.contains('media-preview')) preview.classList.add('is-loaded');
+        }}
+
+        function showVideoDuration(video) {{
+            const duration = Math.floor(video.duration);
+            const durationElement = video.parentElement.querySelector('.media-duration');
+            if (durationElement && isFinite(duration)) {{
+                const minutes = Math.floor(duration / 60);
+                const seconds = duration % 60;
+                durationElement.textContent = minutes + ':' + seconds.toString().padStart(2, '0');
+            }}
+        }}
+
+        function initGalleryEvents() {{
+            document.querySelectorAll('.media-grid[data-section]').forEach(grid => {{
+                grid.addEventListener('click', event => {{
+                    const button = event.target.closest('.view-btn, .play-btn');
+                    if (!button || isModalOpen) return;
+                    openMediaModal(button.closest('.media-card'), button.classList.contains('play-btn') ? 'video' : 'image');
+                }});
+
+                // load and loadedmetadata do not bubble, so listen in the capture phase
+                grid.addEventListener('load', event => revealPreview(event.target), true);
+                grid.addEventListener('loadedmetadata', event => {{
+                    showVideoDuration(event.target);
+                    revealPreview(event.target);
+                }}, true);
+
+                // Previews that finished loading before this script ran
+                grid.querySelectorAll('.media-preview').forEach(preview => {{
+                    if (preview.tagName === 'VIDEO' ? preview.readyState >= 1 : preview.complete) {{
+                        if (preview.tagName === 'VIDEO') showVideoDuration(preview);
+                        revealPreview(preview);
                     }}
                 }});
+                grid.classList.add('reveal-previews');
+
+                // The "Load more" button sits below the grid, so its section delegates the click
+                grid.closest('.section').addEventListener('click', event => {{
+                    const button = event.target.closest('[data-action="load-more"]');
+                    if (button) loadMoreMedia(button.dataset.section);
+                }});
             }});
         }}
 
-        // ====== SCIENTIFIC INTERACTIONS ======
-        function initScientificInteractions() {{
-            // Add hover effects to scientific elements
-            document.querySelectorAll('.media-card').forEach(card => {{
-                card.addEventListener('mouseenter', function() {{
-                    this.style.zIndex = '10';
-                }});
+        // ====== ARCHIVE SEARCH ======
+        let searchIndex = null;
+        let searchSequence = 0;
+
+        function loadSearchIndex() {{
+            if (searchIndex) return searchIndex.ready;
+            const meta = JSON.parse(document.getElementById('searchMeta').textContent);
+            searchIndex = {{
+                meta: meta,
+                docs: null,
+                shards: new Map(),
+                postings: new Map(),
+                tokenPattern: new RegExp('[' + meta.cjk + ']+|[a-z0-9]+', 'g'),
+                cjkPattern: new RegExp('^[' + meta.cjk + ']')
+            }};
+            searchIndex.ready = fetch(meta.base + meta.docs)
+                .then(response => response.json())
+                .then(docs => {{ searchIndex.docs = new Map(docs.map(doc => [doc[0], doc])); }});
+            return searchIndex.ready;
+        }}
+
+        function loadSearchShard(number) {{
+            if (!searchIndex.shards.has(number)) {{
+                const name = searchIndex.meta.shards[number];
+                searchIndex.shards.set(number, name
+                    ? fetch(searchIndex.meta.base + name).then(response => response.json())
+                    : Promise.resolve({{}}));
+            }}
+            return searchIndex.shards.get(number);
+        }}
 
-                card.addEventListener('mouseleave', function() {{
-                    this.style.zIndex = '1';
-                }});
+        function searchTerms(query) {{
+            const terms = [];
+            (query.toLowerCase().match(searchIndex.tokenPattern) || []).forEach(token => {{
+                if (searchIndex.cjkPattern.test(token)) {{
+                    if (token.length === 1) terms.push(token);
+                    for (let i = 0; i + 1 < token.length; i++) terms.push(token.slice(i, i + 2));
+                }} else {{
+                    terms.push(token);
+                }}
             }});
+            return terms;
+        }}
+
+        function postingList(shard, term) {{
+            // 只认分片自身的键：查询 "constructor" 等词时不能取到 Object 原型上的属性
+            const hasOwn = (key) => Object.prototype.hasOwnProperty.call(shard, key);
+            const maxPrefix = searchIndex.meta.maxPrefix;
+            const key = hasOwn(term) ? term : term.slice(0, maxPrefix);
+            if (!searchIndex.postings.has(key)) {{
+                const deltas = hasOwn(key) ? shard[key] : [];
+                const ids = new Array(deltas.length);
+                let previous = 0;
+                for (let i = 0; i < deltas.length; i++) {{
+                    previous += deltas[i];
+                    ids[i] = previous;
+                }}
+                searchIndex.postings.set(key, ids);
+            }}
+            return searchIndex.postings.get(key);
+        }}
+
+        function intersectSorted(a, b) {{
+            const result = [];
+            let i = 0;
+            let j = 0;
+            while (i < a.length && j < b.length) {{
+                if (a[i] === b[j]) {{
+                    result.push(a[i]);
+                    i++;
+                    j++;
+                }} else if (a[i] < b[j]) {{
+                    i++;
+                }} else {{
+                    j++;
+                }}
+            }}
+            return result;
+        }}
 
-            // Add loading animation to images
-            document.querySelectorAll('.media-preview').forEach(img => {{
-                img.addEventListener('load', function() {{
-                    this.style.opacity = '1';
-                    this.style.transform = 'scale(1)';
-                }});
+        async function runSearch(query) {{
+            const sequence = ++searchSequence;
+            const results = document.getElementById('searchResults');
+            await loadSearchIndex();
+            const terms = searchTerms(query);
+            if (!terms.length) {{
+                results.hidden = true;
+                return;
+            }}
+
+            const shardCount = searchIndex.meta.shards.length;
+            const shardOf = term => (term.charCodeAt(0) * 31 + (term.length > 1 ? term.charCodeAt(1) : 0)) % shardCount;
+            const shards = await Promise.all(terms.map(term => loadSearchShard(shardOf(term))));
+            if (sequence !== searchSequence) return;
 
-                img.style.opacity = '0';
-                img.style.transform = 'scale(0.95)';
-                img.style.transition = 'opacity 0.5s ease, transform 0.5s ease';
+            const started = performance.now();
+            const lists = terms.map((term, i) => postingList(shards[i], term)).sort((a, b) => a.length - b.length);
+            let matches = lists[0];
+            for (let i = 1; i < lists.length && matches.length; i++) {{
+                matches = intersectSorted(matches, lists[i]);
+            }}
+            const elapsed = performance.now() - started;
+
+            renderSearchResults(matches, elapsed);
+        }}
+
+        function renderSearchResults(matches, elapsed) {{
+            const results = document.getElementById('searchResults');
+            results.textContent = '';
+
+            const status = document.createElement('div');
+            status.className = 'search-status';
+            status.textContent = matches.length + ' result' + (matches.length === 1 ? '' : 's') +
+                ' (' + elapsed.toFixed(2) + ' ms)';
+            results.appendChild(status);
+
+            matches.slice(0, 50).forEach(id => {{
+                const doc = searchIndex.docs.get(id);
+                const item = document.createElement('button');
+                item.className = 'search-result';
+                item.type = 'button';
+                item.dataset.mediaId = id;
+                item.textContent = doc[2];
+                const detail = document.createElement('small');
+                detail.textContent = doc[1] + ' • ' + doc[3];
+                item.appendChild(detail);
+                results.appendChild(item);
+            }});
+            results.hidden = false;
+        }}
+
+        function revealMedia(mediaId) {{
+            const selector = '.media-card[data-media-id="' + mediaId + '"]';
+            let card = document.querySelector(selector);
+            while (!card) {{
+                // Load the remaining pages of the owning section until the card exists
+                const page = Array.from(document.querySelectorAll('template.media-page'))
+                    .find(template => template.content.querySelector(selector));
+                if (!page) return;
+                loadMoreMedia(page.closest('.section').id);
+                card = document.querySelector(selector);
+            }}
+            card.scrollIntoView({{ behavior: 'smooth', block: 'center' }});
+            openMediaModal(card, card.classList.contains('video-card') ? 'video' : 'image');
+        }}
+
+        function initArchiveSearch() {{
+            const input = document.getElementById('archiveSearch');
+            const results = document.getElementById('searchResults');
+            input.addEventListener('focus', loadSearchIndex, {{ once: true }});
+            input.addEventListener('input', () => runSearch(input.value));
+            results.addEventListener('click', event => {{
+                const item = event.target.closest('.search-result');
+                if (!item) return;
+                results.hidden = true;
+                revealMedia(item.dataset.mediaId);
+            }});
+            document.addEventListener('click', event => {{
+                if (!event.target.closest('.archive-search')) results.hidden = true;
             }});
         }}
 
@@ -3448,9 +2458,124 @@ def create_hp_integrated_html(hp_media_html, art_media_html, timestamp):
             }}
         }});
 
+        // ====== LITE DECORATIONS ======
+        // Draws the science decorations once onto a single canvas; nothing animates,
+        // so there is nothing to pause off-screen. Redrawn only when the viewport changes.
+        function drawLiteDecorations(canvas) {{
+            const dpr = Math.min(window.devicePixelRatio || 1, 1.5);
+            const width = window.innerWidth;
+            const height = window.innerHeight;
+            canvas.width = Math.round(width * dpr);
+            canvas.height = Math.round(height * dpr);
+            const ctx = canvas.getContext('2d');
+            ctx.setTransform(dpr, 0, 0, dpr, 0, 0);
+            ctx.clearRect(0, 0, width, height);
+
+            const colors = {{ blue: '#3498db', green: '#27ae60', purple: '#9b59b6', gold: '#f1c40f', red: '#e74c3c', orange: '#f39c12' }};
+            const dot = (x, y, radius, color) => {{
+                ctx.beginPath();
+                ctx.arc(x, y, radius, 0, Math.PI * 2);
+                ctx.fillStyle = color;
+                ctx.fill();
+            }};
+
+            // DNA helix
+            const dnaX = width * 0.05 + 60, dnaY = height * 0.1;
+            const strand = ctx.createLinearGradient(0, dnaY, 0, dnaY + 300);
+            strand.addColorStop(0, 'transparent');
+            strand.addColorStop(0.3, colors.blue);
+            strand.addColorStop(0.5, colors.purple);
+            strand.addColorStop(0.7, colors.green);
+            strand.addColorStop(1, 'transparent');
+            ctx.fillStyle = strand;
+            ctx.fillRect(dnaX - 2, dnaY, 4, 300);
+            ['blue', 'green', 'purple', 'blue', 'green', 'purple'].forEach((color, i) => {{
+                dot(dnaX, dnaY + 300 * (0.15 + i * 0.15), 8, colors[color]);
+            }});
+
+            // Cell structure
+            const cellX = width * 0.92 - 100, cellY = height * 0.9 - 100;
+            ctx.beginPath();
+            ctx.arc(cellX, cellY, 98, 0, Math.PI * 2);
+            ctx.lineWidth = 4;
+            ctx.strokeStyle = colors.gold;
+            ctx.stroke();
+            const nucleus = ctx.createRadialGradient(cellX, cellY, 0, cellX, cellY, 35);
+            nucleus.addColorStop(0, colors.purple);
+            nucleus.addColorStop(1, 'transparent');
+            ctx.fillStyle = nucleus;
+            ctx.fillRect(cellX - 35, cellY - 35, 70, 70);
+            dot(cellX - 42, cellY - 30, 18, colors.green);
+            dot(cellX + 40, cellY + 30, 10, colors.red);
+            dot(cellX - 55, cellY + 35, 15, colors.orange);
+
+            // Molecule cluster
+            const molX = width * 0.9 - 150, molY = height * 0.2;
+            ctx.strokeStyle = '#778da9';
+            ctx.lineWidth = 3;
+            ctx.beginPath();
+            ctx.moveTo(molX + 72, molY + 72);
+            ctx.lineTo(molX + 97, molY + 97);
+            ctx.moveTo(molX + 82, molY + 37);
+            ctx.lineTo(molX + 62, molY + 72);
+            ctx.stroke();
+            dot(molX + 72, molY + 72, 12, colors.blue);
+            dot(molX + 99, molY + 39, 9, colors.green);
+            dot(molX + 84, molY + 99, 6, colors.red);
+            dot(molX + 54, molY + 111, 9, colors.green);
+
+            // Protein folding
+            const proX = width * 0.08 + 60, proY = height * 0.75 - 60;
+            ctx.beginPath();
+            ctx.ellipse(proX, proY, 48, 40, 0.4, 0, Math.PI * 2);
+            ctx.lineWidth = 2;
+            ctx.strokeStyle = colors.purple;
+            ctx.stroke();
+            [[-30, -24], [-6, 12], [26, -12], [-18, 30]].forEach(([dx, dy]) => dot(proX + dx, proY + dy, 5, colors.purple));
+        }}
+
+        function initLiteDecorations() {{
+            if (!document.documentElement.classList.contains('perf-lite')) return;
+            const draw = () => {{
+                let canvas = document.querySelector('.science-canvas');
+                if (!canvas) {{
+                    canvas = document.createElement('canvas');
+                    canvas.className = 'science-canvas';
+                    canvas.setAttribute('aria-hidden', 'true');
+                    document.body.prepend(canvas);
+                }}
+                drawLiteDecorations(canvas);
+            }};
+            // Wait until the page is idle so the decorations never compete with the gallery
+            const whenIdle = window.requestIdleCallback || (callback => setTimeout(callback, 200));
+            whenIdle(draw);
+
+            let resizeTimer = null;
+            window.addEventListener('resize', () => {{
+                clearTimeout(resizeTimer);
+                resizeTimer = setTimeout(() => whenIdle(draw), 200);
+            }});
+        }}
+
+        // ====== OFFLINE CACHE ======
+        // Precaches the page shell, search index and first-screen images;
+        // originals are cached as they are viewed (see the generated sw.js)
+        function registerServiceWorker() {{
+            const serviceWorkerUrl = '{service_worker_url}';
+            if (!serviceWorkerUrl || !('serviceWorker' in navigator) || !location.protocol.startsWith('http')) return;
+            navigator.serviceWorker.register(serviceWorkerUrl).catch(error => {{
+                console.warn('Service worker registration failed:', error);
+            }});
+        }}
+
         // ====== ENHANCED INITIALIZATION ======
         document.addEventListener('DOMContentLoaded', function() {{
             initMediaData();
+            initGalleryEvents();
+            initLiteDecorations();
+            initArchiveSearch();
+            initFilters();
+            registerServiceWorker();
 
             // Enhanced background click to close modals
             document.getElementById('imageModal').addEventListener('click', function(event) {{
@@ -3465,7 +2590,8 @@ def create_hp_integrated_html(hp_media_html, art_media_html, timestamp):
                 }}
             }});
 
-            // Add scroll animations
+            // Add scroll animations (skipped in the lite tier)
+            if (document.documentElement.classList.contains('perf-lite')) return;
             const observerOptions = {{
                 threshold: 0.1,
                 rootMargin: '0px 0px -50px 0px'
@@ -3490,6 +2616,9 @@ def create_hp_integrated_html(hp_media_html, art_media_html, timestamp):
 
         // Global variables
         let allMedia = [];
+        let mediaById = [];
+        let sectionNumbers = {{}};
+        let mediaPositions = [];
         let currentMediaIndex = 0;
         let currentGallery = '';
         let isModalOpen = false;
@@ -3498,46 +2627,476 @@ def create_hp_integrated_html(hp_media_html, art_media_html, timestamp):
 </html>'''
 
 
-def main():
-    """主函数：构建增强版科学风格网站"""
-    print("🧬 Building Advanced Nature-Style Research Media Archive...")
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description='Build the iGEM research media gallery.')
+    parser.add_argument('--video', action='store_true',
+                        help='transcode videos into an H.264/WebM bitrate ladder with HLS (requires ffmpeg)')
+    parser.add_argument('--webm-codec', choices=sorted(WEBM_CODECS), default='vp9',
+                        help='codec used for the WebM renditions (default: vp9)')
+    parser.add_argument('--optimize-images', action='store_true',
+                        help='write smaller lossless/near-lossless copies of images for display (requires Pillow)')
+    parser.add_argument('--no-faststart', action='store_true',
+                        help='skip relocating the moov atom of non-faststart MP4/MOV files')
+    parser.add_argument('--lite', action='store_true',
+                        help='always use the lite tier: no animated decorations or backdrop filters')
+    parser.add_argument('--no-service-worker', action='store_true',
+                        help=f'do not generate {SERVICE_WORKER_FILE} or register it for offline caching')
+    parser.add_argument('--snippet', action='store_true',
+                        help=f'also write {SNIPPET_FILE}, a small embed for external wiki pages')
+    parser.add_argument('--snippet-base', default='',
+                        help='absolute URL of the published site, used by the snippet (e.g. https://team.github.io/repo/)')
+    parser.add_argument('--snippet-budget', type=int, default=SNIPPET_MAX_BYTES,
+                        help=f'maximum snippet size in bytes (default: {SNIPPET_MAX_BYTES})')
+    parser.add_argument('--remote-cache', default=os.environ.get('DERIVATIVE_CACHE_URL'),
+                        help='S3-compatible derivative cache shared between runners, e.g. s3://bucket/prefix'
+                             ' (default: $DERIVATIVE_CACHE_URL; requires boto3)')
+    parser.add_argument('--remote-endpoint', default=os.environ.get('DERIVATIVE_CACHE_ENDPOINT'),
+                        help='endpoint of the S3-compatible store, e.g. http://localhost:9000 for MinIO'
+                             ' (default: $DERIVATIVE_CACHE_ENDPOINT)')
+    sharding = parser.add_mutually_exclusive_group()
+    sharding.add_argument('--shard', type=parse_shard, metavar='I/N',
+                          help='only process media whose content hash falls in shard I of N and write a partial'
+                               ' manifest instead of the site (run each shard as its own process or host)')
+    sharding.add_argument('--merge-shards', type=int, metavar='N',
+                          help='render the site from the partial manifests of N shards without recomputing')
+    parser.add_argument('--packs', action='store_true',
+                        help=f'also keep derivatives in append-only pack files under {PACK_DIR}/ (few large files'
+                             ' for CI caches); missing derivative directories are unpacked before their stage runs')
+    parser.add_argument('--reproducible', action='store_true',
+                        help='take every date from content (EXIF, last commit, SOURCE_DATE_EPOCH) so identical'
+                             ' inputs give byte-identical output; implied when SOURCE_DATE_EPOCH is set')
+    parser.add_argument('--explain', action='store_true',
+                        help='print why each stage ran or was skipped (code, parameters or media changed)')
+    parser.add_argument('--shard-dir', default=SHARD_DIR,
+                        help=f'directory of the partial shard manifests (default: {SHARD_DIR})')
+    parser.add_argument('--config', default=SECTIONS_CONFIG,
+                        help=f'section configuration file (default: {SECTIONS_CONFIG})')
+    parser.add_argument('--targets', nargs='?', const=TARGETS_FILE, metavar='FILE',
+                        help=f'build every gallery listed in FILE (default: {TARGETS_FILE}) in one process,'
+                             ' sharing the scan, catalog and derivative cache; each is written to sites/<name>/'
+                             ' and published to dist/<name>/')
+    return parser.parse_args(argv)
+
+
+def hash_task(item):
+    """流水线任务：计算源文件内容哈希（文件未变化时直接使用记忆的结果），供各派生阶段和媒体清单共用"""
+    item['digest'] = file_hash(item['path'])
+    return item
+
+
+def print_stage_log(stage_name, item):
+    """按条目输出各阶段的日志"""
+    for line in item['log']:
+        print(line)
+    item['log'].clear()
+
+
+def report_git_changes(sections, catalog):
+    """从git索引读取内容键，并报告上次构建的提交之后git记录的变化（不读取任何媒体内容）"""
+    roots = [section['root'] for section in sections]
+    tracked = use_git_index(roots)
+    if not tracked:
+        return
+    print(f"   🌿 Git index: {tracked} tracked files keyed by blob ID without reading them")
+
+    since = last_built_commit(catalog)
+    if not since:
+        return
+    changes = changes_since(since, roots)
+    if changes is None:
+        print(f"   🌿 Last built commit {since[:10]} is not in the local history; comparing content keys instead")
+        return
+    counts = {}
+    for status, _, _ in changes:
+        counts[status] = counts.get(status, 0) + 1
+    summary = ', '.join(f'{count} {CHANGE_LABELS.get(status, status)}' for status, count in sorted(counts.items()))
+    print(f"   🌿 Since commit {since[:10]}: {summary or 'no changes'}")
+
+
+def derivative_stages(args):
+    """按命令行选项组装派生文件阶段，返回 (阶段列表, {派生目录类型: 条目是否需要})"""
+    stages = []
+    # 启用的派生类型，远程缓存按它读穿和回写
+    derivative_kinds = {}
+
+    # moov位于文件末尾的MP4需要前置，浏览器才能边下载边播放
+    if not args.no_faststart:
+        derivative_kinds['faststart'] = lambda item: item['type'] in ('mp4', 'mov')
+        stages.append(stage('faststart', faststart_task, 2, accepts=derivative_kinds['faststart']))
+
+    # 可选视频阶段：转码码率阶梯并打包HLS（ffmpeg自身多线程，一次转码一个）
+    if args.video:
+        ffmpeg = find_ffmpeg()
+        if ffmpeg:
+            derivative_kinds['video'] = lambda item: item['kind'] == 'video'
+            stages.append(stage('video', partial(transcode_task, ffmpeg=ffmpeg, webm_codec=args.webm_codec), 1,
+                                accepts=derivative_kinds['video']))
+        else:
+            print("⚠️  ffmpeg not found (set FFMPEG_BIN or install ffmpeg); serving original videos")
 
-    # 定义媒体类型
-    image_types = ['*.jpg', '*.jpeg', '*.png', '*.gif', '*.webp', '*.tiff', '*.bmp']
-    video_types = ['*.mp4', '.avi', '.mov', '.wmv', '.flv', '.webm', '.mkv']
-    all_media_types = image_types + video_types
+    # 可选图片优化阶段：解码/编码在进程池中进行
+    if args.optimize_images:
+        if pillow_available():
+            derivative_kinds['optimized'] = accepts_image
+            stages.append(stage('optimize', optimize_task, executor='process', accepts=accepts_image))
+        else:
+            print("⚠️  Pillow is not installed (pip install Pillow); serving original images")
+    return stages, derivative_kinds
+
+
+def build_media_derivatives(sections, args, catalog, stage_records):
+    """以流水线方式扫描分区并生成派生文件：扫描 → 哈希 → 元数据 → faststart → 转码 → 图片解码/编码写出
+
+    各阶段之间是有界队列，I/O和计算相互重叠，内存占用只取决于队列深度。结果登记到目录库。
+    分片构建（--shard）只处理本分片的条目并写出部分清单；合并（--merge-shards）直接使用各分片的结果。
+    stage_records 是上次构建记录的各阶段输入，本次的记录写回其中。
+    返回 (各分区文件列表, {源路径: {阶段: 结果}}, {源路径: 内容哈希})。
+    """
+    # 内容哈希已在目录库中的文件（包括改名或移动过的）直接复用元数据，提取代码变化后全部重新提取；
+    # 被中断的构建已完成的条目记录在检查点日志中，同样直接复用，派生文件则已在缓存中
+    explain = []
+    known = known_metadata(catalog)
+    metadata_inputs = stage_inputs(['media_metadata'])
+    change = input_change(stage_records.get('metadata'), metadata_inputs)
+    if stage_records.get('metadata') and change:
+        known = {}
+        explain.append(f"metadata: ran for every file ({change})")
+    else:
+        explain.append("metadata: only read content the catalog has not seen")
+    stage_records['metadata'] = metadata_inputs
+    journal_path = checkpoint_path(args.shard)
+    resumed = load_checkpoint(journal_path)
+    if resumed:
+        print(f"   ♻️  Resuming an interrupted build: {len(resumed)} files already checkpointed")
+        known.update(resumed)
+    scanned = []
+    stages = [stage('hash', hash_task, HASH_WORKERS)]
+    if args.merge_shards:
+        entries, scan_id = load_partials(args.merge_shards, args.shard_dir)
+        known.update((entry['digest'], entry['metadata']) for entry in entries.values())
+        stages.append(stage('merge', partial(merge_task, entries=entries, scanned=scanned), HASH_WORKERS))
+        work_stages, derivative_kinds = [], merged_kinds(entries)
+    else:
+        if args.shard:
+            stages.append(stage('shard', partial(shard_task, shard=args.shard, scanned=scanned), HASH_WORKERS))
+        work_stages, derivative_kinds = derivative_stages(args)
+
+    # 派生阶段：代码版本和参数未变时，内容也未变的条目直接复用上次登记在目录库中的结果
+    previous_rows = media_rows(catalog)
+    stage_params = {'video': ladder_params(args.webm_codec), 'optimize': OPTIMIZE_PARAMS}
+    tallies = {}
+    for index, current in enumerate(work_stages):
+        module = getattr(current.func, 'func', current.func).__module__
+        inputs = stage_inputs([module], stage_params.get(current.name))
+        tallies[current.name] = (inputs, {})
+        work_stages[index] = reusing_stage(current, inputs, stage_records.get(current.name), previous_rows,
+                                           tallies[current.name][1])
+
+    def needs_derivatives(item):
+        return any(accepts(item) for accepts in derivative_kinds.values())
+
+    # 打包存储：本地缺失的派生目录先从包中解包，构建后把新产生的追加到包中
+    pack = open_pack() if args.packs and derivative_kinds else None
+    if pack:
+        print(f"   📦 Derivative pack: {pack.count} files in {len(pack.segments)} segments")
+        stages.append(stage('unpack', partial(unpack_task, pack=pack, kinds=derivative_kinds), 4,
+                            accepts=needs_derivatives))
+
+    # 远程缓存层：一次列举得到远程已有的派生目录，本地缺失的先下载（读穿），构建后回写新产生的
+    store = index = None
+    if args.remote_cache and derivative_kinds:
+        store = open_remote(args.remote_cache, args.remote_endpoint)
+        index = list_remote(store) if store else None
+        if index is not None:
+            print(f"   ☁️  Remote cache {args.remote_cache}: {len(index)} derivative directories available")
+            stages.append(stage('fetch', partial(fetch_task, store=store, index=index, kinds=derivative_kinds),
+                                4, accepts=needs_derivatives))
+    stages.append(stage('metadata', partial(metadata_task, known=known), HASH_WORKERS))
+    stages += work_stages
+
+    print(f"⚙️  Pipeline: scan → {' → '.join(s.name for s in stages)}")
+    section_media = {}
+    journal = open_checkpoint(journal_path)
+
+    def on_result(stage_name, item):
+        print_stage_log(stage_name, item)
+        checkpoint(journal, stage_name, item)
+
+    try:
+        items = run_pipeline(stream_sections(sections, section_media), stages, on_result=on_result)
+    except KeyboardInterrupt:
+        journal.close()
+        save_hash_cache()
+        raise SystemExit("⏸️  Build interrupted; finished work is checkpointed, run the same command again to resume")
+    if any('image_bytes' in item for item in items):
+        report_image_savings(items)
+    explain += [explain_tally(name, tally) for name, (_, tally) in tallies.items()]
+    if args.explain:
+        print("🧭 Stage decisions:")
+        for line in explain:
+            print(f"   {line}")
+    close_pack(pack)
+    if index is not None:
+        upload_derivatives(store, index, items, derivative_kinds)
+    close_remote(store)
+    # 各分片不写包（并发追加会互相覆盖索引），由合并步骤统一追加
+    if args.packs and derivative_kinds and not args.shard:
+        pack_derivatives(items, derivative_kinds)
+
+    media_derivatives = {item['path']: item['derivatives'] for item in items if item['derivatives']}
+    digests = {item['path']: item['digest'] for item in items}
+    if args.shard:
+        write_partial(items, args.shard, scanned, args.shard_dir)
+        finish_checkpoint(journal)
+        return section_media, media_derivatives, digests
+    if args.merge_shards and scan_fingerprint(scanned) != scan_id:
+        raise SystemExit("❌ The source tree differs from the one the shards were built from")
+
+    build = record_build(catalog, items, head_commit())
+    finish_checkpoint(journal)
+    for name in STAGE_OUTPUTS:
+        stage_records.pop(name, None)
+    stage_records.update((name, stage_record(name, inputs, items)) for name, (inputs, _) in tallies.items())
+    changed, removed = changed_since(catalog, build - 1)
+    duplicates = duplicate_groups(catalog)
+    print(f"   🗂️  Catalog: build {build}, {len(changed)} changed and {len(removed)} removed since the last build,"
+          f" {len(duplicates)} groups of identical files")
+    return section_media, media_derivatives, digests
+
+
+def write_build_manifest(sections, section_media, media_derivatives, search_meta, site_dir='.'):
+    """写出构建清单：需要预缓存的文件及其内容哈希，版本号由全部哈希决定
+
+    页面、搜索索引等页面文件位于 site_dir 中，清单中的键始终是相对页面的URL。
+    """
+    site_paths = [PAGE_FILE, search_meta['base'] + search_meta['docs']]
+    site_paths += [search_meta['base'] + name for name in search_meta['shards'] if name]
+    precache = {path: file_hash(os.path.join(site_dir, path))[:16] for path in site_paths}
+
+    # 首屏图片：按页面顺序取前几张图片卡片实际加载的文件
+    first_screen = [card_source(m, media_derivatives)[0]
+                    for section in sections for m in section_media[section['id']] if is_image_file(m)]
+    budget = FIRST_SCREEN_MAX_BYTES
+    for path in first_screen[:FIRST_SCREEN_ITEMS]:
+        budget -= os.path.getsize(path)
+        if budget < 0:
+            break
+        precache[path] = file_hash(path)[:16]
+
+    manifest = {'version': params_hash(precache), 'precache': precache}
+    save_json(os.path.join(site_dir, BUILD_MANIFEST), manifest)
+    return manifest
+
+
+def feed_items(media_records, media_derivatives, digests):
+    """生成媒体清单条目：源路径、内容哈希和发布后的URL（不含随检出变化的文件时间）"""
+    items = []
+    for media_path, record in media_records.items():
+        url, mime = card_source(media_path, media_derivatives)
+        # 缩略图：图片使用最小的弹窗尺寸档位；没有时不提供（显示用文件可能是几MB的原图）
+        sizes = media_derivatives.get(media_path, {}).get('modal_sizes')
+        thumb = sizes[0][2] if record['kind'] == 'image' and sizes else None
+        items.append({'path': to_url(media_path), 'hash': digests[media_path], 'bytes': record['bytes'],
+                      'kind': record['kind'], 'mime': mime, 'section': record['section'],
+                      'title': record['title'], 'caption': record['caption'], 'url': to_url(url),
+                      'thumb': thumb and to_url(thumb)})
+    return items
+
+
+def referenced_assets(sections, section_media, media_derivatives, search_meta, service_worker_url,
+                      snippet=False, site_dir='.'):
+    """页面实际引用的全部本地文件；目录条目表示整个目录一起发布"""
+    site_files = [PAGE_FILE, FEED_DIR, search_meta['base'] + search_meta['docs']]
+    site_files += [search_meta['base'] + name for name in search_meta['shards'] if name]
+    if service_worker_url:
+        site_files.append(SERVICE_WORKER_FILE)
+    if snippet:
+        site_files.append(SNIPPET_FILE)
+    assets = {os.path.join(site_dir, path) for path in site_files}
+
+    for section in sections:
+        for media_path in section_media[section['id']]:
+            derivatives = media_derivatives.get(media_path, {})
+            assets.add(card_source(media_path, media_derivatives)[0])
+            assets.update(size[2] for size in derivatives.get('modal_sizes', []))
+            if 'video' in derivatives:
+                # HLS 变体播放列表和分片不直接出现在页面中，整个转码目录一起发布
+                assets.add(os.path.dirname(derivatives['video']['hls']))
+                for rendition in derivatives['video']['renditions']:
+                    assets.update((rendition['mp4'], rendition['webm']))
+    return assets
+
+
+def render_target(target, root_media, media_derivatives, digests, catalog_rows, args, stage_records,
+                  file_times, updated=None):
+    """渲染一个画廊：页面、搜索索引、媒体清单和 Service Worker 写入其 site_dir，再发布到其 dist_dir
+
+    root_media 是共用扫描的结果 {源目录: 文件列表}，画廊中指向同一目录的分区共用它。
+    file_times 为各文件的日期 {源路径: 时间戳}；updated 为可复现构建的页面更新时间，None 时使用当前时间。
+    渲染代码（含模板）、选项和页面用到的媒体信息都与上次相同时跳过整个渲染，保留上次的输出。
+    """
+    sections = target['sections']
+    site_dir = target['site_dir']
+    os.makedirs(site_dir, exist_ok=True)
+    section_media = {}
+    for section in sections:
+        media_files = sort_media(root_media[os.path.normpath(section['root'])], section['sort'], file_times)
+        section_media[section['id']] = filter_playable(media_files, media_derivatives)
+
+    media_records = build_media_records(sections, section_media, catalog_rows, file_times)
+    page_path = os.path.normpath(os.path.join(site_dir, PAGE_FILE))
+    record_key = f"render:{target['name']}" if target['name'] else 'render'
+    inputs = stage_inputs(RENDER_MODULES, {
+        'target': {key: target[key] for key in ('name', 'site_dir', 'dist_dir', 'cache_prefix', 'sections')},
+        'options': [args.lite, args.no_service_worker, args.snippet, args.snippet_base, args.snippet_budget,
+                    updated],
+        'media': [[record, media_derivatives.get(path), digests[path]] for path, record in media_records.items()],
+        # 派生文件的URL不随参数变化，派生阶段的输入变化时其内容可能已经改变，需要重新发布
+        'derivatives': {name: stage_records.get(name) for name in STAGE_OUTPUTS},
+    })
+    change = input_change(stage_records.get(record_key), inputs, 'media, derivatives or options changed')
+    if not change and os.path.exists(page_path) and os.path.isdir(target['dist_dir']):
+        if args.explain:
+            print(f"   🧭 {record_key}: skipped (inputs unchanged)")
+        print(f"⏭️  {page_path} and {target['dist_dir']}/ are up to date")
+        return page_path
+    if args.explain:
+        print(f"   🧭 {record_key}: ran ({change or 'outputs missing'})")
+
+    # 构建搜索索引（分片写入 search-index/，页面聚焦搜索框时才加载）
+    search_meta = build_search_index(list(media_records.values()), os.path.join(site_dir, SEARCH_DIR),
+                                     f'{SEARCH_DIR}/')
+    facets = build_facets(media_records)
+
+    # 媒体清单与增量：下游只需同步上次见过的 build_id 之后的变化
+    feed_manifest = write_media_feed(feed_items(media_records, media_derivatives, digests),
+                                     os.path.join(site_dir, FEED_DIR))
+
+    # 可选嵌入片段：内联首屏缩略图，其余从媒体清单按需加载，大小受预算限制
+    if args.snippet:
+        base_url = args.snippet_base
+        if base_url and not base_url.endswith('/'):
+            base_url += '/'
+        if base_url and target['name']:
+            base_url += target['name'] + '/'
+        write_snippet(feed_manifest, base_url, PAGE_FILE, f'{FEED_DIR}/{MANIFEST_FILE}', args.snippet_budget,
+                      os.path.join(site_dir, SNIPPET_FILE))
+
+    # 生成各分区HTML
+    sections_html = '\n'.join(
+        generate_section_html(section, section_media[section['id']], media_derivatives, media_records)
+        for section in sections)
+
+    # 创建时间戳；可复现构建使用内容决定的时间
+    build_date = datetime.now() if updated is None else datetime.fromtimestamp(updated, DISPLAY_TZ)
+    timestamp = build_date.strftime("%Y-%m-%d %H:%M:%S")
 
-    # 扫描媒体目录
-    print("🔍 Scanning for scientific research media files...")
-    art_media = get_media_files('ART', all_media_types)
-    hp_media = get_media_files('HP', all_media_types)
+    # 生成集成版本HTML
+    search_meta_json = json.dumps(search_meta).replace('</', '<\\/')
+    facets_json = json.dumps(facets, separators=(',', ':')).replace('</', '<\\/')
+    service_worker_url = '' if args.no_service_worker else SERVICE_WORKER_FILE
+    integrated_html = create_hp_integrated_html(sections_html, timestamp, sections[0]['id'], search_meta_json,
+                                                generate_toolbar_html(facets), facets_json, service_worker_url,
+                                                args.lite)
 
-    # 统计信息
-    art_images = len([m for m in art_media if is_image_file(m)])
-    hp_images = len([m for m in hp_media if is_image_file(m)])
-    hp_videos = len([m for m in hp_media if is_video_file(m)])
+    # 写入文件
+    write_text(page_path, integrated_html)
 
-    print(f"🎨 Found {art_images} scientific visualization assets")
-    print(f"📸 Found {hp_images} experimental documentation images")
-    print(f"🎥 Found {hp_videos} protocol video records")
-    print(f"📊 Total: {len(art_media) + len(hp_media)} research datasets")
+    # 构建清单与 Service Worker：页面写出后才能计算其哈希
+    if service_worker_url:
+        manifest = write_build_manifest(sections, section_media, media_derivatives, search_meta, site_dir)
+        write_service_worker(manifest, PAGE_FILE, os.path.join(site_dir, SERVICE_WORKER_FILE),
+                             target['cache_prefix'])
+        print(f"📦 Offline cache: {len(manifest['precache'])} precached files, version {manifest['version']}")
 
-    # 生成媒体HTML
-    art_html = generate_media_html(art_media, 'art-design')
-    hp_html = generate_media_html(hp_media, 'human-practices')
+    # 可复现构建：生成的文件使用同一个修改时间（原图和派生文件保持原样，派生文件的缓存依赖它们的时间）
+    if updated is not None:
+        stamp_outputs([os.path.join(site_dir, path) for path in (PAGE_FILE, SEARCH_DIR, FEED_DIR, SNIPPET_FILE,
+                                                                  SERVICE_WORKER_FILE, BUILD_MANIFEST)], updated)
 
-    # 创建时间戳
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    # 只发布页面引用的文件，原图、脚本和旧产物不进入 dist/
+    print(f"🚚 Staging {target['dist_dir']}/ for deployment...")
+    stage_dist(referenced_assets(sections, section_media, media_derivatives, search_meta, service_worker_url,
+                                 args.snippet, site_dir), target['dist_dir'], site_dir)
+    stage_records[record_key] = inputs
+    return page_path
 
-    # 生成集成版本HTML
-    integrated_html = create_hp_integrated_html(hp_html, art_html, timestamp)
 
-    # 写入文件
-    with open('gallery.html', 'w', encoding='utf-8') as f:
-        f.write(integrated_html)
+def main(argv=None):
+    """主函数：构建增强版科学风格网站"""
+    global DISPLAY_TZ
+    args = parse_args(argv)
+    print("🧬 Building Advanced Nature-Style Research Media Archive...")
+    args.reproducible = args.reproducible or source_date_epoch() is not None
+    if args.reproducible:
+        DISPLAY_TZ = REPRODUCIBLE_TZ
+
+    # 多画廊构建时读取全部画廊定义；指向同一源目录的分区只扫描一次
+    targets = load_targets(args.targets) if args.targets else [single_target(args.config)]
+    for target in targets:
+        target['sections'] = load_sections(target['config'])
+    sections = scan_sections(targets)
+    if args.targets:
+        print(f"🗂️  {len(targets)} galleries from {args.targets}: {len(sections)} source directories to scan")
+
+    # 并发扫描所有配置的分区（类型识别结果按文件缓存），扫描到的文件直接流入派生文件流水线
+    print("🔍 Scanning for scientific research media files...")
+    load_type_cache()
+    load_hash_cache()
+    stage_records = load_stage_records()
+    catalog = open_catalog()
+    report_git_changes(sections, catalog)
+    section_media, media_derivatives, digests = build_media_derivatives(sections, args, catalog, stage_records)
+    if args.shard:
+        # 分片只负责派生文件；全部分片完成后由合并步骤生成页面
+        save_type_cache()
+        save_hash_cache()
+        catalog.close()
+        print(f"✅ Shard {args.shard[0]}/{args.shard[1]} done; render the site with"
+              f" --merge-shards {args.shard[1]} once every shard has finished")
+        return
+
+    all_media = [m for section in sections for m in section_media[section['id']]]
+    images = len([m for m in all_media if is_image_file(m)])
+    print(f"🔬 Found {images} research images and {len(all_media) - images} protocol videos")
+    print(f"📊 Total: {len(all_media)} research datasets in {len(sections)} sections")
+
+    root_media = {os.path.normpath(section['root']): section_media[section['id']] for section in sections}
+    catalog_rows = media_rows(catalog)
+    catalog.close()
+    # 可复现构建：日期来自内容（EXIF、最后修改的提交、SOURCE_DATE_EPOCH），不读取随检出变化的文件时间；
+    # 默认构建使用目录库记录的文件日期（不用创建时间：发布时的硬链接就会改变它，页面也就每次都要重新渲染）
+    updated = None
+    if args.reproducible:
+        file_times = content_times(catalog_rows, sorted(root_media))
+        updated = build_time(file_times)
+        print(f"   🕰️  Reproducible build: dates from content, updated"
+              f" {datetime.fromtimestamp(updated, DISPLAY_TZ):%Y-%m-%d %H:%M:%S} UTC")
+    else:
+        file_times = catalog_times(catalog_rows)
+    pages = []
+    for target in targets:
+        if target['name']:
+            print(f"🖼️  Rendering gallery {target['name']} into {target['site_dir']}/...")
+        pages.append(render_target(target, root_media, media_derivatives, digests, catalog_rows, args,
+                                   stage_records, file_times, updated))
+    if args.targets:
+        # 各画廊只替换自己的 dist/<名称>/，最后清掉其他画廊或单画廊构建留下的内容
+        names = {target['name'] for target in targets}
+        for name in os.listdir(DIST_DIR):
+            if name not in names:
+                path = os.path.join(DIST_DIR, name)
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+                else:
+                    os.remove(path)
+    save_type_cache()
+    save_hash_cache()
+    save_stage_records(stage_records)
 
     print("✅ Advanced Nature-Style Research Media Archive built successfully!")
-    print("📄 Generated: gallery.html")
+    print(f"📄 Generated: {', '.join(pages)}")
     print("🎯 Enhanced Scientific Features:")
     print("   - 🧬 Enhanced DNA helix with multiple colors and animations")
     print("   - 🔬 Advanced cell structure with organelles")
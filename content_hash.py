@@ -0,0 +1,97 @@
+# content_hash.py - 内容哈希：与 git hash-object 相同的blob ID，已跟踪文件直接取自git索引；
+# 其余文件小的 mmap、大的分块流式读取，线程池并行，按 (inode, 大小, mtime_ns) 记忆
+import os
+import mmap
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from build_cache import CACHE_DIR, load_json, save_json
+from git_objects import object_format, tracked_blobs
+
+HASH_CACHE_PATH = os.path.join(CACHE_DIR, 'hashes.json')
+# 不超过该大小的文件整体映射后一次性交给 hashlib；更大的视频按块流式读取，避免占用过多地址空间
+MMAP_MAX_BYTES = 256 << 20
+CHUNK_SIZE = 1 << 20
+# hashlib 处理大块数据时释放GIL，多个线程可以真正并行；读盘为主，线程数可以多于CPU核数
+HASH_WORKERS = 8
+
+# 内容键的算法与仓库的对象格式一致，同一内容无论是否已提交都得到同一个键
+_algorithm = 'sha1'
+# 已跟踪且未修改的文件 {路径: blob ID}，来自git索引
+_git_blobs = {}
+
+# 键为 "设备:inode"，值为 [大小, mtime_ns, 算法, 哈希]；重命名文件不会让记忆失效
+_memo = {}
+_memo_dirty = False
+_memo_lock = threading.Lock()
+
+
+def load_hash_cache():
+    """载入持久化的哈希记忆"""
+    global _memo_dirty
+    _memo.update(load_json(HASH_CACHE_PATH, {}))
+    _memo_dirty = False
+
+
+def save_hash_cache():
+    """保存哈希记忆（只在有变化时写入）"""
+    global _memo_dirty
+    with _memo_lock:
+        if _memo_dirty:
+            save_json(HASH_CACHE_PATH, _memo)
+            _memo_dirty = False
+
+
+def use_git_index(roots):
+    """从git索引读取 roots 下文件的blob ID（CI中新检出的文件mtime无意义，但索引可用），返回文件数"""
+    global _algorithm
+    _algorithm = object_format() or _algorithm
+    _git_blobs.update(tracked_blobs(roots))
+    return len(_git_blobs)
+
+
+def _digest_file(path, size):
+    """按git blob格式（"blob 大小" 头部 + 内容）计算文件摘要，与 git hash-object 的结果一致"""
+    digest = hashlib.new(_algorithm)
+    digest.update(b'blob %d\0' % size)
+    with open(path, 'rb') as f:
+        if 0 < size <= MMAP_MAX_BYTES:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                digest.update(mapped)
+        else:
+            buffer = bytearray(CHUNK_SIZE)
+            view = memoryview(buffer)
+            while True:
+                count = f.readinto(buffer)
+                if not count:
+                    break
+                digest.update(view[:count])
+    return digest.hexdigest()
+
+
+def file_hash(path):
+    """返回文件内容哈希；已跟踪且未修改的文件直接使用索引中的blob ID，(inode, 大小, mtime_ns) 未变化时不再读取文件"""
+    global _memo_dirty
+    blob = _git_blobs.get(os.path.normpath(path))
+    if blob:
+        return blob
+
+    stat = os.stat(path)
+    key = f'{stat.st_dev}:{stat.st_ino}'
+    signature = [stat.st_size, stat.st_mtime_ns, _algorithm]
+    cached = _memo.get(key)
+    if cached and cached[:3] == signature:
+        return cached[3]
+
+    value = _digest_file(path, stat.st_size)
+    with _memo_lock:
+        _memo[key] = signature + [value]
+        _memo_dirty = True
+    return value
+
+
+def hash_files(paths, workers=HASH_WORKERS):
+    """并行计算多个文件的哈希，返回 {路径: 哈希}"""
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(paths, pool.map(file_hash, paths)))
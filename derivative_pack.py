@@ -0,0 +1,387 @@
+# derivative_pack.py - 派生文件的打包存储：追加写入的大段文件加一个排序后内存映射的偏移索引，CI缓存只需保存少量大文件
+import os
+import re
+import mmap
+import shutil
+import struct
+import argparse
+import threading
+from collections import namedtuple
+
+from build_cache import CACHE_DIR, DERIVATIVES_DIR, derivative_dir, format_bytes, to_url
+from media_catalog import CATALOG_PATH, media_rows, open_catalog
+
+PACK_DIR = os.path.join(CACHE_DIR, 'packs')
+INDEX_FILE = 'index.bin'
+INDEX_MAGIC = b'DPK1'
+SEGMENT_PATTERN = re.compile(r'segment-(\d+)\.pack')
+# 索引头：魔数、条目数；之后是按名称字节序排列的定长条目，最后是名称区
+HEADER = struct.Struct('<4sI')
+# 条目：名称在名称区中的偏移和长度、段号、段内偏移、长度、文件修改时间
+ENTRY = struct.Struct('<IHIQQQ')
+# 段文件达到此大小后新开一段
+SEGMENT_MAX_BYTES = 256 * 1024 * 1024
+COPY_CHUNK_SIZE = 4 << 20
+# 段文件中本次构建用不到的字节（被替换的旧内容、已删除媒体的派生文件）超过用到的字节时，构建结束后自动压缩
+COMPACT_UNUSED_RATIO = 1.0
+
+Pack = namedtuple('Pack', 'index count names segments')
+PackEntry = namedtuple('PackEntry', 'name segment offset length mtime_ns')
+
+
+def _segment_path(pack_dir, number):
+    """第 number 个段文件的路径"""
+    return os.path.join(pack_dir, f'segment-{number:05d}.pack')
+
+
+def _segment_numbers(pack_dir):
+    """包目录中现有段文件的编号（含压缩中断后未被索引引用的段）"""
+    try:
+        names = os.listdir(pack_dir)
+    except OSError:
+        return []
+    return sorted(int(match.group(1)) for match in map(SEGMENT_PATTERN.fullmatch, names) if match)
+
+
+def _pack_name(path):
+    """派生文件在包中的名称：相对 derivatives/ 的URL路径，形如 类型/键/文件名"""
+    return to_url(os.path.relpath(path, DERIVATIVES_DIR))
+
+
+def _dir_of(name):
+    """条目所属的派生目录（类型/键）"""
+    return '/'.join(name.split('/', 2)[:2])
+
+
+def open_pack(pack_dir=PACK_DIR):
+    """以只读内存映射打开索引和全部段文件，没有包（或包已损坏）时返回None"""
+    try:
+        with open(os.path.join(pack_dir, INDEX_FILE), 'rb') as f:
+            index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    magic, count = HEADER.unpack_from(index) if len(index) >= HEADER.size else (None, 0)
+    if magic != INDEX_MAGIC:
+        index.close()
+        print(f"⚠️  {pack_dir}/{INDEX_FILE} is not a derivative pack index; ignoring it")
+        return None
+
+    segments = {}
+    try:
+        for number in {ENTRY.unpack_from(index, HEADER.size + position * ENTRY.size)[2]
+                       for position in range(count)}:
+            with open(_segment_path(pack_dir, number), 'rb') as f:
+                segments[number] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        close_pack(Pack(index, count, 0, segments))
+        print(f"⚠️  Derivative pack in {pack_dir} is incomplete ({e}); ignoring it")
+        return None
+    return Pack(index, count, HEADER.size + count * ENTRY.size, segments)
+
+
+def close_pack(pack):
+    """关闭索引和段文件的内存映射"""
+    if pack:
+        for segment in pack.segments.values():
+            segment.close()
+        pack.index.close()
+
+
+def _name(pack, position):
+    """第 position 个条目的名称（字节）"""
+    name_offset, name_length = ENTRY.unpack_from(pack.index, HEADER.size + position * ENTRY.size)[:2]
+    start = pack.names + name_offset
+    return pack.index[start:start + name_length]
+
+
+def _entry(pack, position):
+    """读取第 position 个条目"""
+    _, _, segment, offset, length, mtime_ns = ENTRY.unpack_from(pack.index, HEADER.size + position * ENTRY.size)
+    return PackEntry(_name(pack, position).decode('utf-8'), segment, offset, length, mtime_ns)
+
+
+def all_entries(pack):
+    """按名称顺序返回全部条目"""
+    return [_entry(pack, position) for position in range(pack.count)]
+
+
+def entries_under(pack, prefix):
+    """名称以 prefix 开头的条目：二分查找第一个，再顺序读取，不需要把索引载入内存"""
+    key = prefix.encode('utf-8')
+    low, high = 0, pack.count
+    while low < high:
+        middle = (low + high) // 2
+        if _name(pack, middle) < key:
+            low = middle + 1
+        else:
+            high = middle
+    entries = []
+    while low < pack.count and _name(pack, low).startswith(key):
+        entries.append(_entry(pack, low))
+        low += 1
+    return entries
+
+
+def entry_view(pack, entry):
+    """条目内容在段文件映射上的切片（不复制）；用完后释放（with 语句）才能关闭包"""
+    return memoryview(pack.segments[entry.segment])[entry.offset:entry.offset + entry.length]
+
+
+def _materialize(pack, entries, prefix, out_dir):
+    """把包中一个派生目录的文件写回 out_dir，返回写出的字节数
+
+    先写入独立的临时目录，完成后再替换；内容相同的条目同时解包同一目录时，先完成的一个生效。
+    文件修改时间恢复为打包时的值，构建后比较时不会被当作已变化。
+    """
+    partial_dir = f'{out_dir}.{os.getpid()}-{threading.get_ident()}.partial'
+    written = 0
+    try:
+        for entry in entries:
+            path = os.path.join(partial_dir, *entry.name[len(prefix):].split('/'))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f, entry_view(pack, entry) as view:
+                f.write(view)
+            os.utime(path, ns=(entry.mtime_ns, entry.mtime_ns))
+            written += entry.length
+        os.replace(partial_dir, out_dir)
+    except OSError:
+        shutil.rmtree(partial_dir, ignore_errors=True)
+        if not os.path.isdir(out_dir):
+            raise
+    return written
+
+
+def unpack_task(item, pack, kinds):
+    """流水线任务：本地没有而包中已有的派生目录先解包，后续阶段即可直接命中缓存
+
+    kinds: {派生类型: 判断条目是否需要该类型的函数}。只解包本次构建扫描到的条目需要的目录。
+    """
+    for kind, accepts in kinds.items():
+        out_dir = derivative_dir(kind, item['digest'])
+        if not accepts(item) or os.path.isdir(out_dir):
+            continue
+        prefix = _pack_name(out_dir) + '/'
+        entries = entries_under(pack, prefix)
+        if not entries:
+            continue
+        try:
+            unpacked = _materialize(pack, entries, prefix, out_dir)
+        except OSError as e:
+            item['log'].append(f"   ⚠️  Could not unpack {kind} for {item['path']}: {e}")
+            continue
+        item['log'].append(f"   📦 unpacked: {kind} for {item['path']} ({format_bytes(unpacked)})")
+    return item
+
+
+def _local_files(out_dir):
+    """本地派生目录中的文件 {包中名称: (大小, 修改时间)}（跳过临时文件）"""
+    files = {}
+    for root, dirs, names in os.walk(out_dir):
+        for name in names:
+            if name.endswith(('.tmp', '.partial')):
+                continue
+            stat = os.stat(os.path.join(root, name))
+            files[_pack_name(os.path.join(root, name))] = (stat.st_size, stat.st_mtime_ns)
+    return files
+
+
+def _copy_file(path, segment):
+    """把本地文件追加到段文件"""
+    with open(path, 'rb') as f:
+        shutil.copyfileobj(f, segment, COPY_CHUNK_SIZE)
+
+
+def _copy_entry(pack, entry, segment):
+    """把旧段中的条目直接从映射写入新段"""
+    with entry_view(pack, entry) as view:
+        segment.write(view)
+
+
+def _close_segment(segment):
+    """落盘并关闭段文件；索引只在数据落盘后才引用它"""
+    segment.flush()
+    os.fsync(segment.fileno())
+    segment.close()
+
+
+def _write_segments(pack_dir, number, sources):
+    """把 sources [(名称, 修改时间, 写入函数)] 依次追加到第 number 段起的段文件（写满换下一段），返回新条目"""
+    os.makedirs(pack_dir, exist_ok=True)
+    entries = []
+    segment = open(_segment_path(pack_dir, number), 'ab')
+    try:
+        for name, mtime_ns, copy in sources:
+            if segment.tell() >= SEGMENT_MAX_BYTES:
+                _close_segment(segment)
+                number += 1
+                segment = open(_segment_path(pack_dir, number), 'ab')
+            offset = segment.tell()
+            copy(segment)
+            entries.append(PackEntry(name, number, offset, segment.tell() - offset, mtime_ns))
+    finally:
+        _close_segment(segment)
+    return entries
+
+
+def _write_index(pack_dir, entries):
+    """按名称排序写出新索引并原子替换旧索引"""
+    entries = sorted(entries, key=lambda entry: entry.name.encode('utf-8'))
+    table = bytearray()
+    names = bytearray()
+    for entry in entries:
+        raw = entry.name.encode('utf-8')
+        table += ENTRY.pack(len(names), len(raw), entry.segment, entry.offset, entry.length, entry.mtime_ns)
+        names += raw
+    path = os.path.join(pack_dir, INDEX_FILE)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(INDEX_MAGIC, len(entries)))
+        f.write(table)
+        f.write(names)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def pack_stats(pack_dir=PACK_DIR):
+    """返回 (条目数, 有效字节数, 段文件总字节数, 段文件数)"""
+    pack = open_pack(pack_dir)
+    entries = all_entries(pack) if pack else []
+    close_pack(pack)
+    numbers = _segment_numbers(pack_dir)
+    total = sum(os.path.getsize(_segment_path(pack_dir, number)) for number in numbers)
+    return len(entries), sum(entry.length for entry in entries), total, len(numbers)
+
+
+def compact(live_keys, pack_dir=PACK_DIR):
+    """只保留键（源内容哈希前缀）在 live_keys 中的派生目录，写入新段后替换索引并删除旧段
+
+    返回 (保留的字节数, 回收的字节数)。新段和新索引落盘之前旧段保持不变，中断不会丢失数据。
+    """
+    pack = open_pack(pack_dir)
+    if not pack:
+        return 0, 0
+    old_numbers = _segment_numbers(pack_dir)
+    old_bytes = sum(os.path.getsize(_segment_path(pack_dir, number)) for number in old_numbers)
+    try:
+        live = [entry for entry in all_entries(pack) if _dir_of(entry.name).split('/')[-1] in live_keys]
+        sources = [(entry.name, entry.mtime_ns, lambda segment, entry=entry: _copy_entry(pack, entry, segment))
+                   for entry in live]
+        entries = _write_segments(pack_dir, max(old_numbers) + 1, sources) if sources else []
+    finally:
+        close_pack(pack)
+    _write_index(pack_dir, entries)
+    for number in old_numbers:
+        os.remove(_segment_path(pack_dir, number))
+    kept = sum(entry.length for entry in entries)
+    return kept, old_bytes - kept
+
+
+def pack_derivatives(items, kinds, pack_dir=PACK_DIR):
+    """把本次构建用到、包中缺失或已变化的派生目录追加到包中；失效字节过多时压缩
+
+    目录是整体替换的单位：文件列表、大小或修改时间有任何不同就追加整个目录，旧内容成为失效字节。
+    """
+    pack = open_pack(pack_dir)
+    by_dir = {}
+    for entry in all_entries(pack) if pack else []:
+        by_dir.setdefault(_dir_of(entry.name), {})[entry.name] = entry
+    close_pack(pack)
+
+    sources = []
+    changed_dirs = set()
+    seen = set()
+    for item in items:
+        for kind, accepts in kinds.items():
+            out_dir = derivative_dir(kind, item['digest'])
+            # 内容相同的文件共用一个派生目录，只检查一次
+            if out_dir in seen or not accepts(item) or not os.path.isdir(out_dir):
+                continue
+            seen.add(out_dir)
+            files = _local_files(out_dir)
+            packed = by_dir.get(_pack_name(out_dir), {})
+            if not files or files == {name: (entry.length, entry.mtime_ns) for name, entry in packed.items()}:
+                continue
+            changed_dirs.add(_pack_name(out_dir))
+            sources += [(name, mtime_ns, lambda segment, path=os.path.join(DERIVATIVES_DIR, *name.split('/')):
+                         _copy_file(path, segment)) for name, (size, mtime_ns) in sorted(files.items())]
+
+    entries = [entry for directory, files in by_dir.items() if directory not in changed_dirs
+               for entry in files.values()]
+    if sources:
+        numbers = _segment_numbers(pack_dir)
+        try:
+            appended = _write_segments(pack_dir, numbers[-1] if numbers else 1, sources)
+        except OSError as e:
+            print(f"   ⚠️  Could not update the derivative pack: {e}")
+            return
+        entries += appended
+        _write_index(pack_dir, entries)
+        print(f"   📦 Packed {len(changed_dirs)} derivative directories ({len(appended)} files,"
+              f" {format_bytes(sum(entry.length for entry in appended))}) into {pack_dir}/")
+
+    live_keys = {item['digest'][:16] for item in items}
+    used_bytes = sum(entry.length for entry in entries if _dir_of(entry.name).split('/')[-1] in live_keys)
+    total_bytes = sum(os.path.getsize(_segment_path(pack_dir, number)) for number in _segment_numbers(pack_dir))
+    if total_bytes - used_bytes > used_bytes * COMPACT_UNUSED_RATIO:
+        kept, reclaimed = compact(live_keys, pack_dir)
+        print(f"   📦 Compacted the derivative pack: kept {format_bytes(kept)}, reclaimed {format_bytes(reclaimed)}")
+    else:
+        print(f"   📦 Derivative pack: {len(entries)} files, {format_bytes(used_bytes)} used by this build,"
+              f" {format_bytes(total_bytes - used_bytes)} unused")
+
+
+def export(live_keys, out_dir=DERIVATIVES_DIR, pack_dir=PACK_DIR):
+    """把键在 live_keys 中的派生目录从包中写到 out_dir，返回 (目录数, 字节数)；已存在的目录跳过"""
+    pack = open_pack(pack_dir)
+    if not pack:
+        raise SystemExit(f"❌ No derivative pack in {pack_dir}")
+    directories = 0
+    written = 0
+    try:
+        by_dir = {}
+        for entry in all_entries(pack):
+            by_dir.setdefault(_dir_of(entry.name), []).append(entry)
+        for directory, entries in sorted(by_dir.items()):
+            target = os.path.join(out_dir, *directory.split('/'))
+            if directory.split('/')[-1] not in live_keys or os.path.isdir(target):
+                continue
+            written += _materialize(pack, entries, directory + '/', target)
+            directories += 1
+    finally:
+        close_pack(pack)
+    return directories, written
+
+
+def main(argv=None):
+    """命令行：查看、压缩或导出派生文件包"""
+    parser = argparse.ArgumentParser(description='Inspect, compact or export the derivative pack.')
+    parser.add_argument('--pack-dir', default=PACK_DIR, help=f'pack directory (default: {PACK_DIR})')
+    parser.add_argument('--catalog', default=CATALOG_PATH, help=f'catalog file (default: {CATALOG_PATH})')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('stats', help='files, live and reclaimable bytes')
+    commands.add_parser('compact', help='drop derivatives of media that are no longer in the catalog')
+    export_command = commands.add_parser('export', help='write the derivatives of the media in the catalog')
+    export_command.add_argument('--out', default=DERIVATIVES_DIR, help=f'output directory (default: {DERIVATIVES_DIR})')
+    args = parser.parse_args(argv)
+
+    if args.command == 'stats':
+        count, live_bytes, total_bytes, segments = pack_stats(args.pack_dir)
+        print(f"{count} files, {format_bytes(live_bytes)} live, {format_bytes(total_bytes - live_bytes)} reclaimable"
+              f" in {segments} segments")
+        return
+
+    # 目录库记录了最近一次构建中存在的媒体，它们的派生目录就是需要保留或导出的内容
+    conn = open_catalog(args.catalog)
+    live_keys = {row['hash'][:16] for row in media_rows(conn).values()}
+    conn.close()
+    if args.command == 'compact':
+        kept, reclaimed = compact(live_keys, args.pack_dir)
+        print(f"Kept {format_bytes(kept)}, reclaimed {format_bytes(reclaimed)}")
+    else:
+        directories, written = export(live_keys, args.out, args.pack_dir)
+        print(f"Exported {directories} derivative directories ({format_bytes(written)}) to {args.out}/")
+
+
+if __name__ == "__main__":
+    main()
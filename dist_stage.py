@@ -0,0 +1,129 @@
+# dist_stage.py - 只发布页面实际引用的文件：硬链接/reflink到 dist/，并报告被排除的内容
+import os
+import errno
+import shutil
+
+from build_cache import CACHE_DIR, format_bytes
+from shard_build import SHARD_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows 没有 fcntl，只能硬链接或复制
+    fcntl = None
+
+DIST_DIR = 'dist'
+# 多画廊构建时各画廊的页面文件目录（sites/<名称>/）
+SITES_DIR = 'sites'
+# Linux ioctl FICLONE：写时复制克隆（btrfs、XFS等），不占额外空间
+FICLONE = 0x40049409
+# 这些目录不计入排除报告
+REPORT_SKIP_DIRS = {CACHE_DIR, DIST_DIR, SITES_DIR, SHARD_DIR, '__pycache__'}
+REPORT_TOP_ENTRIES = 10
+
+
+def _reflink(src, dst):
+    """以写时复制方式克隆文件，文件系统不支持时抛出 OSError"""
+    if fcntl is None:
+        raise OSError(errno.EOPNOTSUPP, 'reflink is not supported on this platform')
+    with open(src, 'rb') as source, open(dst, 'wb') as target:
+        fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+
+
+def link_file(src, dst):
+    """依次尝试硬链接、reflink、复制，返回实际使用的方式"""
+    try:
+        os.link(src, dst)
+        return 'hardlink'
+    except OSError:
+        pass
+    try:
+        _reflink(src, dst)
+        return 'reflink'
+    except OSError:
+        if os.path.exists(dst):
+            os.remove(dst)
+    shutil.copy2(src, dst)
+    return 'copy'
+
+
+def _expand(assets):
+    """展开目录条目，返回规范化后的文件路径集合"""
+    files = set()
+    for asset in assets:
+        path = os.path.normpath(asset)
+        if os.path.isabs(path) or path.startswith(os.pardir):
+            print(f"   ⚠️  Not publishing {asset}: outside the site root")
+            continue
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                files.update(os.path.join(root, name) for name in names if not name.endswith('.tmp'))
+        elif os.path.isfile(path):
+            files.add(path)
+        else:
+            print(f"   ⚠️  Referenced file is missing: {asset}")
+    return files
+
+
+def _excluded_files(published):
+    """列出站点根目录中未发布的文件（跳过隐藏文件和构建目录）"""
+    excluded = []
+    for root, dirs, names in os.walk('.'):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.') and d not in REPORT_SKIP_DIRS)
+        for name in names:
+            path = os.path.relpath(os.path.join(root, name))
+            if not name.startswith('.') and path not in published:
+                excluded.append(path)
+    return excluded
+
+
+def _published_path(path, site_dir):
+    """文件在发布目录中的相对路径：site_dir 中的页面文件放在发布目录根部，媒体保持原有路径"""
+    if site_dir != os.curdir and path.startswith(site_dir + os.sep):
+        return os.path.relpath(path, site_dir)
+    return path
+
+
+def stage_dist(assets, out_dir=DIST_DIR, site_dir=os.curdir):
+    """把引用到的文件链接到 out_dir（每次重建），打印发布与排除报告"""
+    files = sorted(_expand(assets))
+    site_dir = os.path.normpath(site_dir)
+    # 先链接到临时目录，完成后再整体替换；中断时上次发布的内容保持完整
+    partial_dir = out_dir + '.partial'
+    shutil.rmtree(partial_dir, ignore_errors=True)
+    os.makedirs(partial_dir)
+
+    methods = {}
+    published_bytes = 0
+    for path in files:
+        target = os.path.join(partial_dir, _published_path(path, site_dir))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        method = link_file(path, target)
+        methods[method] = methods.get(method, 0) + 1
+        published_bytes += os.path.getsize(path)
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(partial_dir, out_dir)
+
+    how = ', '.join(f'{count} {method}' for method, count in sorted(methods.items()))
+    print(f"   📦 Published {len(files)} files ({format_bytes(published_bytes)}) to {out_dir}/ ({how or 'empty'})")
+
+    # 按顶层目录汇总被排除的内容；根目录下的文件按扩展名汇总
+    groups = {}
+    for path in _excluded_files(set(files)):
+        if os.sep in path:
+            top = path.split(os.sep)[0] + '/'
+        else:
+            ext = os.path.splitext(path)[1]
+            top = f'./*{ext}' if ext else f'./{path}'
+        count, size = groups.get(top, (0, 0))
+        groups[top] = (count + 1, size + os.path.getsize(path))
+    excluded_count = sum(count for count, _ in groups.values())
+    excluded_bytes = sum(size for _, size in groups.values())
+    print(f"   🚫 Excluded {excluded_count} unreferenced files ({format_bytes(excluded_bytes)}):")
+    ranked = sorted(groups.items(), key=lambda item: (-item[1][1], item[0]))
+    for top, (count, size) in ranked[:REPORT_TOP_ENTRIES]:
+        print(f"      - {top} {count} file{'s' if count != 1 else ''}, {format_bytes(size)}")
+    if len(ranked) > REPORT_TOP_ENTRIES:
+        rest = ranked[REPORT_TOP_ENTRIES:]
+        print(f"      - ... {len(rest)} more entries, {format_bytes(sum(size for _, (_, size) in rest))}")
+
+    return {'published': files, 'methods': methods, 'excluded': groups}
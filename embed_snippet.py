@@ -0,0 +1,84 @@
+# embed_snippet.py - 供外部wiki页面嵌入的小体积画廊片段：首屏缩略图条 + 按需从媒体清单加载其余图片
+import html
+
+from build_cache import write_text
+
+SNIPPET_FILE = 'gallery_snippet.html'
+# 片段大小上限（字节）；无论档案多大，内联的缩略图数量都会收缩到预算以内
+SNIPPET_MAX_BYTES = 6 * 1024
+FIRST_STRIP_ITEMS = 8
+# 滚动到缩略图条末尾时每次追加的数量
+LAZY_BATCH = 12
+
+SNIPPET_STYLE = '''<style>
+.igem-embed{font-family:Georgia,'Times New Roman',serif;color:#1b263b}
+.igem-embed-strip{display:flex;gap:8px;overflow-x:auto;scroll-snap-type:x mandatory;padding-bottom:6px}
+.igem-embed-strip a{flex:0 0 160px;scroll-snap-align:start}
+.igem-embed-strip img{display:block;width:160px;height:120px;object-fit:cover;border-radius:8px;background:#f1f5f9}
+.igem-embed-sentinel{flex:0 0 1px}
+.igem-embed-all{display:inline-block;margin-top:6px;color:#27ae60;font-weight:600}
+</style>'''
+
+# 脚本只在缩略图条滚动到末尾时才请求媒体清单
+SNIPPET_SCRIPT = '''<script>
+(function(root){
+var strip=root.querySelector('.igem-embed-strip'),sentinel=root.querySelector('.igem-embed-sentinel');
+var base=root.dataset.base,items=null,next=Number(root.dataset.skip),busy=false;
+if(!('IntersectionObserver' in window))return;
+function add(){
+items.slice(next,next+__BATCH__).forEach(function(item){
+var a=document.createElement('a'),img=document.createElement('img');
+a.href=base+'__PAGE__#'+item.section;a.title=item.title;
+img.src=base+item.thumb;img.alt=item.title;img.loading='lazy';img.width=160;img.height=120;
+a.appendChild(img);strip.insertBefore(a,sentinel);});
+next+=__BATCH__;if(next>=items.length)observer.disconnect();}
+var observer=new IntersectionObserver(function(entries){
+if(!entries[0].isIntersecting||busy)return;
+if(items)return add();
+busy=true;fetch(base+root.dataset.manifest).then(function(r){return r.json();}).then(function(m){
+items=m.items.filter(function(item){return item.thumb;});busy=false;add();
+}).catch(function(){observer.disconnect();});
+},{root:strip,rootMargin:'0px 320px 0px 0px'});
+observer.observe(sentinel);
+})(document.currentScript.parentElement);
+</script>'''
+
+
+def render_snippet(items, base_url, page_url, manifest_url, strip_count):
+    """生成片段HTML：前 strip_count 张缩略图内联，其余由脚本按需加载"""
+    links = []
+    for item in items[:strip_count]:
+        title = html.escape(item['title'])
+        links.append(f'<a href="{html.escape(base_url + page_url)}#{item["section"]}" title="{title}">'
+                     f'<img src="{html.escape(base_url + item["thumb"])}" alt="{title}" loading="lazy"'
+                     f' width="160" height="120"></a>')
+    script = (SNIPPET_SCRIPT.replace('__BATCH__', str(LAZY_BATCH))
+              .replace('__PAGE__', page_url.replace("'", "\\'")))
+    return (f'<!-- iGEM media gallery embed, generated by build_site.py --snippet -->\n'
+            f'<div class="igem-embed" data-base="{html.escape(base_url)}" data-manifest="{html.escape(manifest_url)}"'
+            f' data-skip="{strip_count}">\n'
+            f'{SNIPPET_STYLE}\n'
+            f'<div class="igem-embed-strip">{"".join(links)}<span class="igem-embed-sentinel"></span></div>\n'
+            f'<a class="igem-embed-all" href="{html.escape(base_url + page_url)}">'
+            f'Open the full archive ({len(items)} images)</a>\n'
+            f'{script}\n'
+            f'</div>\n')
+
+
+def write_snippet(manifest, base_url, page_url, manifest_url, max_bytes=SNIPPET_MAX_BYTES, path=SNIPPET_FILE):
+    """按字节预算写出片段；只有带缩略图的图片条目参与，返回内联的缩略图数量"""
+    items = [item for item in manifest['items'] if item.get('thumb')]
+    if not items:
+        print("   ⚠️  Snippet has no thumbnails: they come from the small image sizes of --optimize-images")
+    for strip_count in range(min(FIRST_STRIP_ITEMS, len(items)), -1, -1):
+        snippet = render_snippet(items, base_url, page_url, manifest_url, strip_count)
+        size = len(snippet.encode('utf-8'))
+        if size <= max_bytes:
+            break
+    else:
+        raise SystemExit(f"❌ Snippet needs {size} bytes even without thumbnails; raise --snippet-budget")
+
+    write_text(path, snippet, newline='\n')
+    print(f"   🧩 Snippet: {path} {size / 1024:.1f} KB of {max_bytes / 1024:.1f} KB budget,"
+          f" {strip_count} inline thumbnails, {len(items) - strip_count} lazy")
+    return strip_count
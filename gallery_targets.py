@@ -0,0 +1,62 @@
+# gallery_targets.py - 多画廊构建：一次进程中渲染多个画廊定义，共用扫描、目录库和派生文件缓存
+import os
+import re
+
+from build_cache import load_json
+from dist_stage import DIST_DIR, SITES_DIR
+from service_worker import CACHE_PREFIX
+
+TARGETS_FILE = 'galleries.json'
+# 名称用于目录和缓存名；不含连字符，避免一个画廊的缓存名成为另一个的前缀
+TARGET_NAME = re.compile(r'[A-Za-z0-9_]+')
+
+
+def single_target(config_path):
+    """单画廊构建：页面文件写在当前目录，发布到 dist/"""
+    return {'name': None, 'config': config_path, 'site_dir': '.', 'dist_dir': DIST_DIR,
+            'cache_prefix': CACHE_PREFIX}
+
+
+def load_targets(path=TARGETS_FILE):
+    """读取画廊列表，每项包含 name 和 config（该画廊的分区配置文件）"""
+    config = load_json(path)
+    if not config or not config.get('targets'):
+        raise SystemExit(f"❌ {path} must define a non-empty \"targets\" list")
+
+    targets = []
+    seen = set()
+    for raw in config['targets']:
+        name = raw.get('name', '')
+        if not TARGET_NAME.fullmatch(name):
+            raise SystemExit(f"❌ Gallery {raw!r}: name must use letters, digits and underscores only")
+        if name in seen:
+            raise SystemExit(f"❌ Duplicate gallery name: {name}")
+        if not raw.get('config'):
+            raise SystemExit(f"❌ Gallery {name} is missing config")
+        seen.add(name)
+        # 页面、搜索索引和媒体清单写在 sites/<名称>/，发布到 dist/<名称>/
+        targets.append({'name': name, 'config': raw['config'], 'site_dir': os.path.join(SITES_DIR, name),
+                        'dist_dir': os.path.join(DIST_DIR, name), 'cache_prefix': f'{CACHE_PREFIX}-{name}'})
+    return targets
+
+
+def scan_sections(targets):
+    """合并所有画廊的分区：每个源目录只扫描一次，由第一个使用它的分区代表
+
+    不同画廊可以用同一个分区ID指向不同目录，扫描用的分区ID在冲突时加上序号。
+    """
+    by_root = {}
+    used_ids = set()
+    for target in targets:
+        for section in target['sections']:
+            root = os.path.normpath(section['root'])
+            if root in by_root:
+                continue
+            scan_id = section['id']
+            number = 2
+            while scan_id in used_ids:
+                scan_id = f"{section['id']}-{number}"
+                number += 1
+            used_ids.add(scan_id)
+            by_root[root] = dict(section, id=scan_id)
+    return list(by_root.values())
@@ -0,0 +1,93 @@
+# git_objects.py - 从git索引读取文件的blob ID作为内容键，并用 git diff 找出上次构建以来的变化
+import os
+import subprocess
+
+# git diff --name-status 的状态字母
+CHANGE_LABELS = {'A': 'added', 'M': 'modified', 'D': 'deleted', 'R': 'renamed', 'C': 'copied',
+                 'T': 'type changed'}
+# 只使用普通文件的条目（跳过符号链接 120000 和子模块 160000）
+BLOB_MODES = (b'100644', b'100755')
+
+
+def _git(*args):
+    """运行git命令并返回标准输出（字节）；git不可用或当前目录不在仓库中时返回None"""
+    try:
+        result = subprocess.run(['git', *args], capture_output=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout
+
+
+def object_format():
+    """仓库使用的对象哈希算法（sha1 或 sha256），不在仓库中时返回None"""
+    output = _git('rev-parse', '--show-object-format')
+    name = output.decode().strip() if output else None
+    return name if name in ('sha1', 'sha256') else None
+
+
+def head_commit():
+    """当前检出的提交，没有提交时返回None"""
+    output = _git('rev-parse', '--verify', '-q', 'HEAD')
+    return output.decode().strip() if output else None
+
+
+def tracked_blobs(roots):
+    """返回 roots 下已跟踪且工作区未修改的文件 {路径: blob ID}；只读取索引，不读取文件内容"""
+    listing = _git('ls-files', '--stage', '-z', '--', *roots)
+    if not listing:
+        return {}
+    # 工作区与索引不一致（或索引中的stat信息已过期）的文件需要自行计算哈希
+    modified = {os.path.normpath(os.fsdecode(path))
+                for path in (_git('ls-files', '--modified', '-z', '--', *roots) or b'').split(b'\0') if path}
+
+    blobs = {}
+    for entry in listing.split(b'\0'):
+        if not entry:
+            continue
+        info, raw_path = entry.split(b'\t', 1)
+        mode, blob, merge_stage = info.split(b' ')
+        path = os.path.normpath(os.fsdecode(raw_path))
+        if mode in BLOB_MODES and merge_stage == b'0' and path not in modified:
+            blobs[path] = blob.decode()
+    return blobs
+
+
+def changes_since(commit, roots):
+    """列出 commit 之后 roots 下的变化（含未提交的修改），返回 [(状态, 路径, 原路径)]
+
+    提交不在本地历史中（例如CI的浅克隆）时返回None。未跟踪的文件不在其中。
+    """
+    if _git('cat-file', '-e', f'{commit}^{{commit}}') is None:
+        return None
+    output = _git('diff', '--name-status', '--no-ext-diff', '-z', '-M', commit, '--', *roots)
+    if output is None:
+        return None
+
+    fields = output.split(b'\0')
+    changes = []
+    index = 0
+    while index < len(fields) and fields[index]:
+        status = fields[index].decode()[0]
+        if status in 'RC':
+            # 重命名/复制：状态之后依次是原路径和新路径
+            changes.append((status, os.fsdecode(fields[index + 2]), os.fsdecode(fields[index + 1])))
+            index += 3
+        else:
+            changes.append((status, os.fsdecode(fields[index + 1]), None))
+            index += 2
+    return changes
+
+
+def last_commit_times(roots):
+    """roots 下每个文件最后一次被修改的提交时间 {路径: 秒}；浅克隆中只能看到已拉取的历史"""
+    output = _git('log', '--format=%x01%ct', '--name-only', '--relative', '-z', '--', *roots)
+    times = {}
+    commit_time = None
+    for field in (output or b'').split(b'\0'):
+        field = field.strip(b'\n')
+        if field.startswith(b'\x01'):
+            commit_time = int(field[1:])
+        elif field and commit_time is not None:
+            # 日志从新到旧，第一次出现即最后一次修改
+            times.setdefault(os.path.normpath(os.fsdecode(field)), commit_time)
+    return times
@@ -0,0 +1,179 @@
+# image_stage.py - 图片无损/近无损优化（可选，依赖Pillow）
+import io
+import os
+
+from build_cache import derivative_dir, format_bytes, load_json, params_hash, save_json, to_url
+from content_hash import file_hash
+
+try:
+    from PIL import Image, ImageChops, ImageOps
+    from PIL.JpegImagePlugin import get_sampling
+except ImportError:  # Pillow 为可选依赖
+    Image = None
+
+# 弹窗显示用派生图的最长边（像素）
+MODAL_MAX_EDGE = 2048
+# 更小的弹窗尺寸档位（最长边），页面按视口和DPR选择并预取相邻图片
+MODAL_EDGES = (640, 1024, 1536)
+JPEG_RESIZE_QUALITY = 85
+WEBP_RESIZE_QUALITY = 90
+OPTIMIZE_PARAMS = {'modal_max_edge': MODAL_MAX_EDGE, 'modal_edges': MODAL_EDGES,
+                   'jpeg_quality': JPEG_RESIZE_QUALITY, 'webp_quality': WEBP_RESIZE_QUALITY, 'version': 2}
+
+# 只处理这些格式；GIF 可能是动图，WebP/AVIF 已经足够紧凑
+OPTIMIZABLE_TYPES = ('jpeg', 'png', 'bmp', 'tiff')
+RESULT_FILE = 'optimize.json'
+
+
+def _encode_jpeg(image, source_image, resized):
+    """JPEG：Huffman表优化 + 渐进式；未缩放时沿用原量化表和采样方式（近无损）"""
+    buffer = io.BytesIO()
+    options = {'optimize': True, 'progressive': True}
+    if resized:
+        options['quality'] = JPEG_RESIZE_QUALITY
+    else:
+        options['qtables'] = source_image.quantization
+        options['subsampling'] = get_sampling(source_image)
+    icc_profile = source_image.info.get('icc_profile')
+    if icc_profile:
+        options['icc_profile'] = icc_profile
+    image.save(buffer, 'JPEG', **options)
+    return buffer.getvalue(), '.jpg'
+
+
+def _encode_lossless(image, source_image):
+    """PNG等无损格式：在无损WebP与调色板PNG中选择更小的一个"""
+    candidates = []
+    icc_profile = source_image.info.get('icc_profile')
+
+    buffer = io.BytesIO()
+    webp_options = {'lossless': True, 'method': 6, 'quality': 100}
+    if icc_profile:
+        webp_options['icc_profile'] = icc_profile
+    image.save(buffer, 'WEBP', **webp_options)
+    candidates.append((buffer.getvalue(), '.webp'))
+
+    # 截图类图片颜色通常不超过256种，可转为调色板；仅在逐像素一致时采用
+    if image.mode in ('RGB', 'RGBA') and image.getcolors(256) is not None:
+        paletted = image.quantize(colors=256, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+        if ImageChops.difference(paletted.convert(image.mode), image).getbbox() is None:
+            buffer = io.BytesIO()
+            paletted.save(buffer, 'PNG', optimize=True)
+            candidates.append((buffer.getvalue(), '.png'))
+
+    return min(candidates, key=lambda candidate: len(candidate[0]))
+
+
+def _encode_resized(image, source_image, edge):
+    """生成最长边为 edge 的缩小图：JPEG源输出JPEG，其余输出有损WebP"""
+    resized = image.copy()
+    resized.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    options = {}
+    icc_profile = source_image.info.get('icc_profile')
+    if icc_profile:
+        options['icc_profile'] = icc_profile
+    if source_image.format == 'JPEG':
+        resized.save(buffer, 'JPEG', quality=JPEG_RESIZE_QUALITY, optimize=True, progressive=True, **options)
+        return resized.size, buffer.getvalue(), '.jpg'
+    if resized.mode not in ('RGB', 'RGBA'):
+        resized = resized.convert('RGBA' if 'A' in resized.getbands() or 'transparency' in resized.info else 'RGB')
+    resized.save(buffer, 'WEBP', quality=WEBP_RESIZE_QUALITY, method=4, **options)
+    return resized.size, buffer.getvalue(), '.webp'
+
+
+def _write_output(out_dir, name, data):
+    """原子写入派生文件，返回其URL"""
+    os.makedirs(out_dir, exist_ok=True)
+    out_path = os.path.join(out_dir, name)
+    tmp_path = f'{out_path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, out_path)
+    return to_url(out_path)
+
+
+def optimize_image(image_path, digest=None):
+    """优化单张图片；结果按源文件哈希缓存，返回结果描述"""
+    digest = digest or file_hash(image_path)
+    out_dir = derivative_dir('optimized', digest)
+    fingerprint = params_hash(OPTIMIZE_PARAMS)
+    original_bytes = os.path.getsize(image_path)
+
+    result = load_json(os.path.join(out_dir, RESULT_FILE))
+    if result and result.get('params') == fingerprint:
+        return dict(result, cached=True)
+
+    with Image.open(image_path) as source_image:
+        source_image.load()
+        # 先按EXIF方向旋转，之后丢弃全部元数据
+        image = ImageOps.exif_transpose(source_image)
+        if image.mode not in ('RGB', 'RGBA', 'L', 'LA', 'P'):
+            image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+        # 各个较小的弹窗档位，从小到大排列：[宽, 高, URL]
+        sizes = []
+        for edge in MODAL_EDGES:
+            if edge >= max(image.size):
+                break
+            size, rung_data, rung_ext = _encode_resized(image, source_image, edge)
+            sizes.append([size[0], size[1], _write_output(out_dir, f'modal-{edge}{rung_ext}', rung_data)])
+
+        resized = max(image.size) > MODAL_MAX_EDGE
+        if resized:
+            image.thumbnail((MODAL_MAX_EDGE, MODAL_MAX_EDGE), Image.Resampling.LANCZOS)
+
+        if source_image.format == 'JPEG':
+            data, ext = _encode_jpeg(image, source_image, resized)
+        else:
+            data, ext = _encode_lossless(image, source_image)
+
+    result = {'params': fingerprint, 'original_bytes': original_bytes, 'width': image.width,
+              'height': image.height, 'output': None, 'optimized_bytes': original_bytes, 'sizes': sizes}
+    # 只有确实更小时才使用派生图，否则继续使用原图
+    if len(data) < original_bytes:
+        result.update(output=_write_output(out_dir, 'modal' + ext, data), optimized_bytes=len(data))
+    save_json(os.path.join(out_dir, RESULT_FILE), result)
+    return dict(result, cached=False)
+
+
+def pillow_available():
+    """图片优化依赖Pillow"""
+    return Image is not None
+
+
+def accepts_image(item):
+    """图片优化阶段只处理这些格式的条目"""
+    return item['type'] in OPTIMIZABLE_TYPES
+
+
+def optimize_task(item):
+    """流水线任务（进程池）：优化单张图片；失败时记录错误而不是抛出异常"""
+    image_path = item['path']
+    try:
+        result = optimize_image(image_path, item.get('digest'))
+    except (OSError, ValueError) as e:
+        item['log'].append(f"   ❌ Optimization failed for {image_path}: {e}")
+        item.setdefault('failed', []).append('optimize')
+        return item
+
+    if result['output']:
+        item['derivatives']['optimized'] = result['output']
+    if result['sizes']:
+        item['derivatives']['modal_sizes'] = result['sizes']
+    before, after = result['original_bytes'], result['optimized_bytes']
+    item['image_bytes'] = [before, after]
+    saved = before - after
+    status = 'cached' if result['cached'] else 'optimized'
+    item['log'].append(f"   🗜️  {status}: {image_path} {format_bytes(before)} → {format_bytes(after)}"
+                       f" (saved {format_bytes(saved)}, {saved * 100 / before if before else 0:.0f}%)")
+    return item
+
+
+def report_image_savings(items):
+    """打印图片优化阶段节省的总字节数"""
+    sizes = [item['image_bytes'] for item in items if 'image_bytes' in item]
+    total_before = sum(before for before, _ in sizes)
+    total_after = sum(after for _, after in sizes)
+    print(f"   📉 Images: {format_bytes(total_before)} → {format_bytes(total_after)}"
+          f" (saved {format_bytes(total_before - total_after)} across {len(sizes)} files)")
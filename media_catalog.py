@@ -0,0 +1,193 @@
+# media_catalog.py - 媒体目录库（SQLite，WAL模式）：每个媒体一行，按构建常用的查询建立索引
+import os
+import json
+import time
+import sqlite3
+import argparse
+
+from build_cache import CACHE_DIR
+from source_dates import media_date
+
+CATALOG_PATH = os.path.join(CACHE_DIR, 'catalog.sqlite')
+# 结构变化时递增；目录库只是缓存，版本不符时直接重建
+SCHEMA_VERSION = 3
+METADATA_FIELDS = ('width', 'height', 'taken', 'orientation', 'duration', 'phash')
+# 监视进程与构建进程同时访问时，等待对方提交的最长时间（秒）
+BUSY_TIMEOUT = 30
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS builds (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started REAL NOT NULL,
+    items INTEGER,
+    git_commit TEXT
+);
+CREATE TABLE IF NOT EXISTS media (
+    path TEXT PRIMARY KEY,
+    section TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    type TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    date REAL NOT NULL,
+    width INTEGER,
+    height INTEGER,
+    taken TEXT,
+    orientation INTEGER,
+    duration REAL,
+    phash TEXT,
+    derivatives TEXT NOT NULL DEFAULT '{}',
+    first_build INTEGER NOT NULL,
+    changed_build INTEGER NOT NULL,
+    removed_build INTEGER
+);
+CREATE INDEX IF NOT EXISTS media_changed ON media(changed_build);
+CREATE INDEX IF NOT EXISTS media_removed ON media(removed_build) WHERE removed_build IS NOT NULL;
+CREATE INDEX IF NOT EXISTS media_section_date ON media(section, date) WHERE removed_build IS NULL;
+CREATE INDEX IF NOT EXISTS media_hash ON media(hash) WHERE removed_build IS NULL;
+CREATE INDEX IF NOT EXISTS media_phash ON media(phash) WHERE phash IS NOT NULL AND removed_build IS NULL;
+'''
+
+# 内容、分区或派生文件变化（或重新出现）时才更新 changed_build
+UPSERT = f'''
+INSERT INTO media (path, section, hash, type, kind, bytes, mtime_ns, date, {', '.join(METADATA_FIELDS)},
+                   derivatives, first_build, changed_build, removed_build)
+VALUES (:path, :section, :hash, :type, :kind, :bytes, :mtime_ns, :date, {', '.join(':' + f for f in METADATA_FIELDS)},
+        :derivatives, :build, :build, NULL)
+ON CONFLICT(path) DO UPDATE SET
+    changed_build = CASE WHEN media.hash != excluded.hash OR media.section != excluded.section
+                           OR media.derivatives != excluded.derivatives OR media.removed_build IS NOT NULL
+                         THEN excluded.changed_build ELSE media.changed_build END,
+    section = excluded.section, hash = excluded.hash, type = excluded.type, kind = excluded.kind,
+    bytes = excluded.bytes, mtime_ns = excluded.mtime_ns, date = excluded.date,
+    {', '.join(f'{f} = excluded.{f}' for f in METADATA_FIELDS)},
+    derivatives = excluded.derivatives, removed_build = NULL
+'''
+
+
+def open_catalog(path=CATALOG_PATH):
+    """打开（必要时创建）目录库；WAL模式下读者不阻塞写者，监视进程和构建可以共用"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    if conn.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+        conn.executescript('DROP TABLE IF EXISTS media; DROP TABLE IF EXISTS builds;')
+    conn.executescript(SCHEMA)
+    conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+    return conn
+
+
+def known_metadata(conn):
+    """按内容哈希返回已提取的元数据（含已删除的条目，文件改名或恢复后无需重新提取）"""
+    rows = conn.execute(f"SELECT hash, kind, {', '.join(METADATA_FIELDS)} FROM media")
+    # 没有感知哈希的图片是在缺少Pillow时记录的，下次仍需提取
+    return {row['hash']: {field: row[field] for field in METADATA_FIELDS}
+            for row in rows if row['kind'] != 'image' or row['phash']}
+
+
+def record_build(conn, items, git_commit=None):
+    """在一个事务中登记本次构建的全部条目，把不再出现的条目标记为已删除，返回构建编号"""
+    with conn:
+        build = conn.execute('INSERT INTO builds (started, items, git_commit) VALUES (?, ?, ?)',
+                             (time.time(), len(items), git_commit)).lastrowid
+        conn.executemany(UPSERT, [
+            dict(item['stat'], **item['metadata'], path=item['path'], section=item['section'],
+                 date=media_date(item['metadata']['taken'], item['stat']['mtime_ns']),
+                 hash=item['digest'], type=item['type'], kind=item['kind'], build=build,
+                 derivatives=json.dumps(item['derivatives'], sort_keys=True))
+            for item in items])
+        present = {item['path'] for item in items}
+        gone = [row['path'] for row in conn.execute('SELECT path FROM media WHERE removed_build IS NULL')
+                if row['path'] not in present]
+        conn.executemany('UPDATE media SET removed_build = ? WHERE path = ?', [(build, path) for path in gone])
+    return build
+
+
+def _row(row):
+    """把查询结果转换为字典，派生文件字段解析为对象"""
+    record = dict(row)
+    record['derivatives'] = json.loads(record['derivatives'])
+    return record
+
+
+def media_rows(conn):
+    """返回当前存在的全部条目 {路径: 条目}"""
+    return {row['path']: _row(row) for row in conn.execute('SELECT * FROM media WHERE removed_build IS NULL')}
+
+
+def changed_since(conn, build):
+    """返回某次构建之后变化的条目和被删除的路径"""
+    changed = [_row(row) for row in conn.execute(
+        'SELECT * FROM media WHERE changed_build > ? AND removed_build IS NULL ORDER BY path', (build,))]
+    removed = [row['path'] for row in conn.execute(
+        'SELECT path FROM media WHERE removed_build > ? ORDER BY path', (build,))]
+    return changed, removed
+
+
+def section_media(conn, section, newest_first=False):
+    """按日期顺序（与页面相同：EXIF拍摄时间，没有时为修改时间）返回分区中的条目"""
+    order = 'DESC' if newest_first else 'ASC'
+    return [_row(row) for row in conn.execute(
+        f'SELECT * FROM media WHERE section = ? AND removed_build IS NULL ORDER BY date {order}, path {order}', (section,))]
+
+
+def duplicate_groups(conn, column='hash'):
+    """返回内容完全相同（hash）或感知哈希相同（phash）的路径分组"""
+    if column not in ('hash', 'phash'):
+        raise ValueError(f'cannot group duplicates by {column}')
+    rows = conn.execute(f'''
+        SELECT {column}, group_concat(path, char(10)) AS paths FROM media
+        WHERE {column} IS NOT NULL AND removed_build IS NULL
+        GROUP BY {column} HAVING count(*) > 1 ORDER BY {column}''')
+    return [sorted(row['paths'].split('\n')) for row in rows]
+
+
+def last_build(conn):
+    """最近一次构建的编号，尚未构建时为0"""
+    return conn.execute('SELECT coalesce(max(id), 0) FROM builds').fetchone()[0]
+
+
+def last_built_commit(conn):
+    """最近一次在git仓库中构建时检出的提交"""
+    row = conn.execute('SELECT git_commit FROM builds WHERE git_commit IS NOT NULL'
+                       ' ORDER BY id DESC LIMIT 1').fetchone()
+    return row['git_commit'] if row else None
+
+
+def main(argv=None):
+    """命令行查询：变化、分区、重复"""
+    parser = argparse.ArgumentParser(description='Query the media catalog written by build_site.py.')
+    parser.add_argument('--catalog', default=CATALOG_PATH, help=f'catalog file (default: {CATALOG_PATH})')
+    commands = parser.add_subparsers(dest='command', required=True)
+    changed = commands.add_parser('changed', help='media added or changed since a build')
+    changed.add_argument('--since', type=int, help='build number (default: the one before the latest)')
+    section = commands.add_parser('section', help='media of a section in date order')
+    section.add_argument('section_id')
+    section.add_argument('--newest-first', action='store_true')
+    duplicates = commands.add_parser('duplicates', help='files with identical or visually similar content')
+    duplicates.add_argument('--similar', action='store_true', help='group by perceptual hash instead')
+    args = parser.parse_args(argv)
+
+    conn = open_catalog(args.catalog)
+    if args.command == 'changed':
+        since = args.since if args.since is not None else max(last_build(conn) - 1, 0)
+        rows, removed = changed_since(conn, since)
+        print(f"Since build {since}: {len(rows)} changed, {len(removed)} removed")
+        for row in rows:
+            print(f"  ~ {row['path']} ({row['hash'][:16]}, build {row['changed_build']})")
+        for path in removed:
+            print(f"  - {path}")
+    elif args.command == 'section':
+        for row in section_media(conn, args.section_id, args.newest_first):
+            size = f"{row['width']}x{row['height']}" if row['width'] else '-'
+            print(f"  {time.strftime('%Y-%m-%d', time.localtime(row['date']))}  {size:>11}  {row['path']}")
+    else:
+        for group in duplicate_groups(conn, 'phash' if args.similar else 'hash'):
+            print('  = ' + '\n    '.join(group))
+
+
+if __name__ == "__main__":
+    main()
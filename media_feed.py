@@ -0,0 +1,75 @@
+# media_feed.py - 带 schema 版本的媒体清单，以及每次构建相对上一次的增量（新增/变更/删除）
+import os
+
+from build_cache import load_json, params_hash, save_json
+
+FEED_DIR = 'feed'
+SCHEMA_VERSION = 1
+MANIFEST_FILE = 'manifest.json'
+INDEX_FILE = 'index.json'
+DELTA_DIR = 'deltas'
+# 保留最近的增量数量；更早同步过的客户端需要重新拉取完整清单
+MAX_DELTAS = 50
+
+
+def _diff(previous_items, items):
+    """按源路径比较两次构建的条目"""
+    before = {item['path']: item for item in previous_items}
+    after = {item['path']: item for item in items}
+    added = [after[path] for path in sorted(after.keys() - before.keys())]
+    removed = [{'path': path, 'hash': before[path]['hash']} for path in sorted(before.keys() - after.keys())]
+    changed = [dict(after[path], previous_hash=before[path]['hash'])
+               for path in sorted(after.keys() & before.keys()) if after[path] != before[path]]
+    return added, changed, removed
+
+
+def write_media_feed(items, feed_dir=FEED_DIR):
+    """写出完整清单和本次构建的增量，返回清单
+
+    build_id 由全部条目的内容决定：内容不变时重复构建得到同一个ID，也不会产生新的增量。
+    """
+    items = sorted(items, key=lambda item: item['path'])
+    build_id = params_hash(items)
+    manifest_path = os.path.join(feed_dir, MANIFEST_FILE)
+    index_path = os.path.join(feed_dir, INDEX_FILE)
+
+    previous = load_json(manifest_path)
+    if previous and previous.get('schema') != SCHEMA_VERSION:
+        # schema 变化后旧增量无法衔接，从头开始记录
+        print(f"   ⚠️  Feed schema changed ({previous.get('schema')} → {SCHEMA_VERSION}); starting a new history")
+        previous = None
+    if previous and previous['build_id'] == build_id:
+        print(f"   📰 Media feed unchanged (build {build_id})")
+        return previous
+
+    previous_id = previous['build_id'] if previous else None
+    added, changed, removed = _diff(previous['items'] if previous else [], items)
+    save_json(os.path.join(feed_dir, DELTA_DIR, f'{build_id}.json'), {
+        'schema': SCHEMA_VERSION,
+        'build_id': build_id,
+        'since': previous_id,
+        'added': added,
+        'changed': changed,
+        'removed': removed,
+    })
+
+    index = load_json(index_path) if previous else None
+    # 上次在写完清单之前被中断时，索引中可能已有本次构建的记录
+    builds = [build for build in (index or {}).get('builds', []) if build['build_id'] != build_id]
+    builds.append({'build_id': build_id, 'since': previous_id, 'delta': f'{DELTA_DIR}/{build_id}.json',
+                   'added': len(added), 'changed': len(changed), 'removed': len(removed)})
+    for expired in builds[:-MAX_DELTAS]:
+        try:
+            os.remove(os.path.join(feed_dir, expired['delta']))
+        except OSError:
+            pass
+    builds = builds[-MAX_DELTAS:]
+    save_json(index_path, {'schema': SCHEMA_VERSION, 'latest': build_id, 'manifest': MANIFEST_FILE,
+                           'builds': builds})
+
+    manifest = {'schema': SCHEMA_VERSION, 'build_id': build_id, 'previous_build_id': previous_id,
+                'items': items}
+    save_json(manifest_path, manifest)
+    print(f"   📰 Media feed: build {build_id} (since {previous_id or 'scratch'}):"
+          f" +{len(added)} ~{len(changed)} -{len(removed)}")
+    return manifest
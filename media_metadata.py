@@ -0,0 +1,119 @@
+# media_metadata.py - 媒体元数据提取：尺寸、EXIF拍摄时间与方向、视频时长、感知哈希
+import os
+import struct
+from datetime import datetime
+
+from media_types import MEDIA_TYPES
+from mp4_faststart import MP4Error, iter_boxes
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow 为可选依赖，没有时图片只记录文件信息
+    Image = None
+
+# EXIF 标签：方向、修改时间，以及 Exif IFD 中的拍摄时间
+EXIF_ORIENTATION = 0x0112
+EXIF_DATETIME = 0x0132
+EXIF_IFD = 0x8769
+EXIF_DATETIME_ORIGINAL = 0x9003
+# 方向 5-8 表示旋转了90度，显示时宽高互换
+ROTATED_ORIENTATIONS = (5, 6, 7, 8)
+# dHash：缩放为 (N+1)×N 灰度图，比较相邻像素得到 N×N 位
+DHASH_SIZE = 8
+
+EMPTY_METADATA = {'width': None, 'height': None, 'taken': None, 'orientation': None, 'duration': None,
+                  'phash': None}
+
+
+def _exif_time(value):
+    """把EXIF时间（YYYY:MM:DD HH:MM:SS）转换为ISO格式，无效时返回None"""
+    try:
+        return datetime.strptime(str(value).strip('\x00 '), '%Y:%m:%d %H:%M:%S').isoformat()
+    except ValueError:
+        return None
+
+
+def _dhash(image):
+    """计算64位差值哈希（十六进制），用于发现缩放或重新压缩过的近似重复图片"""
+    gray = image.convert('L').resize((DHASH_SIZE + 1, DHASH_SIZE), Image.Resampling.BILINEAR)
+    pixels = list(gray.getdata())
+    bits = 0
+    for row in range(DHASH_SIZE):
+        for col in range(DHASH_SIZE):
+            left = pixels[row * (DHASH_SIZE + 1) + col]
+            bits = (bits << 1) | (left > pixels[row * (DHASH_SIZE + 1) + col + 1])
+    return f'{bits:016x}'
+
+
+def image_metadata(path):
+    """读取图片的显示尺寸、EXIF拍摄时间和方向，并计算感知哈希"""
+    if Image is None:
+        return dict(EMPTY_METADATA)
+    with Image.open(path) as image:
+        width, height = image.size
+        exif = image.getexif()
+        orientation = exif.get(EXIF_ORIENTATION)
+        taken = _exif_time(exif.get_ifd(EXIF_IFD).get(EXIF_DATETIME_ORIGINAL) or exif.get(EXIF_DATETIME) or '')
+        # JPEG 可以直接按缩小的比例解码，感知哈希只需要很小的图
+        image.draft('RGB', (DHASH_SIZE * 8, DHASH_SIZE * 8))
+        phash = _dhash(ImageOps.exif_transpose(image))
+    if orientation in ROTATED_ORIENTATIONS:
+        width, height = height, width
+    return dict(EMPTY_METADATA, width=width, height=height, taken=taken, orientation=orientation, phash=phash)
+
+
+def _children(f, offset, size, header_size):
+    """列出容器盒子的直接子盒子"""
+    return list(iter_boxes(f, offset + header_size, offset + size))
+
+
+def mp4_metadata(path):
+    """从 moov/mvhd 读取时长，从第一个视频轨道的 tkhd 读取尺寸（不解码，不依赖ffmpeg）"""
+    metadata = dict(EMPTY_METADATA)
+    with open(path, 'rb') as f:
+        moov = next((box for box in iter_boxes(f, 0, os.fstat(f.fileno()).st_size) if box[0] == b'moov'), None)
+        if moov is None:
+            raise MP4Error('missing moov box')
+        for box_type, offset, size, header_size in _children(f, *moov[1:]):
+            if box_type == b'mvhd':
+                f.seek(offset + header_size)
+                payload = f.read(32)
+                if payload[0] == 1:
+                    timescale, duration = struct.unpack_from('>IQ', payload, 20)
+                else:
+                    timescale, duration = struct.unpack_from('>II', payload, 12)
+                if timescale:
+                    metadata['duration'] = round(duration / timescale, 3)
+            elif box_type == b'trak' and metadata['width'] is None:
+                tkhd = next((box for box in _children(f, offset, size, header_size) if box[0] == b'tkhd'), None)
+                if tkhd:
+                    # tkhd 末尾是16.16定点数的宽和高；音频轨道为0
+                    f.seek(tkhd[1] + tkhd[2] - 8)
+                    width, height = struct.unpack('>II', f.read(8))
+                    if width and height:
+                        metadata['width'], metadata['height'] = width >> 16, height >> 16
+    return metadata
+
+
+def extract_metadata(path, media_type):
+    """按媒体类型提取元数据；无法提取的字段为None"""
+    if media_type.kind == 'image':
+        return image_metadata(path)
+    if media_type.name in ('mp4', 'mov'):
+        return mp4_metadata(path)
+    return dict(EMPTY_METADATA)
+
+
+def metadata_task(item, known):
+    """流水线任务：记录文件信息和元数据；媒体目录库中已有相同内容哈希的条目时直接复用其元数据"""
+    stat = os.stat(item['path'])
+    item['stat'] = {'bytes': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    metadata = known.get(item['digest'])
+    if metadata is None:
+        try:
+            metadata = extract_metadata(item['path'], MEDIA_TYPES[item['type']])
+        except (OSError, ValueError, struct.error) as e:
+            item['log'].append(f"   ⚠️  Could not read metadata of {item['path']}: {e}")
+            metadata = dict(EMPTY_METADATA)
+    item['metadata'] = metadata
+    return item
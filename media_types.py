@@ -0,0 +1,201 @@
+# media_types.py - 媒体类型注册表：根据文件头魔数识别容器格式
+import os
+import struct
+from collections import namedtuple
+
+from build_cache import CACHE_DIR, load_json, save_json
+from mp4_faststart import MP4Error, sample_entry_types
+
+# web_playable: 浏览器能否直接显示/播放该格式
+MediaType = namedtuple('MediaType', 'name kind mime extensions web_playable')
+
+MEDIA_TYPES = {
+    'jpeg': MediaType('jpeg', 'image', 'image/jpeg', ('.jpg', '.jpeg'), True),
+    'png': MediaType('png', 'image', 'image/png', ('.png',), True),
+    'gif': MediaType('gif', 'image', 'image/gif', ('.gif',), True),
+    'webp': MediaType('webp', 'image', 'image/webp', ('.webp',), True),
+    'avif': MediaType('avif', 'image', 'image/avif', ('.avif',), True),
+    'bmp': MediaType('bmp', 'image', 'image/bmp', ('.bmp',), True),
+    'tiff': MediaType('tiff', 'image', 'image/tiff', ('.tiff', '.tif'), False),
+    'heic': MediaType('heic', 'image', 'image/heic', ('.heic', '.heif'), False),
+    'mp4': MediaType('mp4', 'video', 'video/mp4', ('.mp4', '.m4v'), True),
+    'mov': MediaType('mov', 'video', 'video/quicktime', ('.mov',), False),
+    'webm': MediaType('webm', 'video', 'video/webm', ('.webm',), True),
+    'mkv': MediaType('mkv', 'video', 'video/x-matroska', ('.mkv',), False),
+    'avi': MediaType('avi', 'video', 'video/x-msvideo', ('.avi',), False),
+    'wmv': MediaType('wmv', 'video', 'video/x-ms-wmv', ('.wmv',), False),
+    'flv': MediaType('flv', 'video', 'video/x-flv', ('.flv',), False),
+}
+
+SNIFF_BYTES = 64
+# 识别规则变化时递增，缓存中按旧规则得到的结果随之失效
+SNIFF_VERSION = 2
+TYPE_CACHE_PATH = os.path.join(CACHE_DIR, 'media_types.json')
+
+# ISO-BMFF (ftyp) 主品牌到媒体类型的映射
+_FTYP_BRANDS = {
+    b'qt  ': 'mov',
+    b'avif': 'avif', b'avis': 'avif',
+    b'heic': 'heic', b'heix': 'heic', b'mif1': 'heic', b'msf1': 'heic',
+}
+
+# QuickTime 早期文件没有ftyp，直接以这些盒子开头
+_QUICKTIME_LEADING_BOXES = (b'moov', b'mdat', b'wide', b'free', b'skip', b'pnot')
+
+# BMP：BITMAPFILEHEADER（签名、文件大小、两个保留字段、像素数据偏移）后紧跟 DIB 头的大小
+_BMP_HEADER = struct.Struct('<2sIHHII')
+# BITMAPCOREHEADER、BITMAPINFOHEADER、BITMAPV4HEADER、BITMAPV5HEADER
+_BMP_DIB_SIZES = (12, 40, 108, 124)
+
+# MOV 与 MP4 同为 ISO-BMFF 容器：视频为 H.264、音频为 AAC 的 MOV 浏览器可以按 video/mp4 播放
+# （video/quicktime 会被 Chrome/Firefox 直接跳过）；时间码和元数据轨道不影响播放
+MP4_VIDEO_ENTRIES = {b'avc1', b'avc3'}
+MP4_OTHER_ENTRIES = {b'mp4a', b'tmcd', b'mebx'}
+
+_type_cache = {}
+_cache_dirty = False
+_mp4_compatible = {}
+
+
+def _is_bmp(header, file_size):
+    """检查完整的 BMP 文件头；只看 "BM" 两个字节会把以 BM 开头的文本文件也当作图片"""
+    if len(header) < _BMP_HEADER.size:
+        return False
+    signature, size, reserved1, reserved2, _, dib_size = _BMP_HEADER.unpack_from(header)
+    return (signature == b'BM' and reserved1 == reserved2 == 0 and dib_size in _BMP_DIB_SIZES
+            and (file_size is None or size == file_size))
+
+
+def sniff_media_type(header, file_size=None):
+    """根据文件开头的字节识别媒体类型，无法识别时返回None；file_size 用于核对文件头中记录的大小"""
+    if header.startswith(b'\xff\xd8\xff'):
+        return MEDIA_TYPES['jpeg']
+    if header.startswith(b'\x89PNG\r\n\x1a\n'):
+        return MEDIA_TYPES['png']
+    if header[:6] in (b'GIF87a', b'GIF89a'):
+        return MEDIA_TYPES['gif']
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return MEDIA_TYPES['webp']
+    if header[:4] == b'RIFF' and header[8:12] == b'AVI ':
+        return MEDIA_TYPES['avi']
+    if _is_bmp(header, file_size):
+        return MEDIA_TYPES['bmp']
+    if header[:4] in (b'II*\x00', b'MM\x00*'):
+        return MEDIA_TYPES['tiff']
+    if header[4:8] == b'ftyp':
+        return MEDIA_TYPES[_FTYP_BRANDS.get(header[8:12], 'mp4')]
+    if header[4:8] in _QUICKTIME_LEADING_BOXES:
+        return MEDIA_TYPES['mov']
+    if header.startswith(b'\x1a\x45\xdf\xa3'):
+        # EBML：通过 DocType 区分 WebM 与 Matroska
+        return MEDIA_TYPES['webm'] if b'webm' in header else MEDIA_TYPES['mkv']
+    if header.startswith(b'\x30\x26\xb2\x75\x8e\x66\xcf\x11'):
+        return MEDIA_TYPES['wmv']
+    if header.startswith(b'FLV\x01'):
+        return MEDIA_TYPES['flv']
+    return None
+
+
+def load_type_cache():
+    """载入持久化的类型识别结果"""
+    global _cache_dirty
+    _type_cache.update(load_json(TYPE_CACHE_PATH, {}))
+    _cache_dirty = False
+
+
+def save_type_cache():
+    """保存类型识别结果（只在有变化时写入）"""
+    global _cache_dirty
+    if _cache_dirty:
+        save_json(TYPE_CACHE_PATH, _type_cache)
+        _cache_dirty = False
+
+
+def detect_media_type(path):
+    """识别文件的媒体类型；结果按 (大小, 修改时间) 缓存，文件未变化时不再读取"""
+    global _cache_dirty
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    key = os.path.normpath(path)
+    signature = [stat.st_size, stat.st_mtime_ns, SNIFF_VERSION]
+    cached = _type_cache.get(key)
+    if cached and cached[:3] == signature:
+        return MEDIA_TYPES.get(cached[3])
+
+    try:
+        with open(path, 'rb') as f:
+            media_type = sniff_media_type(f.read(SNIFF_BYTES), stat.st_size)
+    except OSError:
+        return None
+
+    _type_cache[key] = signature + [media_type.name if media_type else None]
+    _cache_dirty = True
+    return media_type
+
+
+def is_video_file(path):
+    """检查文件是否为视频（按文件内容识别）"""
+    media_type = detect_media_type(path)
+    return bool(media_type) and media_type.kind == 'video'
+
+
+def is_image_file(path):
+    """检查文件是否为图片（按文件内容识别）"""
+    media_type = detect_media_type(path)
+    return bool(media_type) and media_type.kind == 'image'
+
+
+def _plays_as_mp4(path):
+    """MOV 文件的编码是否与 MP4 相同（H.264 视频，可选 AAC 音频）；每个文件只检查一次"""
+    key = os.path.normpath(path)
+    if key not in _mp4_compatible:
+        try:
+            entries = sample_entry_types(path)
+        except (OSError, MP4Error):
+            entries = set()
+        _mp4_compatible[key] = bool(entries & MP4_VIDEO_ENTRIES) and entries <= MP4_VIDEO_ENTRIES | MP4_OTHER_ENTRIES
+    return _mp4_compatible[key]
+
+
+def is_web_playable(path):
+    """浏览器能否直接显示/播放该文件；H.264/AAC 的 MOV 按 MP4 播放"""
+    media_type = detect_media_type(path)
+    if media_type is None:
+        return False
+    return media_type.web_playable or (media_type.name == 'mov' and _plays_as_mp4(path))
+
+
+def media_mime(path):
+    """返回用于 <source type> 的MIME类型：H.264/AAC 的 MOV 声明为 video/mp4，浏览器才会尝试播放"""
+    media_type = detect_media_type(path)
+    if media_type is None:
+        return 'application/octet-stream'
+    if media_type.name == 'mov' and _plays_as_mp4(path):
+        return 'video/mp4'
+    return media_type.mime
+
+
+def preferred_extension(path):
+    """返回与文件内容匹配的扩展名（原扩展名匹配时保留原样的小写形式）"""
+    ext = os.path.splitext(path)[1].lower()
+    media_type = detect_media_type(path)
+    if media_type is None or ext in media_type.extensions:
+        return ext
+    return media_type.extensions[0]
+
+
+def scan_media(directory, recursive=True):
+    """扫描目录中所有可识别的媒体文件，返回排序后的相对路径"""
+    media_files = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.')) if recursive else []
+        for name in files:
+            if name.startswith('.'):
+                continue
+            path = os.path.relpath(os.path.join(root, name))
+            if detect_media_type(path):
+                media_files.append(path)
+    return sorted(media_files)
@@ -0,0 +1,265 @@
+# mp4_faststart.py - MP4盒子解析与moov前置（纯Python，流式复制mdat）
+import os
+import struct
+
+from build_cache import derivative_dir, to_url
+from content_hash import file_hash
+
+# 需要逐层展开才能找到 stco/co64 的容器盒子
+CONTAINER_BOXES = {b'moov', b'trak', b'mdia', b'minf', b'stbl', b'edts', b'dinf', b'mvex'}
+
+COPY_CHUNK_SIZE = 4 << 20
+UINT32_MAX = 0xFFFFFFFF
+
+
+class MP4Error(ValueError):
+    """MP4结构无法解析或不支持改写"""
+
+
+def iter_boxes(f, start, end):
+    """遍历 [start, end) 范围内的盒子，返回 (类型, 起始偏移, 总大小, 头部大小)"""
+    offset = start
+    while offset + 8 <= end:
+        f.seek(offset)
+        header = f.read(8)
+        if len(header) < 8:
+            break
+        size, box_type = struct.unpack('>I4s', header)
+        header_size = 8
+        if size == 1:
+            largesize = f.read(8)
+            if len(largesize) < 8:
+                raise MP4Error('truncated 64-bit box header')
+            size = struct.unpack('>Q', largesize)[0]
+            header_size = 16
+        elif size == 0:
+            # 大小为0表示一直延伸到文件末尾
+            size = end - offset
+        if size < header_size or offset + size > end:
+            raise MP4Error(f'invalid size for box {box_type!r} at offset {offset}')
+        yield box_type, offset, size, header_size
+        offset += size
+
+
+def read_top_level(path):
+    """读取顶层盒子列表"""
+    file_size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        return list(iter_boxes(f, 0, file_size))
+
+
+def analyze(path):
+    """判断文件是否为faststart（moov位于第一个mdat之前）"""
+    boxes = read_top_level(path)
+    types = [box[0] for box in boxes]
+    if b'moov' not in types or b'mdat' not in types:
+        raise MP4Error('missing moov or mdat box')
+    return {
+        'boxes': boxes,
+        'faststart': types.index(b'moov') < types.index(b'mdat'),
+        'fragmented': b'moof' in types,
+    }
+
+
+def _sample_entries(nodes):
+    """列出各轨道 stsd 中第一个样本描述的格式（如 avc1、mp4a）"""
+    for box_type, content in nodes:
+        if isinstance(content, list):
+            yield from _sample_entries(content)
+        elif box_type == b'stsd' and len(content) >= 16:
+            yield content[12:16]
+
+
+def sample_entry_types(path):
+    """读取文件中全部轨道的样本格式集合，用于判断 MOV 能否按 MP4 播放"""
+    with open(path, 'rb') as f:
+        moov = next((box for box in iter_boxes(f, 0, os.fstat(f.fileno()).st_size) if box[0] == b'moov'), None)
+        if moov is None:
+            raise MP4Error('missing moov box')
+        _, offset, size, header_size = moov
+        f.seek(offset + header_size)
+        tree = _parse_tree(f.read(size - header_size))
+    return set(_sample_entries(tree))
+
+
+def _parse_tree(data):
+    """将moov负载解析为 [类型, 子节点或原始负载] 的树结构"""
+    nodes = []
+    offset = 0
+    while offset + 8 <= len(data):
+        size, box_type = struct.unpack_from('>I4s', data, offset)
+        header_size = 8
+        if size == 1:
+            if offset + 16 > len(data):
+                raise MP4Error(f'truncated 64-bit header for box {box_type!r} inside moov')
+            size = struct.unpack_from('>Q', data, offset + 8)[0]
+            header_size = 16
+        elif size == 0:
+            size = len(data) - offset
+        if size < header_size or offset + size > len(data):
+            raise MP4Error(f'invalid size for box {box_type!r} inside moov')
+        payload = data[offset + header_size:offset + size]
+        if box_type == b'cmov':
+            raise MP4Error('compressed moov is not supported')
+        if box_type in CONTAINER_BOXES:
+            nodes.append([box_type, _parse_tree(payload)])
+        else:
+            nodes.append([box_type, payload])
+        offset += size
+    return nodes
+
+
+def _serialize(nodes):
+    """将树结构序列化为字节（自动重新计算各级盒子大小）"""
+    parts = []
+    for box_type, content in nodes:
+        payload = _serialize(content) if isinstance(content, list) else content
+        size = len(payload) + 8
+        if size > UINT32_MAX:
+            parts.append(struct.pack('>I4sQ', 1, box_type, size + 8))
+        else:
+            parts.append(struct.pack('>I4s', size, box_type))
+        parts.append(payload)
+    return b''.join(parts)
+
+
+def _chunk_offset_tables(nodes):
+    """找出所有 stco/co64 节点"""
+    for node in nodes:
+        if isinstance(node[1], list):
+            yield from _chunk_offset_tables(node[1])
+        elif node[0] in (b'stco', b'co64'):
+            yield node
+
+
+def _read_offsets(node):
+    """读取 stco/co64 中的块偏移列表；表的长度与记录的条目数不符时抛出 MP4Error"""
+    payload = node[1]
+    if len(payload) < 8:
+        raise MP4Error(f'truncated {node[0].decode()} box')
+    count = struct.unpack_from('>I', payload, 4)[0]
+    fmt = '>%dI' if node[0] == b'stco' else '>%dQ'
+    if len(payload) < 8 + struct.calcsize(fmt % count):
+        raise MP4Error(f'{node[0].decode()} box is shorter than its {count} entries')
+    return list(struct.unpack_from(fmt % count, payload, 8))
+
+
+def _write_offsets(node, offsets, use_co64):
+    """写回块偏移列表，必要时将 stco 升级为 co64"""
+    version_flags = node[1][:4]
+    if use_co64:
+        node[0] = b'co64'
+        body = struct.pack('>%dQ' % len(offsets), *offsets)
+    else:
+        body = struct.pack('>%dI' % len(offsets), *offsets)
+    node[1] = version_flags + struct.pack('>I', len(offsets)) + body
+
+
+def _relocated_moov(moov_payload, shift_start, moov_offset, old_size):
+    """生成前置后的moov：[shift_start, moov_offset) 范围内的偏移后移新moov的大小
+
+    原moov之后的偏移移动新旧moov的大小之差（改写后moov的大小可能变化：stco升级为co64、头部变为16字节）。
+    """
+    tree = _parse_tree(moov_payload)
+    tables = list(_chunk_offset_tables(tree))
+    originals = [_read_offsets(node) for node in tables]
+    if any(moov_offset <= o < moov_offset + old_size for offsets in originals for o in offsets):
+        raise MP4Error('chunk offset points inside the moov box')
+    use_co64 = False
+
+    def moved(offset, moov_size):
+        if shift_start <= offset < moov_offset:
+            return offset + moov_size
+        if offset >= moov_offset + old_size:
+            return offset + moov_size - old_size
+        return offset
+
+    # moov大小决定偏移增量；stco升级为co64会改变moov大小，因此最多迭代两次
+    while True:
+        moov_size = len(_serialize([[b'moov', tree]]))
+        patched = [[moved(o, moov_size) for o in offsets] for offsets in originals]
+        overflow = any(o > UINT32_MAX for offsets in patched for o in offsets)
+        if overflow and not use_co64:
+            use_co64 = True
+            for node, offsets in zip(tables, originals):
+                _write_offsets(node, offsets, True)
+            continue
+        for node, offsets in zip(tables, patched):
+            _write_offsets(node, offsets, use_co64 or node[0] == b'co64')
+        moov = _serialize([[b'moov', tree]])
+        if len(moov) != moov_size:
+            raise MP4Error('moov size changed while patching offsets')
+        return moov
+
+
+def _copy_range(src, dst, offset, length):
+    """流式复制源文件中的一段字节"""
+    src.seek(offset)
+    remaining = length
+    while remaining > 0:
+        chunk = src.read(min(COPY_CHUNK_SIZE, remaining))
+        if not chunk:
+            raise MP4Error('unexpected end of file while copying')
+        dst.write(chunk)
+        remaining -= len(chunk)
+
+
+def rewrite_faststart(src_path, dst_path, boxes=None):
+    """把moov移动到第一个mdat之前，写入新文件；mdat按块流式复制"""
+    boxes = boxes or read_top_level(src_path)
+    types = [box[0] for box in boxes]
+    moov_index = types.index(b'moov')
+    mdat_index = types.index(b'mdat')
+    if moov_index < mdat_index:
+        raise MP4Error('file is already faststart')
+
+    _, moov_offset, moov_size, moov_header = boxes[moov_index]
+    insert_offset = boxes[mdat_index][1]
+
+    tmp_path = dst_path + '.partial'
+    with open(src_path, 'rb') as src:
+        src.seek(moov_offset + moov_header)
+        moov_payload = src.read(moov_size - moov_header)
+        moov = _relocated_moov(moov_payload, insert_offset, moov_offset, moov_size)
+
+        with open(tmp_path, 'wb') as dst:
+            for index, (box_type, offset, size, _) in enumerate(boxes):
+                if index == mdat_index:
+                    dst.write(moov)
+                if index != moov_index:
+                    _copy_range(src, dst, offset, size)
+    os.replace(tmp_path, dst_path)
+
+
+def ensure_faststart(video_path, digest=None):
+    """返回可渐进播放的文件路径；非faststart文件改写为按哈希缓存的副本"""
+    info = analyze(video_path)
+    if info['faststart']:
+        return video_path, 'faststart'
+    if info['fragmented']:
+        raise MP4Error('fragmented MP4 is not supported')
+
+    digest = digest or file_hash(video_path)
+    out_dir = derivative_dir('faststart', digest)
+    out_path = os.path.join(out_dir, 'video' + os.path.splitext(video_path)[1].lower())
+    if os.path.exists(out_path):
+        return out_path, 'cached'
+
+    os.makedirs(out_dir, exist_ok=True)
+    rewrite_faststart(video_path, out_path, info['boxes'])
+    return out_path, 'rewritten'
+
+
+def faststart_task(item):
+    """流水线任务：moov位于文件末尾时生成faststart副本，结果写入 item['derivatives']"""
+    video_path = item['path']
+    try:
+        playable_path, status = ensure_faststart(video_path, item.get('digest'))
+    except (OSError, MP4Error) as e:
+        item['log'].append(f"   ⚠️  Skipping faststart check for {video_path}: {e}")
+        item.setdefault('failed', []).append('faststart')
+        return item
+    if playable_path != video_path:
+        item['derivatives']['faststart'] = to_url(playable_path)
+        item['log'].append(f"   ⏩ {status}: {video_path} → moov relocated for progressive playback")
+    return item
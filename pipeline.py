@@ -0,0 +1,112 @@
+# pipeline.py - 流式阶段流水线：asyncio 负责调度和I/O，阶段之间的有界队列提供背压
+import os
+import signal
+import asyncio
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# 每个阶段入口队列的深度；在途条目数只取决于它和工作者数量，与档案大小无关
+QUEUE_DEPTH = 8
+
+# executor: 'thread' 用于文件读取、哈希、外部进程等释放GIL的工作；'process' 用于图片解码/编码
+# accepts: 判断条目是否需要本阶段处理，不需要的条目直接转交下一阶段（不进入执行器）
+# 任务返回None时丢弃该条目（例如分片构建中不属于本分片的文件）
+Stage = namedtuple('Stage', 'name func workers executor accepts')
+
+_DONE = object()
+
+
+def stage(name, func, workers=None, executor='thread', accepts=None):
+    """定义一个阶段；workers 默认为CPU核数"""
+    return Stage(name, func, workers or os.cpu_count() or 1, executor, accepts)
+
+
+async def _feed(source, queue, consumers):
+    """把源中的条目送入第一个队列；源可以是普通迭代器或异步迭代器"""
+    if hasattr(source, '__aiter__'):
+        async for item in source:
+            await queue.put(item)
+    else:
+        for item in source:
+            await queue.put(item)
+    for _ in range(consumers):
+        await queue.put(_DONE)
+
+
+async def _work(current, executor, inbox, outbox, on_result):
+    """阶段工作者：从入口队列取条目，交给执行器处理后放入下一个队列（队列满时等待）"""
+    loop = asyncio.get_running_loop()
+    while True:
+        item = await inbox.get()
+        if item is _DONE:
+            return
+        if current.accepts is None or current.accepts(item):
+            item = await loop.run_in_executor(executor, current.func, item)
+            if item is None:
+                continue
+            if on_result:
+                on_result(current.name, item)
+        await outbox.put(item)
+
+
+async def _run_stage(current, executor, inbox, outbox, consumers, on_result):
+    """运行一个阶段的全部工作者，结束后通知下一阶段的每个消费者"""
+    await asyncio.gather(*(_work(current, executor, inbox, outbox, on_result)
+                           for _ in range(current.workers)))
+    for _ in range(consumers):
+        await outbox.put(_DONE)
+
+
+async def _collect(queue, results):
+    """收集最后一个阶段的输出"""
+    while True:
+        item = await queue.get()
+        if item is _DONE:
+            return
+        results.append(item)
+
+
+def _ignore_sigint():
+    """进程池工作者忽略 SIGINT：中断只由主进程处理，再由它结束工作者"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _abandon(executors):
+    """中断或出错时不等待在途任务：取消排队的任务并结束进程池的工作者，否则主进程会一直等待它们"""
+    for executor in executors:
+        executor.shutdown(wait=False, cancel_futures=True)
+        if isinstance(executor, ProcessPoolExecutor):
+            for process in list((executor._processes or {}).values()):
+                process.terminate()
+
+
+async def _run_pipeline(source, stages, on_result, queue_depth):
+    queues = [asyncio.Queue(maxsize=queue_depth) for _ in range(len(stages) + 1)]
+    consumers = [s.workers for s in stages] + [1]
+    results = []
+    executors = []
+    try:
+        tasks = [_feed(source, queues[0], consumers[0]), _collect(queues[-1], results)]
+        for index, current in enumerate(stages):
+            if current.executor == 'process':
+                executor = ProcessPoolExecutor(max_workers=current.workers, initializer=_ignore_sigint)
+            else:
+                executor = ThreadPoolExecutor(max_workers=current.workers)
+            executors.append(executor)
+            tasks.append(_run_stage(current, executor, queues[index], queues[index + 1],
+                                    consumers[index + 1], on_result))
+        await asyncio.gather(*tasks)
+    except BaseException:
+        _abandon(executors)
+        raise
+    for executor in executors:
+        executor.shutdown()
+    return results
+
+
+def run_pipeline(source, stages, on_result=None, queue_depth=QUEUE_DEPTH):
+    """按顺序让条目流过各个阶段，返回处理完成的条目（按完成顺序）
+
+    on_result(阶段名, 条目) 在事件循环线程中调用，可用于按条目输出日志。
+    """
+    return asyncio.run(_run_pipeline(source, stages, on_result, queue_depth))
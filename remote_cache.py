@@ -0,0 +1,174 @@
+# remote_cache.py - 派生文件缓存的远程层（S3兼容存储，如MinIO；可选，依赖boto3）
+import os
+import json
+import shutil
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from build_cache import DERIVATIVES_DIR, derivative_dir, format_bytes
+
+try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.config import Config
+    from botocore.exceptions import BotoCoreError, ClientError
+except ImportError:  # boto3 为可选依赖，没有时只使用本地缓存
+    boto3 = None
+
+# 目录中的文件全部上传后最后写入的标记；列表中有它才认为远程目录完整
+COMPLETE_MARKER = '.complete'
+# 并行传输的文件数，同时也是连接池大小
+TRANSFER_WORKERS = 16
+# 单个大文件（转码后的视频）分段传输时的并发数
+MULTIPART_CONCURRENCY = 4
+
+RemoteStore = namedtuple('RemoteStore', 'client bucket prefix pool transfer')
+
+
+def open_remote(url, endpoint_url=None, workers=TRANSFER_WORKERS):
+    """连接 s3://bucket/prefix 形式的远程缓存；boto3 不可用时返回None"""
+    parsed = urlparse(url)
+    if parsed.scheme != 's3' or not parsed.netloc:
+        raise SystemExit(f"❌ Remote cache must look like s3://bucket/prefix, got {url!r}")
+    if boto3 is None:
+        print("⚠️  boto3 is not installed (pip install boto3); using the local derivative cache only")
+        return None
+
+    # 所有线程共用一个客户端，连接池与并行传输数一致
+    client = boto3.session.Session().client(
+        's3', endpoint_url=endpoint_url,
+        config=Config(max_pool_connections=workers, retries={'max_attempts': 5, 'mode': 'standard'}))
+    transfer = TransferConfig(max_concurrency=MULTIPART_CONCURRENCY)
+    return RemoteStore(client, parsed.netloc, parsed.path.strip('/'), ThreadPoolExecutor(max_workers=workers),
+                       transfer)
+
+
+def close_remote(store):
+    """等待未完成的传输并关闭线程池"""
+    if store:
+        store.pool.shutdown()
+
+
+def _key(store, *parts):
+    """拼接远程对象键：前缀/类型/键/文件名"""
+    return '/'.join(part for part in (store.prefix,) + parts if part)
+
+
+def list_remote(store):
+    """一次分页列举远程缓存，返回完整的派生目录 {(类型, 键): {文件名: 大小}}
+
+    每页最多1000个对象，相当于批量检查全部派生目录是否存在，无需逐个HEAD请求。
+    """
+    listing = {}
+    complete = set()
+    prefix = store.prefix + '/' if store.prefix else ''
+    paginator = store.client.get_paginator('list_objects_v2')
+    try:
+        for page in paginator.paginate(Bucket=store.bucket, Prefix=prefix):
+            for entry in page.get('Contents', []):
+                parts = entry['Key'][len(prefix):].split('/', 2)
+                if len(parts) != 3:
+                    continue
+                kind, key, name = parts
+                if name == COMPLETE_MARKER:
+                    complete.add((kind, key))
+                else:
+                    listing.setdefault((kind, key), {})[name] = entry['Size']
+    except (BotoCoreError, ClientError) as e:
+        print(f"⚠️  Remote cache is unavailable ({e}); using the local derivative cache only")
+        return None
+    return {entry: listing.get(entry, {}) for entry in complete}
+
+
+def _local_listing(out_dir):
+    """本地派生目录中的文件 {文件名: 大小}（跳过临时文件）"""
+    listing = {}
+    for root, dirs, names in os.walk(out_dir):
+        for name in names:
+            if name.endswith(('.tmp', '.partial')):
+                continue
+            path = os.path.join(root, name)
+            listing[os.path.relpath(path, out_dir).replace(os.sep, '/')] = os.path.getsize(path)
+    return listing
+
+
+def _wait(futures):
+    """等待一组传输完成，返回传输的字节数"""
+    return sum(future.result() for future in futures)
+
+
+def _download(store, key, path):
+    """下载单个对象（大文件自动分段并行）"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    store.client.download_file(store.bucket, key, path, Config=store.transfer)
+    return os.path.getsize(path)
+
+
+def _upload(store, path, key):
+    """上传单个文件（大文件自动分段并行）"""
+    store.client.upload_file(path, store.bucket, key, Config=store.transfer)
+    return os.path.getsize(path)
+
+
+def fetch_task(item, store, index, kinds):
+    """流水线任务（读穿）：本地没有而远程已有的派生目录先下载，后续阶段即可直接命中缓存
+
+    kinds: {派生类型: 判断条目是否需要该类型的函数}。每次下载使用独立的临时目录，完成后再替换，
+    避免留下半成品；内容相同的条目同时下载同一目录时，先完成的一个生效。
+    """
+    for kind, accepts in kinds.items():
+        out_dir = derivative_dir(kind, item['digest'])
+        key = os.path.basename(out_dir)
+        files = index.get((kind, key))
+        if files is None or not accepts(item) or os.path.isdir(out_dir):
+            continue
+        partial_dir = f'{out_dir}.{os.getpid()}-{threading.get_ident()}.partial'
+        try:
+            fetched = _wait([store.pool.submit(_download, store, _key(store, kind, key, name),
+                                               os.path.join(partial_dir, name)) for name in files])
+            os.replace(partial_dir, out_dir)
+        except (OSError, BotoCoreError, ClientError) as e:
+            shutil.rmtree(partial_dir, ignore_errors=True)
+            if os.path.isdir(out_dir):
+                continue
+            item['log'].append(f"   ⚠️  Could not fetch {kind} for {item['path']} from the remote cache: {e}")
+            continue
+        item['log'].append(f"   ☁️  fetched: {kind} for {item['path']} ({format_bytes(fetched)})")
+    return item
+
+
+def upload_derivatives(store, index, items, kinds):
+    """回写：把本次构建用到、远程缺失或内容不一致的派生目录上传，最后写入完成标记"""
+    pending = []
+    seen = set()
+    for item in items:
+        for kind, accepts in kinds.items():
+            out_dir = derivative_dir(kind, item['digest'])
+            # 内容相同的文件共用一个派生目录，只检查一次
+            if out_dir in seen or not accepts(item) or not os.path.isdir(out_dir):
+                continue
+            seen.add(out_dir)
+            key = os.path.basename(out_dir)
+            listing = _local_listing(out_dir)
+            if listing and index.get((kind, key)) != listing:
+                pending.append((kind, key, out_dir, listing))
+
+    # 先提交所有目录的文件上传，使小目录之间也能并行；每个目录的文件全部完成后再写标记
+    transfers = [[store.pool.submit(_upload, store, os.path.join(out_dir, name), _key(store, kind, key, name))
+                  for name in listing] for kind, key, out_dir, listing in pending]
+    uploaded = 0
+    done = 0
+    for (kind, key, out_dir, listing), futures in zip(pending, transfers):
+        try:
+            uploaded += _wait(futures)
+            store.client.put_object(Bucket=store.bucket, Key=_key(store, kind, key, COMPLETE_MARKER),
+                                    Body=json.dumps(listing, sort_keys=True).encode('utf-8'))
+        except (OSError, BotoCoreError, ClientError) as e:
+            print(f"   ⚠️  Could not upload {DERIVATIVES_DIR}/{kind}/{key} to the remote cache: {e}")
+            continue
+        index[(kind, key)] = listing
+        done += 1
+    print(f"   ☁️  Remote cache: {done} derivative directories uploaded ({format_bytes(uploaded)}),"
+          f" {len(index)} available")
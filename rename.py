@@ -1,16 +1,17 @@
 import os
-import glob
 from pathlib import Path
 import re
 
+from content_hash import file_hash, hash_files, load_hash_cache, save_hash_cache
+from media_types import detect_media_type, preferred_extension, scan_media
+
+# 内容重复的副本移到这个隐藏目录（构建扫描会跳过以 . 开头的目录），由使用者决定是否删除
+DUPLICATES_DIR = '.duplicates'
+
 
 def rename_media_files():
     """重命名图片和视频文件为 SYPHU-CHINA-iGEM-编号 格式"""
 
-    # 定义支持的媒体文件类型
-    image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.tiff']
-    video_extensions = ['.mp4', '.avi', '.mov', '.wmv', '.flv', '.webm', '.mkv']
-
     # 定义目录
     base_dir = Path(__file__).parent
     art_dir = base_dir / "ART"
@@ -29,13 +30,16 @@ def rename_media_files():
         print(f"❌ HP目录不存在: {hp_dir}")
         return
 
+    load_hash_cache()
+
     # 重命名ART目录中的文件
     print("\n🎨 处理ART目录...")
-    art_count = rename_files_in_directory(art_dir, image_extensions + video_extensions, "ART")
+    art_count = rename_files_in_directory(art_dir, "ART")
 
     # 重命名HP目录中的文件
     print("\n📊 处理HP目录...")
-    hp_count = rename_files_in_directory(hp_dir, image_extensions + video_extensions, "HP")
+    hp_count = rename_files_in_directory(hp_dir, "HP")
+    save_hash_cache()
 
     print(f"\n✅ 重命名完成!")
     print(f"ART目录: {art_count} 个文件已重命名")
@@ -43,21 +47,48 @@ def rename_media_files():
     print(f"总计: {art_count + hp_count} 个文件")
 
 
-def rename_files_in_directory(directory, extensions, category):
+def classify_media(file_path):
+    """按文件内容确定类型标签，与 build_site.py 使用同一个类型注册表"""
+    media_type = detect_media_type(file_path)
+    if media_type is None:
+        return "FILE"
+    return "IMAGE" if media_type.kind == "image" else "VIDEO"
+
+
+def find_duplicates(files):
+    """按内容哈希找出重复文件，返回 ({重复文件: 最早的同内容文件}, {文件: 哈希})"""
+    digests = hash_files(files)
+    first_seen = {}
+    duplicates = {}
+    for file_path in files:
+        digest = digests[file_path]
+        if digest in first_seen:
+            duplicates[file_path] = first_seen[digest]
+        else:
+            first_seen[digest] = file_path
+    return duplicates, digests
+
+
+def move_duplicate(directory, file_path):
+    """把重复文件移到 DUPLICATES_DIR，让出编号范围内的文件名；同名时加序号，返回新路径"""
+    old_path = Path(file_path)
+    target_dir = directory / DUPLICATES_DIR
+    target_dir.mkdir(exist_ok=True)
+    target = target_dir / old_path.name
+    number = 2
+    while target.exists():
+        target = target_dir / f"{old_path.stem}-{number}{old_path.suffix}"
+        number += 1
+    old_path.rename(target)
+    return target
+
+
+def rename_files_in_directory(directory, category):
     """重命名指定目录中的文件"""
     count = 0
 
-    # 获取目录中所有指定扩展名的文件
-    files = []
-    for ext in extensions:
-        pattern = str(directory / f"*{ext}")
-        files.extend(glob.glob(pattern, recursive=False))
-        # 同时检查大写扩展名
-        pattern_upper = str(directory / f"*{ext.upper()}")
-        files.extend(glob.glob(pattern_upper, recursive=False))
-
-    # 移除重复的文件（由于大小写扩展名可能重复）
-    files = list(set(files))
+    # 获取目录中所有媒体文件（按文件内容识别，不依赖扩展名大小写）
+    files = scan_media(directory, recursive=False)
 
     if not files:
         print(f"  📭 在 {category} 目录中没有找到媒体文件")
@@ -68,37 +99,57 @@ def rename_files_in_directory(directory, extensions, category):
     # 按文件修改时间排序，确保顺序一致
     files.sort(key=lambda x: os.path.getmtime(x))
 
-    # 重命名文件
+    # 内容完全相同的副本不参与编号；先移到 DUPLICATES_DIR，否则它们的旧编号名会与新编号冲突
+    duplicates, digests = find_duplicates(files)
+    for duplicate, original in duplicates.items():
+        try:
+            moved = move_duplicate(directory, duplicate)
+            print(f"  ♻️  重复文件: {Path(duplicate).name}（与 {Path(original).name} 内容相同）"
+                  f" -> {DUPLICATES_DIR}/{moved.name}")
+        except OSError as e:
+            print(f"  ❌ 移动重复文件失败 {Path(duplicate).name}: {e}")
+    files = [file_path for file_path in files if file_path not in duplicates]
+
+    # 第一遍：全部改为临时名称，第二遍再改为目标名称；新编号就不会与尚未改名的文件冲突
+    pending = []
     for i, file_path in enumerate(files, 1):
+        old_path = Path(file_path)
         try:
-            old_path = Path(file_path)
-
-            # 获取文件扩展名（小写）
-            ext = old_path.suffix.lower()
+            # 获取文件扩展名（小写；与实际内容不符时改用正确的扩展名）
+            ext = preferred_extension(file_path)
 
             # 确定文件类型
-            if ext in ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.tiff']:
-                file_type = "IMAGE"
-            elif ext in ['.mp4', '.avi', '.mov', '.wmv', '.flv', '.webm', '.mkv']:
-                file_type = "VIDEO"
-            else:
-                file_type = "FILE"
+            file_type = classify_media(file_path)
 
             # 生成新文件名
             new_name = f"SYPHU-CHINA-iGEM-{category}-{i:03d}{ext}"
-            new_path = directory / new_name
+            if old_path.name == new_name:
+                print(f"  ⏭️  已是目标名称: {new_name} [{file_type}]")
+                continue
 
-            # 如果目标文件已存在，先删除（避免重命名冲突）
+            temp_path = directory / f".{new_name}.renaming"
+            old_path.rename(temp_path)
+            pending.append((old_path, temp_path, directory / new_name, file_type, digests[file_path]))
+        except Exception as e:
+            print(f"  ❌ 重命名失败 {old_path.name}: {e}")
+
+    for old_path, temp_path, new_path, file_type, digest in pending:
+        try:
+            # 目标文件仍存在（不在本次编号中的文件）时，只有内容相同才删除，否则保留两者并报告冲突
             if new_path.exists():
+                if file_hash(new_path) != digest:
+                    raise FileExistsError(f"目标文件 {new_path.name} 已存在且内容不同")
                 new_path.unlink()
 
             # 重命名文件
-            old_path.rename(new_path)
+            temp_path.rename(new_path)
 
-            print(f"  ✅ 重命名: {old_path.name} -> {new_name} [{file_type}]")
+            print(f"  ✅ 重命名: {old_path.name} -> {new_path.name} [{file_type}]")
             count += 1
 
         except Exception as e:
+            # 改回原来的名称，不留下临时文件
+            temp_path.rename(old_path)
             print(f"  ❌ 重命名失败 {old_path.name}: {e}")
 
     return count
@@ -107,10 +158,6 @@ def rename_files_in_directory(directory, extensions, category):
 def preview_renaming():
     """预览重命名操作（不实际执行）"""
 
-    # 定义支持的媒体文件类型
-    image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.tiff']
-    video_extensions = ['.mp4', '.avi', '.mov', '.wmv', '.flv', '.webm', '.mkv']
-
     # 定义目录
     base_dir = Path(__file__).parent
     art_dir = base_dir / "ART"
@@ -127,27 +174,21 @@ def preview_renaming():
         print(f"❌ HP目录不存在: {hp_dir}")
         return
 
+    load_hash_cache()
+
     print("\n🎨 ART目录预览:")
-    preview_files_in_directory(art_dir, image_extensions + video_extensions, "ART")
+    preview_files_in_directory(art_dir, "ART")
 
     print("\n📊 HP目录预览:")
-    preview_files_in_directory(hp_dir, image_extensions + video_extensions, "HP")
+    preview_files_in_directory(hp_dir, "HP")
+    save_hash_cache()
 
 
-def preview_files_in_directory(directory, extensions, category):
+def preview_files_in_directory(directory, category):
     """预览目录中的文件重命名"""
 
-    # 获取目录中所有指定扩展名的文件
-    files = []
-    for ext in extensions:
-        pattern = str(directory / f"*{ext}")
-        files.extend(glob.glob(pattern, recursive=False))
-        # 同时检查大写扩展名
-        pattern_upper = str(directory / f"*{ext.upper()}")
-        files.extend(glob.glob(pattern_upper, recursive=False))
-
-    # 移除重复的文件
-    files = list(set(files))
+    # 获取目录中所有媒体文件
+    files = scan_media(directory, recursive=False)
 
     if not files:
         print(f"  📭 没有找到媒体文件")
@@ -158,17 +199,16 @@ def preview_files_in_directory(directory, extensions, category):
     # 按文件修改时间排序
     files.sort(key=lambda x: os.path.getmtime(x))
 
+    duplicates, _ = find_duplicates(files)
+    for duplicate, original in duplicates.items():
+        print(f"  ♻️  重复文件（不编号，移到 {DUPLICATES_DIR}/）: {Path(duplicate).name} = {Path(original).name}")
+    files = [file_path for file_path in files if file_path not in duplicates]
+
     # 预览重命名
     for i, file_path in enumerate(files, 1):
         old_path = Path(file_path)
-        ext = old_path.suffix.lower()
-
-        if ext in ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.tiff']:
-            file_type = "IMAGE"
-        elif ext in ['.mp4', '.avi', '.mov', '.wmv', '.flv', '.webm', '.mkv']:
-            file_type = "VIDEO"
-        else:
-            file_type = "FILE"
+        ext = preferred_extension(file_path)
+        file_type = classify_media(file_path)
 
         new_name = f"SYPHU-CHINA-iGEM-{category}-{i:03d}{ext}"
         print(f"  📄 {old_path.name} -> {new_name} [{file_type}]")
@@ -205,4 +245,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,118 @@
+# search_index.py - 构建期倒排索引（前缀 + CJK n-gram），按分片懒加载
+import os
+import re
+import json
+import hashlib
+import shutil
+
+from build_cache import to_url
+
+SEARCH_DIR = 'search-index'
+INDEX_VERSION = 1
+
+# 拉丁字母/数字按前缀索引，超过该长度只额外保留完整词
+MAX_PREFIX = 12
+# 每个分片的目标大小（字节），分片数为2的幂
+TARGET_SHARD_BYTES = 32 * 1024
+MAX_SHARDS = 64
+
+# CJK字符范围；页面脚本通过索引元数据中的 cjk 字段使用同一范围
+CJK_CHARS = '\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff'
+TOKEN_PATTERN = re.compile(f'[{CJK_CHARS}]+|[a-z0-9]+')
+CJK_PATTERN = re.compile(f'[{CJK_CHARS}]')
+
+
+def tokenize(text):
+    """切分文本：拉丁文按单词，CJK 连续片段按字符"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def index_terms(text):
+    """生成文本的全部索引项：单词前缀，以及CJK单字和相邻二字组"""
+    terms = set()
+    for token in tokenize(text):
+        if CJK_PATTERN.match(token):
+            terms.update(token)
+            terms.update(token[i:i + 2] for i in range(len(token) - 1))
+        else:
+            terms.update(token[:length] for length in range(1, min(len(token), MAX_PREFIX) + 1))
+            terms.add(token)
+    return terms
+
+
+def shard_of(term, shard_count):
+    """索引项所在的分片（按前两个字符计算，页面脚本使用同样的规则）"""
+    second = ord(term[1]) if len(term) > 1 else 0
+    return (ord(term[0]) * 31 + second) % shard_count
+
+
+def _delta_encode(doc_ids):
+    """有序文档ID差分编码，减小JSON体积"""
+    encoded, previous = [], 0
+    for doc_id in doc_ids:
+        encoded.append(doc_id - previous)
+        previous = doc_id
+    return encoded
+
+
+def _write_hashed(out_dir, stem, payload):
+    """写入带内容哈希的文件名，便于长期缓存"""
+    data = json.dumps(payload, ensure_ascii=False, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    name = f'{stem}.{hashlib.sha256(data).hexdigest()[:10]}.json'
+    with open(os.path.join(out_dir, name), 'wb') as f:
+        f.write(data)
+    return name, len(data)
+
+
+def build_search_index(docs, out_dir=SEARCH_DIR, base_url=None):
+    """为文档列表写出分片倒排索引，返回嵌入页面的元数据
+
+    docs 中每项包含 id、section、section_title、title、filename、date、caption。
+    base_url 是页面加载索引时使用的相对URL，默认由 out_dir 得出。
+    """
+    postings = {}
+    for doc in docs:
+        text = ' '.join([doc['title'], doc['filename'], doc['date'], doc['section'],
+                         doc['section_title'], doc.get('caption', '')])
+        for term in index_terms(text):
+            postings.setdefault(term, []).append(doc['id'])
+
+    estimated_bytes = sum(len(term) + 4 + 3 * len(ids) for term, ids in postings.items())
+    shard_count = 1
+    while shard_count < MAX_SHARDS and estimated_bytes / shard_count > TARGET_SHARD_BYTES:
+        shard_count *= 2
+
+    shards = [{} for _ in range(shard_count)]
+    for term, doc_ids in postings.items():
+        shards[shard_of(term, shard_count)][term] = _delta_encode(sorted(doc_ids))
+
+    # 每次在临时目录中重新生成再整体替换：旧的分片文件不会残留，中断时旧索引保持完整
+    partial_dir = out_dir + '.partial'
+    shutil.rmtree(partial_dir, ignore_errors=True)
+    os.makedirs(partial_dir)
+    doc_table = [[doc['id'], doc['section_title'], doc['title'], doc['date']] for doc in docs]
+    docs_name, docs_bytes = _write_hashed(partial_dir, 'docs', doc_table)
+
+    shard_names = []
+    total_bytes = docs_bytes
+    for number, shard in enumerate(shards):
+        # 空分片不写文件，页面直接视为空
+        if not shard:
+            shard_names.append(None)
+            continue
+        name, size = _write_hashed(partial_dir, f'shard-{number}', shard)
+        shard_names.append(name)
+        total_bytes += size
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(partial_dir, out_dir)
+
+    print(f"   🔎 Search index: {len(docs)} items, {len(postings)} terms, {shard_count} shards,"
+          f" {total_bytes / 1024:.1f} KB")
+    return {
+        'version': INDEX_VERSION,
+        'base': base_url or to_url(out_dir) + '/',
+        'maxPrefix': MAX_PREFIX,
+        'cjk': CJK_CHARS,
+        'docs': docs_name,
+        'shards': shard_names,
+    }
@@ -0,0 +1,189 @@
+# service_worker.py - 根据构建清单生成带版本的离线缓存 Service Worker
+import json
+
+from build_cache import write_text
+
+SERVICE_WORKER_FILE = 'sw.js'
+CACHE_PREFIX = 'igem-gallery'
+# 运行时缓存（原图/视频等）的字节上限，超出后按最近最少使用淘汰
+RUNTIME_CACHE_MAX_BYTES = 200 * 1024 * 1024
+NAVIGATION_TIMEOUT_MS = 3000
+
+SERVICE_WORKER_TEMPLATE = '''// Generated by build_site.py from the build manifest - do not edit by hand.
+const VERSION = '__VERSION__';
+const PRECACHE = '__PREFIX__-precache';
+const RUNTIME = '__PREFIX__-runtime';
+const PRECACHE_ENTRIES = __ENTRIES__;
+const SHELL_URL = '__SHELL__';
+const RUNTIME_MAX_BYTES = __MAX_BYTES__;
+const NAVIGATION_TIMEOUT_MS = __TIMEOUT__;
+const MEDIA_PATTERN = /\\.(jpe?g|png|gif|webp|avif|bmp|mp4|m4v|mov|webm|m3u8|ts)$/i;
+
+const scoped = url => new URL(url, self.registration.scope).href;
+const HASH_INDEX = scoped('__precache-hashes__');
+const LRU_INDEX = scoped('__runtime-lru__');
+const PRECACHE_KEYS = new Set(Object.keys(PRECACHE_ENTRIES).map(scoped));
+
+async function readIndex(cache, key) {
+    const response = await cache.match(key);
+    return response ? response.json() : {};
+}
+
+function writeIndex(cache, key, data) {
+    return cache.put(key, new Response(JSON.stringify(data), {
+        headers: { 'Content-Type': 'application/json' }
+    }));
+}
+
+// Only entries whose content hash changed are downloaded again; entries that
+// left the build are purged. Unchanged files survive every new version.
+async function updatePrecache() {
+    const cache = await caches.open(PRECACHE);
+    const stored = await readIndex(cache, HASH_INDEX);
+    const next = {};
+
+    await Promise.all(Object.entries(PRECACHE_ENTRIES).map(async ([url, hash]) => {
+        const key = scoped(url);
+        if (stored[key] === hash && await cache.match(key)) {
+            next[key] = hash;
+            return;
+        }
+        const response = await fetch(key, { cache: 'no-cache' });
+        if (!response.ok) throw new Error('Precache failed for ' + url + ': ' + response.status);
+        await cache.put(key, response);
+        next[key] = hash;
+    }));
+
+    await Promise.all(Object.keys(stored)
+        .filter(key => !(key in next))
+        .map(key => cache.delete(key)));
+    await writeIndex(cache, HASH_INDEX, next);
+}
+
+self.addEventListener('install', event => {
+    event.waitUntil(updatePrecache().then(() => self.skipWaiting()));
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil(caches.keys()
+        .then(names => Promise.all(names
+            .filter(name => name.startsWith('__PREFIX__-') && name !== PRECACHE && name !== RUNTIME)
+            .map(name => caches.delete(name))))
+        .then(() => self.clients.claim()));
+});
+
+// ====== RUNTIME CACHE WITH LRU BYTE CAP ======
+let lruIndex = null;
+let lruWrite = Promise.resolve();
+
+async function loadLru(cache) {
+    if (!lruIndex) lruIndex = await readIndex(cache, LRU_INDEX);
+    return lruIndex;
+}
+
+function persistLru(cache) {
+    const snapshot = JSON.stringify(lruIndex);
+    lruWrite = lruWrite.then(() => cache.put(LRU_INDEX, new Response(snapshot, {
+        headers: { 'Content-Type': 'application/json' }
+    })));
+    return lruWrite;
+}
+
+async function evictLru(cache) {
+    let total = Object.values(lruIndex).reduce((sum, entry) => sum + entry.bytes, 0);
+    if (total <= RUNTIME_MAX_BYTES) return;
+    const oldestFirst = Object.entries(lruIndex).sort((a, b) => a[1].used - b[1].used);
+    for (const [key, entry] of oldestFirst) {
+        if (total <= RUNTIME_MAX_BYTES) break;
+        await cache.delete(key);
+        delete lruIndex[key];
+        total -= entry.bytes;
+    }
+}
+
+async function runtimeMedia(request) {
+    const cache = await caches.open(RUNTIME);
+    const index = await loadLru(cache);
+    const cached = await cache.match(request);
+    if (cached) {
+        if (index[request.url]) index[request.url].used = Date.now();
+        persistLru(cache);
+        return cached;
+    }
+
+    const response = await fetch(request);
+    if (response.status === 200 && response.type === 'basic') {
+        const length = Number(response.headers.get('Content-Length'));
+        const bytes = length || (await response.clone().blob()).size;
+        if (bytes <= RUNTIME_MAX_BYTES) {
+            await cache.put(request, response.clone());
+            index[request.url] = { bytes: bytes, used: Date.now() };
+            await evictLru(cache);
+            persistLru(cache);
+        }
+    }
+    return response;
+}
+
+// ====== REQUEST ROUTING ======
+async function precached(request) {
+    const cache = await caches.open(PRECACHE);
+    return (await cache.match(request, { ignoreSearch: true })) || fetch(request);
+}
+
+async function navigation(request) {
+    const cache = await caches.open(PRECACHE);
+    const timeout = new Promise(resolve => setTimeout(resolve, NAVIGATION_TIMEOUT_MS));
+    try {
+        const response = await Promise.race([fetch(request), timeout]);
+        if (response) return response;
+    } catch (error) {
+        // Offline: fall back to the cached app shell below
+    }
+    return (await cache.match(request, { ignoreSearch: true })) ||
+        (await cache.match(scoped(SHELL_URL))) ||
+        fetch(request);
+}
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    // Range requests (video seeking) go straight to the network
+    if (request.method !== 'GET' || request.headers.has('range')) return;
+
+    const url = new URL(request.url);
+    if (url.origin !== self.location.origin) return;
+
+    if (request.mode === 'navigate') {
+        event.respondWith(navigation(request));
+    } else if (PRECACHE_KEYS.has(url.origin + url.pathname)) {
+        event.respondWith(precached(request));
+    } else if (MEDIA_PATTERN.test(url.pathname)) {
+        event.respondWith(runtimeMedia(request));
+    }
+});
+'''
+
+
+def render_service_worker(manifest, shell_url, prefix=CACHE_PREFIX):
+    """把构建清单中的预缓存列表和版本号写入 Service Worker 脚本
+
+    prefix 区分同一域名下的多个画廊，各自只清理自己前缀的旧缓存。
+    """
+    replacements = {
+        '__VERSION__': manifest['version'],
+        '__PREFIX__': prefix,
+        '__ENTRIES__': json.dumps(manifest['precache'], indent=4, sort_keys=True),
+        '__SHELL__': shell_url,
+        '__MAX_BYTES__': str(RUNTIME_CACHE_MAX_BYTES),
+        '__TIMEOUT__': str(NAVIGATION_TIMEOUT_MS),
+    }
+    script = SERVICE_WORKER_TEMPLATE
+    for placeholder, value in replacements.items():
+        script = script.replace(placeholder, value)
+    return script
+
+
+def write_service_worker(manifest, shell_url, path=SERVICE_WORKER_FILE, prefix=CACHE_PREFIX):
+    """写出 Service Worker 文件"""
+    write_text(path, render_service_worker(manifest, shell_url, prefix), newline='\n')
+    return path
@@ -0,0 +1,93 @@
+# shard_build.py - 按内容哈希范围分片构建：各分片独立生成派生文件并写出部分清单，合并步骤确定性地汇总
+import os
+import argparse
+
+from build_cache import load_json, params_hash, save_json
+
+# 各分片的部分清单所在目录；分布在多台主机时，合并前把它们复制到同一目录
+SHARD_DIR = 'shards'
+PARTIAL_FORMAT = 1
+# 条目中的派生结果对应的派生目录类型（合并时据此从远程缓存拉取）
+DERIVATIVE_KINDS = {'faststart': 'faststart', 'video': 'video', 'optimized': 'optimized', 'modal_sizes': 'optimized'}
+PARTIAL_FIELDS = ('path', 'section', 'type', 'kind', 'digest', 'derivatives', 'metadata')
+
+
+def parse_shard(value):
+    """解析命令行中的 I/N（从1开始编号）"""
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'expected I/N, got {value!r}')
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f'shard index must be between 1 and {count}')
+    return index, count
+
+
+def shard_of(digest, count):
+    """内容哈希所在的分片（从1开始）：按哈希前32位等分区间，内容相同的文件总在同一分片"""
+    return (int(digest[:8], 16) * count >> 32) + 1
+
+
+def shard_task(item, shard, scanned):
+    """流水线任务：记录扫描到的文件，丢弃不属于本分片的条目"""
+    scanned.append((item['path'], item['digest']))
+    return item if shard_of(item['digest'], shard[1]) == shard[0] else None
+
+
+def scan_fingerprint(scanned):
+    """扫描结果（路径与内容哈希）的指纹；各分片和合并步骤必须基于同一棵源文件树"""
+    return params_hash(sorted(scanned))
+
+
+def partial_path(index, count, shard_dir=SHARD_DIR):
+    """第 index 个分片（共 count 个）的部分清单路径"""
+    return os.path.join(shard_dir, f'shard-{index}-of-{count}.json')
+
+
+def write_partial(items, shard, scanned, shard_dir=SHARD_DIR):
+    """写出本分片的部分清单（条目按路径排序，内容与完成顺序无关）"""
+    path = partial_path(*shard, shard_dir)
+    save_json(path, {
+        'format': PARTIAL_FORMAT,
+        'shard': list(shard),
+        'scan': scan_fingerprint(scanned),
+        'items': sorted(({field: item[field] for field in PARTIAL_FIELDS} for item in items),
+                        key=lambda entry: entry['path']),
+    })
+    print(f"   🧩 Shard {shard[0]}/{shard[1]}: {len(items)} of {len(scanned)} files → {path}")
+
+
+def load_partials(count, shard_dir=SHARD_DIR):
+    """读取全部 count 个部分清单并检查它们来自同一次扫描，返回 ({路径: 条目}, 扫描指纹)"""
+    partials = [load_json(partial_path(index, count, shard_dir)) for index in range(1, count + 1)]
+    missing = [partial_path(index + 1, count, shard_dir) for index, partial in enumerate(partials)
+               if not partial or partial.get('format') != PARTIAL_FORMAT]
+    if missing:
+        raise SystemExit(f"❌ Missing shard manifests: {', '.join(missing)}")
+    scans = {partial['scan'] for partial in partials}
+    if len(scans) != 1:
+        raise SystemExit("❌ Shards were built from different source trees; rebuild them from the same commit")
+
+    entries = {}
+    for partial in partials:
+        for entry in partial['items']:
+            entries[entry['path']] = entry
+    return entries, scans.pop()
+
+
+def merged_kinds(entries):
+    """合并时需要的派生目录类型 {类型: 条目是否需要}，由各分片实际产生的结果决定"""
+    kinds = {}
+    for kind in sorted({DERIVATIVE_KINDS[name] for entry in entries.values() for name in entry['derivatives']}):
+        names = [name for name, target in DERIVATIVE_KINDS.items() if target == kind]
+        kinds[kind] = lambda item, names=names: any(name in item['derivatives'] for name in names)
+    return kinds
+
+
+def merge_task(item, entries, scanned):
+    """流水线任务：用分片产生的派生结果填充条目，不再重新计算；元数据由元数据阶段按内容哈希复用"""
+    scanned.append((item['path'], item['digest']))
+    entry = entries.get(item['path'])
+    if entry and entry['digest'] == item['digest']:
+        item['derivatives'] = entry['derivatives']
+    return item
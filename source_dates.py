@@ -0,0 +1,88 @@
+# source_dates.py - 媒体日期：默认构建使用EXIF拍摄时间或文件修改时间；可复现构建全部来自内容（EXIF拍摄时间、最后修改文件的提交时间或 SOURCE_DATE_EPOCH）
+import os
+from datetime import datetime, timezone
+
+from git_objects import last_commit_times, tracked_blobs
+
+# 可复现构建中日期一律按UTC格式化，不随构建机器的时区变化
+REPRODUCIBLE_TZ = timezone.utc
+MISSING_REPORT_LIMIT = 5
+
+
+def source_date_epoch():
+    """读取 SOURCE_DATE_EPOCH（秒），未设置时返回None"""
+    value = os.environ.get('SOURCE_DATE_EPOCH', '').strip()
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise SystemExit(f"❌ SOURCE_DATE_EPOCH must be a whole number of seconds, got {value!r}")
+
+
+def _taken_time(taken):
+    """EXIF拍摄时间没有时区，按UTC解释为时间戳；再按UTC格式化即得到相机记录的时间"""
+    try:
+        return datetime.fromisoformat(taken).replace(tzinfo=REPRODUCIBLE_TZ).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def content_times(rows, roots):
+    """每个媒体的内容日期 {路径: 时间戳}
+
+    依次使用 EXIF 拍摄时间、最后修改它的提交时间（仅限与提交内容一致的文件）和 SOURCE_DATE_EPOCH；
+    三者都没有的文件无法确定日期，构建中止。
+    """
+    epoch = source_date_epoch()
+    committed = last_commit_times(roots)
+    unmodified = tracked_blobs(roots)
+    times = {}
+    missing = []
+    for path, row in rows.items():
+        key = os.path.normpath(path)
+        file_time = _taken_time(row['taken'])
+        if file_time is None and key in unmodified:
+            file_time = committed.get(key)
+        if file_time is None:
+            file_time = epoch
+        if file_time is None:
+            missing.append(path)
+        times[path] = file_time
+    if missing:
+        listed = ', '.join(sorted(missing)[:MISSING_REPORT_LIMIT])
+        more = f' and {len(missing) - MISSING_REPORT_LIMIT} more' if len(missing) > MISSING_REPORT_LIMIT else ''
+        raise SystemExit(f"❌ No EXIF date or commit for {listed}{more}; commit them or set SOURCE_DATE_EPOCH")
+    return times
+
+
+def media_date(taken, mtime_ns):
+    """默认构建中媒体的日期：EXIF拍摄时间（按本地时间解释），没有时为文件修改时间；都不随检出方式或硬链接变化"""
+    try:
+        return datetime.fromisoformat(taken).timestamp()
+    except (TypeError, ValueError):
+        return mtime_ns / 1e9
+
+
+def catalog_times(rows):
+    """默认构建中每个媒体的日期 {路径: 时间戳}，即目录库登记时按 media_date 算出的日期"""
+    return {path: row['date'] for path, row in rows.items()}
+
+
+def build_time(times):
+    """页面上的更新时间：SOURCE_DATE_EPOCH，未设置时为最新的媒体日期"""
+    epoch = source_date_epoch()
+    if epoch is not None:
+        return epoch
+    return max(times.values(), default=0)
+
+
+def stamp_outputs(paths, timestamp):
+    """把生成的文件（目录则包括其中全部文件）的修改时间设为 timestamp，发布后的 Last-Modified 不随构建时刻变化"""
+    for path in paths:
+        if os.path.isdir(path):
+            files = [os.path.join(root, name) for root, _, names in os.walk(path) for name in names]
+        else:
+            files = [path] if os.path.isfile(path) else []
+        for file_path in files:
+            os.utime(file_path, (timestamp, timestamp))
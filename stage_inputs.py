@@ -0,0 +1,108 @@
+# stage_inputs.py - 阶段输入指纹：代码版本、参数和媒体内容都未变化的阶段直接复用上次的结果，并记录每个阶段运行或跳过的原因
+import os
+import sys
+import hashlib
+
+from build_cache import CACHE_DIR, derivative_dir, load_json, params_hash, save_json
+
+STAGES_PATH = os.path.join(CACHE_DIR, 'stages.json')
+# 派生阶段写入 item['derivatives'] 的键，以及结果所在的派生目录类型
+STAGE_OUTPUTS = {
+    'faststart': ('faststart', ('faststart',)),
+    'video': ('video', ('video',)),
+    'optimize': ('optimized', ('optimized', 'modal_sizes')),
+}
+REUSED = 'inputs unchanged'
+
+_code_versions = {}
+
+
+def code_version(*modules):
+    """模块源文件内容的哈希；任何改动（包括模板中的CSS/JS）都会改变它"""
+    digest = hashlib.sha256()
+    for module in modules:
+        if module not in _code_versions:
+            with open(sys.modules[module].__file__, 'rb') as f:
+                _code_versions[module] = hashlib.sha256(f.read()).hexdigest()
+        digest.update(_code_versions[module].encode())
+    return digest.hexdigest()[:16]
+
+
+def stage_inputs(modules, params=None):
+    """阶段的输入指纹：实现它的模块的代码版本和参数"""
+    return {'code': code_version(*modules), 'inputs': params_hash(params)}
+
+
+def load_stage_records():
+    """上次构建记录的各阶段输入 {阶段名: 输入指纹}"""
+    return load_json(STAGES_PATH, {})
+
+
+def save_stage_records(records):
+    """保存本次构建的各阶段输入"""
+    save_json(STAGES_PATH, records)
+
+
+def input_change(previous, current, inputs_label='inputs changed'):
+    """比较两次构建的阶段输入，返回变化原因；未变化时返回None"""
+    if not previous:
+        return 'not run in the last build'
+    if previous.get('code') != current['code']:
+        return 'code changed'
+    if previous.get('inputs') != current['inputs']:
+        return inputs_label
+    return None
+
+
+def _item_change(item, kind, keys, rows, failed):
+    """阶段输入未变时判断单个条目能否复用上次的结果，返回需要运行的原因（可复用时为None）"""
+    row = rows.get(item['path'])
+    if not row:
+        return 'new file'
+    if row['hash'] != item['digest']:
+        return 'content changed'
+    if item['path'] in failed:
+        return 'failed in the last build'
+    if any(key in row['derivatives'] for key in keys) and not os.path.isdir(derivative_dir(kind, item['digest'])):
+        return 'derivatives missing locally'
+    return None
+
+
+def reusing_stage(current, inputs, previous, rows, tally):
+    """包装派生阶段的 accepts：输入未变且内容未变的条目直接填入上次的结果，不再交给执行器
+
+    rows 是上次构建登记在目录库中的条目，tally 统计 {原因: 条目数}。
+    """
+    kind, keys = STAGE_OUTPUTS[current.name]
+    change = input_change(previous, inputs, 'parameters changed')
+    failed = set(previous.get('failed', [])) if previous else set()
+
+    def accepts(item):
+        if current.accepts and not current.accepts(item):
+            return False
+        reason = change or _item_change(item, kind, keys, rows, failed)
+        tally[reason or REUSED] = tally.get(reason or REUSED, 0) + 1
+        if reason:
+            return True
+        row = rows[item['path']]
+        item['derivatives'].update((key, row['derivatives'][key]) for key in keys if key in row['derivatives'])
+        return False
+
+    return current._replace(accepts=accepts)
+
+
+def stage_record(name, inputs, items):
+    """本次构建的阶段记录：输入指纹和失败的条目（下次构建重试它们）"""
+    return dict(inputs, failed=sorted(item['path'] for item in items if name in item.get('failed', ())))
+
+
+def explain_tally(name, tally):
+    """把阶段的统计整理为一行说明"""
+    if not tally:
+        return f"{name}: no files to process"
+    reused = tally.get(REUSED, 0)
+    ran = ', '.join(f'{reason}: {count}' for reason, count in sorted(tally.items()) if reason != REUSED)
+    parts = [f'skipped {reused} ({REUSED})'] if reused else []
+    if ran:
+        parts.append(f'ran {sum(tally.values()) - reused} ({ran})')
+    return f"{name}: {'; '.join(parts)}"
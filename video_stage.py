@@ -0,0 +1,203 @@
+# video_stage.py - 视频转码码率阶梯与HLS打包（可选，依赖本地ffmpeg）
+import os
+import re
+import shutil
+import subprocess
+
+from build_cache import derivative_dir, load_json, params_hash, save_json, to_url
+from content_hash import file_hash
+
+# 码率阶梯：按短边分辨率划分，不会超过源视频尺寸
+VIDEO_LADDER = (
+    {'name': '360p', 'short_side': 360, 'video_kbps': 800, 'audio_kbps': 96},
+    {'name': '720p', 'short_side': 720, 'video_kbps': 2500, 'audio_kbps': 128},
+    {'name': '1080p', 'short_side': 1080, 'video_kbps': 5000, 'audio_kbps': 128},
+)
+
+# WebM编码器：VP9 编码速度快，AV1 体积更小但非常耗时
+WEBM_CODECS = {
+    'vp9': {
+        'encoder': 'libvpx-vp9',
+        'args': ['-row-mt', '1', '-deadline', 'good', '-cpu-used', '4'],
+        'mime': 'video/webm; codecs="vp9, opus"',
+    },
+    'av1': {
+        'encoder': 'libaom-av1',
+        'args': ['-row-mt', '1', '-cpu-used', '6'],
+        'mime': 'video/webm; codecs="av01.0.05M.08, opus"',
+    },
+}
+
+HLS_SEGMENT_SECONDS = 4
+LADDER_MANIFEST = 'ladder.json'
+
+
+def find_ffmpeg():
+    """查找可用的ffmpeg（优先使用 FFMPEG_BIN 环境变量）"""
+    candidate = os.environ.get('FFMPEG_BIN') or shutil.which('ffmpeg')
+    if candidate and os.path.isfile(candidate) and os.access(candidate, os.X_OK):
+        return candidate
+    return None
+
+
+def probe_video(ffmpeg, video_path):
+    """从 ffmpeg -i 的输出中解析显示尺寸（已考虑旋转）和总码率"""
+    result = subprocess.run([ffmpeg, '-hide_banner', '-i', video_path],
+                            capture_output=True, text=True, errors='replace')
+    info = result.stderr
+    match = re.search(r'Stream #\S+.*?Video:.*?\b(\d{2,5})x(\d{2,5})\b', info)
+    if not match:
+        return None
+
+    width, height = int(match.group(1)), int(match.group(2))
+    rotation = re.search(r'rotation of (-?[\d.]+) degrees|rotate\s*:\s*(-?\d+)', info)
+    if rotation:
+        angle = abs(int(float(rotation.group(1) or rotation.group(2)))) % 180
+        if angle == 90:
+            width, height = height, width
+
+    bitrate = re.search(r'bitrate: (\d+) kb/s', info)
+    return width, height, int(bitrate.group(1)) if bitrate else None
+
+
+def plan_renditions(width, height, source_kbps=None, ladder=VIDEO_LADDER):
+    """根据源尺寸和码率选择阶梯档位，计算每档输出尺寸（偶数像素）"""
+    short_side = min(width, height)
+    plan = []
+    for rung in ladder:
+        # 最低一档始终保留，其余档位不做放大
+        if plan and rung['short_side'] > short_side:
+            break
+        target = min(rung['short_side'], short_side)
+        scale = target / short_side
+        out_w = max(2, int(round(width * scale / 2)) * 2)
+        out_h = max(2, int(round(height * scale / 2)) * 2)
+        rendition = dict(rung, width=out_w, height=out_h)
+        # 码率不高于源视频，避免转码后反而变大
+        if source_kbps:
+            rendition['video_kbps'] = min(rung['video_kbps'], source_kbps)
+        plan.append(rendition)
+    return plan
+
+
+def _run_ffmpeg(ffmpeg, args):
+    """执行ffmpeg命令，失败时抛出带有错误输出的异常"""
+    result = subprocess.run([ffmpeg, '-hide_banner', '-loglevel', 'error', '-y'] + args,
+                            capture_output=True, text=True, errors='replace')
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'ffmpeg failed')
+
+
+def _encode_rendition(ffmpeg, source, out_dir, rung, webm_codec):
+    """为单个阶梯档位输出 H.264 MP4、HLS 分片以及 WebM"""
+    name = rung['name']
+    scale = f"scale={rung['width']}:{rung['height']}"
+    common = ['-i', source, '-map', '0:v:0', '-map', '0:a:0?', '-vf', scale, '-pix_fmt', 'yuv420p']
+
+    # H.264：固定关键帧间隔，使HLS可以直接拷贝切片而无需再次编码
+    mp4_path = os.path.join(out_dir, f'{name}.mp4')
+    _run_ffmpeg(ffmpeg, common + [
+        '-c:v', 'libx264', '-profile:v', 'main', '-preset', 'medium',
+        '-b:v', f"{rung['video_kbps']}k", '-maxrate', f"{rung['video_kbps']}k",
+        '-bufsize', f"{rung['video_kbps'] * 2}k",
+        '-force_key_frames', f'expr:gte(t,n_forced*{HLS_SEGMENT_SECONDS})',
+        '-c:a', 'aac', '-b:a', f"{rung['audio_kbps']}k",
+        '-movflags', '+faststart', mp4_path,
+    ])
+
+    _run_ffmpeg(ffmpeg, [
+        '-i', mp4_path, '-c', 'copy', '-f', 'hls',
+        '-hls_time', str(HLS_SEGMENT_SECONDS), '-hls_playlist_type', 'vod',
+        '-hls_segment_filename', os.path.join(out_dir, f'{name}_%03d.ts'),
+        os.path.join(out_dir, f'{name}.m3u8'),
+    ])
+
+    codec = WEBM_CODECS[webm_codec]
+    webm_path = os.path.join(out_dir, f'{name}.webm')
+    _run_ffmpeg(ffmpeg, common + [
+        '-c:v', codec['encoder'], *codec['args'],
+        '-b:v', f"{int(rung['video_kbps'] * 0.7)}k",
+        '-c:a', 'libopus', '-b:a', f"{rung['audio_kbps']}k", webm_path,
+    ])
+
+
+def _write_master_playlist(out_dir, plan):
+    """写入HLS主播放列表，由播放器根据带宽自适应选择档位"""
+    lines = ['#EXTM3U', '#EXT-X-VERSION:3']
+    for rung in plan:
+        bandwidth = (rung['video_kbps'] + rung['audio_kbps']) * 1000
+        lines.append(f"#EXT-X-STREAM-INF:BANDWIDTH={bandwidth},RESOLUTION={rung['width']}x{rung['height']}")
+        lines.append(f"{rung['name']}.m3u8")
+    with open(os.path.join(out_dir, 'master.m3u8'), 'w', encoding='utf-8', newline='\n') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def _describe(out_dir, manifest):
+    """将阶梯清单转换为页面使用的URL描述"""
+    base = to_url(out_dir)
+    return {
+        'hls': f'{base}/master.m3u8',
+        'webm_type': WEBM_CODECS[manifest['webm_codec']]['mime'],
+        'renditions': [
+            {
+                'name': rung['name'],
+                'width': rung['width'],
+                'height': rung['height'],
+                'bandwidth': (rung['video_kbps'] + rung['audio_kbps']) * 1000,
+                'mp4': f"{base}/{rung['name']}.mp4",
+                'webm': f"{base}/{rung['name']}.webm",
+            }
+            for rung in manifest['renditions']
+        ],
+    }
+
+
+def ladder_params(webm_codec='vp9'):
+    """决定转码结果的参数；变化时缓存失效"""
+    return {'ladder': VIDEO_LADDER, 'webm': webm_codec, 'segment': HLS_SEGMENT_SECONDS}
+
+
+def transcode_video(ffmpeg, video_path, webm_codec='vp9', digest=None):
+    """转码单个视频；按源文件哈希缓存，同一视频只转码一次"""
+    digest = digest or file_hash(video_path)
+    out_dir = derivative_dir('video', digest)
+    fingerprint = params_hash(ladder_params(webm_codec))
+
+    manifest = load_json(os.path.join(out_dir, LADDER_MANIFEST))
+    if manifest and manifest.get('params') == fingerprint:
+        return _describe(out_dir, manifest), True
+
+    probe = probe_video(ffmpeg, video_path)
+    if not probe:
+        raise RuntimeError('unable to read video dimensions')
+    plan = plan_renditions(*probe)
+
+    # 先输出到临时目录，全部完成后再替换，避免中断留下半成品
+    partial_dir = out_dir + '.partial'
+    shutil.rmtree(partial_dir, ignore_errors=True)
+    os.makedirs(partial_dir)
+    for rung in plan:
+        _encode_rendition(ffmpeg, video_path, partial_dir, rung, webm_codec)
+    _write_master_playlist(partial_dir, plan)
+
+    manifest = {'source': digest, 'params': fingerprint, 'webm_codec': webm_codec,
+                'renditions': plan}
+    save_json(os.path.join(partial_dir, LADDER_MANIFEST), manifest)
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(partial_dir, out_dir)
+    return _describe(out_dir, manifest), False
+
+
+def transcode_task(item, ffmpeg, webm_codec='vp9'):
+    """流水线任务：转码单个视频，阶梯描述写入 item['derivatives']"""
+    video_path = item['path']
+    try:
+        info, cached = transcode_video(ffmpeg, video_path, webm_codec, item.get('digest'))
+    except (OSError, RuntimeError) as e:
+        item['log'].append(f"   ❌ Transcode failed for {video_path}: {e}")
+        item.setdefault('failed', []).append('video')
+        return item
+    item['derivatives']['video'] = info
+    status = 'cached' if cached else 'transcoded'
+    item['log'].append(f"   🎞️  {status}: {video_path} → {len(info['renditions'])} renditions + HLS")
+    return item